@@ -1,63 +1,292 @@
 import os
 import json
+import uuid
+import hashlib
 import datetime
 import logging
+import mimetypes
 import atexit
-from flask import Flask, g, render_template, request as flask_request, jsonify, send_from_directory, request
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from flask import Flask, g, render_template, request as flask_request, jsonify, send_from_directory, request, Response, current_app
+from flask import Request, stream_with_context
 from werkzeug.utils import secure_filename
+from werkzeug.serving import is_running_from_reloader
 from services.data_processor import DataProcessor
 from services.gemini_api import GeminiAPI
 from database.db import (
-    close_db, get_processing_logs, get_saved_results, init_db, get_db,
+    close_db, close_all_connections, get_processing_logs, get_saved_results, init_db, get_db,
     get_custom_prompt_types, log_processing, save_custom_prompt_type,
-    delete_custom_prompt_type, get_setting, save_result, toggle_log_star,
-    update_log_notes, update_setting, backup_database
+    delete_custom_prompt_type, update_custom_prompt_type, get_setting, save_result, toggle_log_star,
+    update_log_notes, update_setting, backup_database, get_settings_version, save_chunk_checkpoint,
+    get_chunk_checkpoint, count_chunk_checkpoints, delete_chunk_checkpoints, transaction,
+    encode_content, decode_content, get_result_content_by_file, get_result_id_by_file, get_referenced_result_files,
+    delete_stale_checkpoints, archive_old_logs, purge_archived_records, ensure_database, save_job_files,
+    get_job_file_names
 )
 import requests
 from services.llama_api import LlamaAPI
-from services.imagen_api import ImagenAPI
+from services.imagen_api import ImagenAPI, IMAGE_EXTENSIONS
+from services.vision_utils import pack_image_batches
+from services.job_manager import JobManager, JobCancelled, PRIORITY_INTERACTIVE, PRIORITY_BULK
+from services.metrics import registry as metrics_registry, timed, HTTP_REQUEST_DURATION, HTTP_REQUESTS
+from services.tracing import Trace, span as trace_span, current_trace, current_span, propagate
+from services.storage_gc import scan_files, select_expired_files, delete_files, select_orphan_thumbnails
+from services.structured_logging import setup_logging
+from services.upload_stream import StreamingUpload, UploadBatch, UploadRejected, declared_type_for
+from services.chunked_upload import ChunkedUploadStore, PreparedExtractions, BACKGROUND_EXTRACT_TYPES
+from services.http_cache import ResponseCache, FileDigests, negotiate_encoding
+from services.result_export import EXPORT_FORMATS, export_results, iter_results, parse_date_range
+from services.dataset_builder import DatasetBuilder
+from flask.logging import default_handler
 
-# Loglama ayarları
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class UploadRequest(Request):
+    """Stream uploaded files straight to the upload folder instead of Werkzeug's spooled buffers"""
+    upload_batch = None
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # Boş dosya alanları (dosya seçilmemiş) eskisi gibi atlanır
+        if not filename:
+            return BytesIO()
+        
+        config = current_app.config
+        if self.upload_batch is None:
+            self.upload_batch = UploadBatch(config.get('UPLOAD_MAX_BATCH_SIZE') or config.get('MAX_CONTENT_LENGTH'))
+        
+        # Uzantı kontrolü ilk bayt yazılmadan yapılır
+        declared_type = declared_type_for(filename, config.get('ALLOWED_EXTENSIONS', {}))
+        return StreamingUpload(config['UPLOAD_FOLDER'], filename, declared_type,
+                               max_bytes=config.get('UPLOAD_MAX_FILE_SIZE') or config.get('MAX_CONTENT_LENGTH'),
+                               batch=self.upload_batch,
+                               block_size=config.get('UPLOAD_BLOCK_SIZE', 64 * 1024))
+    
+    def close(self):
+        super().close()
+        # Ayrıştırma yarıda kesildiyse kesinleşmemiş geçici dosyaları temizle
+        if self.upload_batch is not None:
+            self.upload_batch.discard()
+
 # Initialize Flask application
 app = Flask(__name__)
+app.request_class = UploadRequest
 app.config.from_pyfile('config.py')
+# Ek yapılandırma dosyası (örn. benchmark'larda sahte LLM sunucusu ve geçici veritabanı için)
+app.config.from_envvar('AITEXTKIT_SETTINGS', silent=True)
+
+# Loglama ayarları: kayıtlar kuyruğa yazılır, biçimlendirme ve çıktı arka plan thread'inde yapılır
+setup_logging(app.config)
+app.logger.removeHandler(default_handler)
 DATABASE = app.config['DATABASE']
 
+# Sonuç API'lerinin serileştirilmiş yanıtları ve indirilen dosyaların içerik özetleri (ETag)
+response_cache = ResponseCache(app.config.get('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+file_digests = FileDigests()
+
+# Diskte tutulmayıp veritabanındaki içerikten sunulabilen sonuç dosyası uzantıları
+DB_RESULT_EXTENSIONS = ('.txt', '.json')
+
 # Global service instances
 data_processor = None
 gemini_api = None
 llama_api = None
 imagen_api = None
+job_manager = None
+chunked_uploads = None
+prepared_extractions = None
+
+# Ayar değişikliklerinin tüm worker süreçlerine yayılması için
+# veritabanındaki ayar sürümü ile bu süreçte yüklü olan sürüm karşılaştırılır
+loaded_settings_version = None
+settings_lock = threading.Lock()
 
 def init_services():
     """Initialize service instances"""
-    global data_processor, gemini_api, llama_api, imagen_api
+    global data_processor, gemini_api, llama_api, imagen_api, job_manager, chunked_uploads, prepared_extractions
     
     if data_processor is None:
         data_processor = DataProcessor()
     
     if gemini_api is None:
-        gemini_api = GeminiAPI(app.config.get('GEMINI_API_KEY', app.config.get('DEFAULT_API_KEY', '')))
+        gemini_api = GeminiAPI(app.config.get('GEMINI_API_KEY', app.config.get('DEFAULT_API_KEY', '')),
+                               api_url=app.config.get('GEMINI_API_URL'),
+                               retry_delay=app.config.get('LLM_RETRY_DELAY', 5))
     
     if llama_api is None:
         llama_api = LlamaAPI(
             base_url=app.config.get('LLAMA_API_URL', 'http://localhost:3001'),
-            api_key=app.config.get('LLAMA_API_KEY', '')
+            api_key=app.config.get('LLAMA_API_KEY', ''),
+            retry_delay=app.config.get('LLM_RETRY_DELAY', 5)
         )
         
     if imagen_api is None:
-        imagen_api = ImagenAPI(app.config.get('GEMINI_API_KEY', app.config.get('DEFAULT_API_KEY', '')))
+        imagen_api = ImagenAPI(
+            app.config.get('GEMINI_API_KEY', app.config.get('DEFAULT_API_KEY', '')),
+            max_concurrency=app.config.get('IMAGEN_MAX_CONCURRENCY', 4),
+            cache_size=app.config.get('IMAGEN_CACHE_SIZE', 32)
+        )
+    
+    if job_manager is None:
+        job_manager = JobManager(
+            max_workers=app.config.get('JOB_MAX_WORKERS', 2),
+            llm_concurrency=app.config.get('LLM_MAX_CONCURRENCY', 4),
+            reserved_interactive=app.config.get('LLM_RESERVED_INTERACTIVE_SLOTS', 1)
+        )
+    
+    if chunked_uploads is None:
+        prepared_extractions = PreparedExtractions(app.config.get('UPLOAD_PREPARED_EXTRACTIONS', 8))
+        chunked_uploads = ChunkedUploadStore(
+            os.path.join(app.config['UPLOAD_FOLDER'], '.sessions'),
+            part_size=app.config.get('UPLOAD_PART_SIZE', 8 * 1024 * 1024),
+            max_file_size=app.config.get('UPLOAD_MAX_CHUNKED_FILE_SIZE'),
+            block_size=app.config.get('UPLOAD_BLOCK_SIZE', 64 * 1024),
+            prepared=prepared_extractions,
+            prepare_max_size=app.config.get('UPLOAD_PREPARED_MAX_FILE_SIZE', 16 * 1024 * 1024)
+        )
+
+def load_settings():
+    """Load persisted settings from the database into app.config"""
+    app.config['GEMINI_API_KEY'] = get_setting('gemini_api_key', app.config.get('DEFAULT_API_KEY'))
+    
+    max_file_size = get_setting('max_file_size')
+    if max_file_size:
+        try:
+            max_size = int(max_file_size)
+            app.config['MAX_CONTENT_LENGTH'] = max_size * 1024 * 1024
+        except (ValueError, TypeError):
+            app.logger.error("Invalid max file size value, using default")
+    
+    app.config['DEFAULT_MODEL'] = get_setting('default_model', 'gemini')
+    app.config['LLAMA_API_URL'] = get_setting('llama_api_url', app.config.get('LLAMA_API_URL', 'http://localhost:3001'))
+    app.config['LLAMA_API_KEY'] = get_setting('llama_api_key', app.config.get('LLAMA_API_KEY', ''))
+
+def rebuild_api_clients():
+    """Create new API clients from app.config and swap them in together"""
+    global gemini_api, llama_api, imagen_api
+    
+    api_key = app.config.get('GEMINI_API_KEY', app.config.get('DEFAULT_API_KEY', ''))
+    new_gemini_api = GeminiAPI(api_key, api_url=app.config.get('GEMINI_API_URL'),
+                               retry_delay=app.config.get('LLM_RETRY_DELAY', 5))
+    new_llama_api = LlamaAPI(
+        base_url=app.config.get('LLAMA_API_URL', 'http://localhost:3001'),
+        api_key=app.config.get('LLAMA_API_KEY', ''),
+        retry_delay=app.config.get('LLM_RETRY_DELAY', 5)
+    )
+    new_imagen_api = ImagenAPI(
+        api_key,
+        max_concurrency=app.config.get('IMAGEN_MAX_CONCURRENCY', 4),
+        cache_size=app.config.get('IMAGEN_CACHE_SIZE', 32)
+    )
+    
+    # Devam eden istekler eski nesneleri kullanmaya devam eder, yeni istekler yenilerini alır
+    gemini_api, llama_api, imagen_api = new_gemini_api, new_llama_api, new_imagen_api
+
+def sync_settings(force=False):
+    """Reload settings and API clients if another process changed them"""
+    global loaded_settings_version
+    
+    version = get_settings_version()
+    if not force and version == loaded_settings_version:
+        return
+    
+    with settings_lock:
+        if not force and version == loaded_settings_version:
+            return
+        load_settings()
+        rebuild_api_clients()
+        init_services()
+        loaded_settings_version = version
+        app.logger.info(f"Ayarlar yeniden yüklendi (sürüm {version})")
+
+# Uygulama başlangıcı import sırasında değil, sunucu süreci hazırlanırken bir kez çalışır
+startup_lock = threading.Lock()
+started = False
+
+def startup():
+    """
+    Prepare this process for serving requests (safe to call more than once)
+
+    Creates the folders and any missing tables, loads the settings and starts the
+    background storage cleanup. Called by `python app.py`, from a WSGI server's
+    worker hook (e.g. gunicorn post_worker_init) or, as a fallback, by the first request.
+    """
+    global started, storage_gc_thread
+    if started:
+        return
+    
+    with startup_lock:
+        if started:
+            return
+        
+        # Ensure directories exist
+        os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+        os.makedirs(app.config['RESULTS_FOLDER'], exist_ok=True)
+        db_dir = os.path.dirname(app.config['DATABASE'])
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        
+        with app.app_context():
+            # Eksik tabloları oluştur; mevcut kayıtlar korunur
+            ensure_database()
+            
+            try:
+                # Load settings from database and initialize services
+                sync_settings(force=True)
+            except Exception as e:
+                app.logger.error(f"Error loading settings: {str(e)}")
+        
+        storage_gc_thread = start_storage_gc()
+        started = True
+
+@app.before_request
+def ensure_started():
+    if not started:
+        startup()
+
+@app.before_request
+def sync_settings_before_request():
+    """Pick up settings changed by other worker processes"""
+    if flask_request.endpoint == 'static':
+        return
+    try:
+        sync_settings()
+    except Exception as e:
+        app.logger.error(f"Ayar senkronizasyonu hatası: {str(e)}")
 
 # AJAX isteklerini loglama
 @app.before_request
 def log_request_info():
     if flask_request.path.startswith('/api/'):
-        app.logger.info('Gelen API isteği: %s %s', flask_request.method, flask_request.path)
-        if flask_request.is_json:
-            app.logger.info('JSON içeriği: %s', flask_request.get_json())
+        # İstek gövdesi yalnızca DEBUG seviyesinde ayrıştırılıp loglanır (kısaltılmış ve maskelenmiş)
+        if app.logger.isEnabledFor(logging.DEBUG) and flask_request.is_json:
+            app.logger.debug('Gelen API isteği: %s %s', flask_request.method, flask_request.path,
+                             extra={'payload': flask_request.get_json(silent=True)})
+        else:
+            app.logger.info('Gelen API isteği: %s %s', flask_request.method, flask_request.path)
+
+# İstek süresi ve durum kodu metrikleri
+@app.before_request
+def start_request_timer():
+    g.request_started_at = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    started_at = g.pop('request_started_at', None)
+    if started_at is not None:
+        # Yüksek kardinaliteyi önlemek için gerçek yol yerine rota şablonu kullanılır
+        endpoint = flask_request.url_rule.rule if flask_request.url_rule else 'unmatched'
+        HTTP_REQUEST_DURATION.observe(time.perf_counter() - started_at,
+                                      method=flask_request.method, endpoint=endpoint)
+        HTTP_REQUESTS.inc(method=flask_request.method, endpoint=endpoint, status=response.status_code)
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Expose metrics in the Prometheus text format"""
+    return Response(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 # Hata yakalama
 @app.errorhandler(500)
@@ -76,43 +305,12 @@ def not_found_error(error):
         'message': 'Sayfa bulunamadı'
     }), 404
 
-# Initialize database and services
-with app.app_context():
-    # Ensure directories exist
-    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-    os.makedirs(app.config['RESULTS_FOLDER'], exist_ok=True)
-    db_dir = os.path.dirname(app.config['DATABASE'])
-    if db_dir:
-        os.makedirs(db_dir, exist_ok=True)
-    
-    # Initialize database without preserving old data
-    init_db(preserve_settings=False, preserve_logs=False)
-    
-    try:
-        # Load settings from database
-        db = get_db()
-        db.execute('CREATE TABLE IF NOT EXISTS app_settings (key TEXT PRIMARY KEY, value TEXT)')
-        
-        # Load API key
-        app.config['GEMINI_API_KEY'] = get_setting('gemini_api_key', app.config.get('DEFAULT_API_KEY'))
-        
-        # Load max file size
-        max_file_size = get_setting('max_file_size')
-        if max_file_size:
-            try:
-                max_size = int(max_file_size)
-                app.config['MAX_CONTENT_LENGTH'] = max_size * 1024 * 1024
-            except (ValueError, TypeError):
-                app.logger.error("Invalid max file size value, using default")
-        
-        # Load default model
-        app.config['DEFAULT_MODEL'] = get_setting('default_model', 'gemini')
-
-# Initialize services
-        init_services()
-        
-    except Exception as e:
-        app.logger.error(f"Error loading settings: {str(e)}")
+def save_setting_and_sync(key, value):
+    """Save a setting, raising on failure, and apply it to this process immediately"""
+    success, message = update_setting(key, value)
+    if not success:
+        raise Exception(message)
+    sync_settings()
 
 # Model seçimini yöneten yardımcı fonksiyon
 def get_model_api(model_name):
@@ -152,18 +350,11 @@ def update_api_key():
         return jsonify({'success': False, 'message': 'API anahtarı boş olamaz. Lütfen geçerli bir API anahtarı girin.'}), 400
     
     try:
-        # Test the API key by initializing the API client
-        gemini_api.update_api_key(api_key)
+        # Test the API key with a temporary client (shared clients are rebuilt after saving)
+        GeminiAPI(api_key, api_url=app.config.get('GEMINI_API_URL')).update_api_key(api_key)
         
-        # API anahtarı config'e kaydedelim
-        app.config['GEMINI_API_KEY'] = api_key
-        
-        # API anahtarını veritabanına kaydedelim
-        db = get_db()
-        db.execute('CREATE TABLE IF NOT EXISTS app_settings (key TEXT PRIMARY KEY, value TEXT)')
-        db.execute('INSERT OR REPLACE INTO app_settings (key, value) VALUES (?, ?)', 
-                  ('gemini_api_key', api_key))
-        db.commit()
+        # API anahtarını veritabanına kaydet ve tüm süreçlerde yeniden yükle
+        save_setting_and_sync('gemini_api_key', api_key)
         
         app.logger.info("API anahtarı başarıyla güncellendi ve veritabanına kaydedildi")
         return jsonify({
@@ -195,35 +386,43 @@ def update_api_key():
 @app.route('/api/upload', methods=['POST'])
 def upload_file():
     """Handle file uploads"""
-    if 'files' not in request.files:
-        return jsonify({'success': False, 'message': 'Dosya yüklenmedi'}), 400
+    # Dosyalar gövde ayrıştırılırken geçici dosyalara akıtılır; biçim ve boyut
+    # kontrolleri akış sırasında yapılır ve ihlalde tüm yükleme iptal edilir
+    try:
+        if 'files' not in request.files:
+            return jsonify({'success': False, 'message': 'Dosya yüklenmedi'}), 400
+        files = request.files.getlist('files')
+    except UploadRejected as e:
+        return jsonify({'success': False, 'message': str(e)}), e.status_code
     
-    files = request.files.getlist('files')
     uploaded_files = []
     
     for file in files:
-        if file.filename == '':
+        if file.filename == '' or not isinstance(file.stream, StreamingUpload):
             continue
             
         filename = secure_filename(file.filename)
         file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
         
         # Get file type
         file_ext = os.path.splitext(filename)[1].lower()
         file_type = data_processor.get_file_type(file_ext)
         
-        if file_type:
-            uploaded_files.append({
-                'name': filename,
-                'path': file_path,
-                'type': file_type
-            })
-        else:
+        if not file_type:
             return jsonify({
                 'success': False, 
                 'message': f'Desteklenmeyen dosya formatı: {file_ext}'
             }), 400
+        
+        # Geçici dosyayı yerine atomik olarak taşı
+        size, sha256 = file.stream.finalize(file_path)
+        uploaded_files.append({
+            'name': filename,
+            'path': file_path,
+            'type': file_type,
+            'size': size,
+            'sha256': sha256
+        })
     
     if not uploaded_files:
         return jsonify({'success': False, 'message': 'Hiçbir dosya yüklenemedi'}), 400
@@ -234,6 +433,86 @@ def upload_file():
         'files': uploaded_files
     })
 
+# Parçalı (devam ettirilebilir) yükleme: oturum aç, parçaları sırasız/yeniden gönder, tamamla.
+# Büyük dosyalar tek istekte gönderilmez; bağlantı koparsa yalnızca eksik parçalar yeniden gönderilir.
+@app.route('/api/uploads', methods=['POST'])
+def create_chunked_upload():
+    """Start a resumable upload (JSON: filename, size, optional sha256)"""
+    data = request.get_json(silent=True) or {}
+    filename = secure_filename(data.get('filename') or '')
+    if not filename:
+        return jsonify({'success': False, 'message': 'Dosya adı gerekli'}), 400
+    
+    try:
+        total_size = int(data.get('size') or 0)
+        file_type = declared_type_for(filename, app.config.get('ALLOWED_EXTENSIONS', {}))
+        session = chunked_uploads.create(filename, file_type, total_size, data.get('sha256'))
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'message': 'Geçersiz dosya boyutu'}), 400
+    except UploadRejected as e:
+        return jsonify({'success': False, 'message': str(e)}), e.status_code
+    
+    return jsonify(dict(session, success=True, message='Yükleme oturumu oluşturuldu',
+                        received_parts=[], missing_parts=list(range(session['part_count']))))
+
+@app.route('/api/uploads/<upload_id>', methods=['GET'])
+def get_chunked_upload(upload_id):
+    """Return the parts received so far, so an interrupted upload can be resumed"""
+    try:
+        return jsonify(dict(chunked_uploads.status(upload_id), success=True))
+    except UploadRejected as e:
+        return jsonify({'success': False, 'message': str(e)}), e.status_code
+
+@app.route('/api/uploads/<upload_id>/parts/<int:index>', methods=['PUT'])
+def upload_chunk(upload_id, index):
+    """Store one part sent as the raw request body (optional X-Part-SHA256 header)"""
+    try:
+        part = chunked_uploads.write_part(upload_id, index, request.stream,
+                                          content_length=request.content_length,
+                                          expected_sha256=request.headers.get('X-Part-SHA256'))
+    except UploadRejected as e:
+        return jsonify({'success': False, 'message': str(e)}), e.status_code
+    
+    return jsonify({'success': True, 'message': f'Parça {index} alındı', 'part': part})
+
+@app.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+def complete_chunked_upload(upload_id):
+    """Assemble a finished upload into the upload folder"""
+    try:
+        session = chunked_uploads.load(upload_id)
+        file_path = os.path.join(app.config['UPLOAD_FOLDER'], session['filename'])
+        size, sha256 = chunked_uploads.complete(upload_id, file_path)
+    except UploadRejected as e:
+        return jsonify({'success': False, 'message': str(e)}), e.status_code
+    
+    # Metin dosyaları parçalar geldikçe çözüldü; PDF/DOCX metni işleme isteği beklenmeden çıkarılmaya başlanır
+    if session['type'] in BACKGROUND_EXTRACT_TYPES and \
+            size <= app.config.get('UPLOAD_PREPARED_MAX_FILE_SIZE', 16 * 1024 * 1024):
+        processor = data_processor
+        prepared_extractions.submit(file_path, lambda path: processor.process_file(path, session['type']))
+    
+    return jsonify({
+        'success': True,
+        'message': '1 dosya başarıyla yüklendi',
+        'files': [{
+            'name': session['filename'],
+            'path': file_path,
+            'type': session['type'],
+            'size': size,
+            'sha256': sha256
+        }]
+    })
+
+@app.route('/api/uploads/<upload_id>', methods=['DELETE'])
+def abort_chunked_upload(upload_id):
+    """Cancel a resumable upload and delete its parts"""
+    try:
+        chunked_uploads.load(upload_id)
+    except UploadRejected as e:
+        return jsonify({'success': False, 'message': str(e)}), e.status_code
+    chunked_uploads.abort(upload_id)
+    return jsonify({'success': True, 'message': 'Yükleme iptal edildi'})
+
 @app.route('/api/process', methods=['POST'])
 def process_files():
     """Process uploaded files with AI models"""
@@ -261,11 +540,13 @@ def process_files():
     else:
         prompt = data_processor.get_prompt(prompt_type, topic, custom_prompt)
     
-    # Vision özellikleri
-    use_vision = False
-    if selected_model == 'llama':
-        # AnythingLLM için vision özelliklerini kontrol et
-        use_vision = app.config.get('VISION_ENABLED', False) and any(f.get('type') == 'image' for f in files)
+    # Vision özellikleri (Gemini ve AnythingLLM görselleri doğrudan analiz edebilir, OCR atlanır)
+    use_vision = (data.get('use_vision', app.config.get('VISION_ENABLED', False))
+                  and hasattr(api, 'generate_vision_response')
+                  and any(f.get('type') == 'image' for f in files))
+    
+    # Toplu vision modu (birden fazla görsel tek istekte)
+    use_vision_batch = use_vision and data.get('vision_batch', app.config.get('VISION_BATCH_ENABLED', True))
     
     # İşlem tipini belirle
     is_summary = prompt_type == "Metin Özeti Oluştur"
@@ -281,13 +562,53 @@ def process_files():
         else:
             processing_mode = 'separate'
             
+    # Devam anahtarı: aynı istek tekrarlandığında tamamlanmış parçalar yeniden işlenmez.
+    # İş kimliği her çalıştırmada farklıdır; iptal ve durum takibi yalnızca bu çalıştırmayı etkiler.
+    resume_key = data.get('resume_key') or build_resume_key(files, prompt, selected_model, processing_mode, use_vision)
+    job_id = data.get('job_id') or uuid.uuid4().hex
+    
+    # Küçük/etkileşimli işler büyük toplu işlerden önce LLM erişimi alır
+    running_job_id = job_manager.register(job_id, 'process', priority=get_job_priority(files, data.get('priority')),
+                                          user=get_request_user(), resume_key=resume_key)
+    if running_job_id:
+        # Aynı istek (örn. çift tıklama) hâlâ işleniyorsa ikinci kez çalıştırılmaz
+        return jsonify({
+            'success': False,
+            'message': 'Aynı işlem zaten devam ediyor. Tamamlanmasını bekleyin veya iptal edin.',
+            'job_id': running_job_id,
+            'status_url': f"/api/jobs/{running_job_id}"
+        }), 409
+    
     # Process each file
-    result_data = {'success': True, 'messages': [], 'results': None}
+    result_data = {'success': True, 'messages': [], 'results': None, 'job_id': job_id, 'resume_key': resume_key,
+                   'failed_chunks': 0}
     all_results = {"soru-cevaplar": []}
     combined_text = ""
     vision_results = []
+    batched_vision = None
+    
+    # İşin zaman çizelgesi (dosya → çıkarma → parça → LLM çağrısı → ayrıştırma → birleştirme)
+    trace = Trace('process', job_id=job_id, model=selected_model, mode=processing_mode,
+                  prompt_type=prompt_type, files=len(files))
+    trace.start()
 
     try:
+        # İş bitene (veya checkpoint'leri temizlenene) kadar yüklenen dosyalar depolama temizliğinde silinmez
+        save_job_files(resume_key, [file.get('path') for file in files])
+        
+        resumed_chunks = count_chunk_checkpoints(resume_key)
+        if resumed_chunks:
+            result_data['messages'].append({
+                'type': 'info',
+                'text': f"Önceki denemeden {resumed_chunks} tamamlanmış parça bulundu, işlem kaldığı yerden devam ediyor"
+            })
+        
+        # Görselleri önceden (toplu ve eşzamanlı) işle
+        if use_vision:
+            image_files = [f for f in files if f.get('type') == 'image']
+            batch_size = app.config.get('VISION_BATCH_SIZE', 4) if use_vision_batch else 1
+            batched_vision = process_vision_images(image_files, api, prompt, result_data, batch_size)
+        
         # Birleştirme modu için tüm içeriği topla
         if processing_mode == 'combined':
             all_content = ""
@@ -303,15 +624,19 @@ def process_files():
                 })
                 
                 # Vision işleme veya normal metin işleme
-                if use_vision and file_type == 'image':
-                    vision_response = process_vision_file(file_name, file_path, api, prompt, result_data)
-                    if vision_response:
-                        vision_results.append(vision_response)
-                        all_content += f"\n\n--- Görsel Analizi: {file_name} ---\n{vision_response['content']}\n\n"
-                else:
-                    text_content = process_text_file(file_name, file_path, file_type, data_processor, result_data)
-                    if text_content:
-                        all_content += text_content + "\n\n"
+                with trace_span('file', file=file_name, type=file_type, bytes=get_file_size(file_path)):
+                    if use_vision and file_type == 'image':
+                        if batched_vision is not None:
+                            vision_response = batched_vision.get(file_path)
+                        else:
+                            vision_response = process_vision_file(file_name, file_path, api, prompt, result_data)
+                        if vision_response:
+                            vision_results.append(vision_response)
+                            all_content += f"\n\n--- Görsel Analizi: {file_name} ---\n{vision_response['content']}\n\n"
+                    else:
+                        text_content = process_text_file(file_name, file_path, file_type, data_processor, result_data)
+                        if text_content:
+                            all_content += text_content + "\n\n"
                 
                 update_progress(result_data, file_index, len(files))
             
@@ -324,32 +649,130 @@ def process_files():
             for file_index, file in enumerate(files):
                 process_single_file(file, file_index, files, use_vision, api, prompt,
                                   data_processor, is_summary, is_custom, is_qa,
-                                  result_data, all_results, combined_text, vision_results)
+                                  result_data, all_results, combined_text, vision_results,
+                                  batched_vision)
         
         # Son işlemler ve sonuç oluşturma
-        create_final_result(is_summary, is_custom, is_qa, combined_text, all_results,
-                           vision_results, api, prompt, processing_mode, output_format,
-                           app.config['RESULTS_FOLDER'], result_data)
+        if not result_data['failed_chunks']:
+            create_final_result(is_summary, is_custom, is_qa, combined_text, all_results,
+                               vision_results, api, prompt, processing_mode, output_format,
+                               app.config['RESULTS_FOLDER'], result_data)
         
-        # Başarılı işlem loglaması
-        if result_data['success'] and result_data.get('results'):
+        if result_data['failed_chunks']:
+            # Eksik parça varsa kısmi sonuç kaydedilmez; checkpoint'ler tekrar deneme için saklanır
+            # ve istek tekrarlandığında tek (tam) sonuç kaydedilir
+            result_data['success'] = False
+            result_data['resumable'] = True
+            result_data['message'] = (f"{result_data['failed_chunks']} parça işlenemedi. "
+                                      "İsteği tekrarladığınızda yalnızca eksik parçalar işlenecek.")
+            result_data['messages'].append({'type': 'error', 'text': result_data['message']})
+            log_error_and_return(result_data['message'], files, prompt_type)
+        elif result_data.get('results'):
+            # Başarılı işlem loglaması
             log_successful_processing(files, prompt_type, result_data)
+        
+        if result_data['success']:
+            job_manager.finish(job_id, 'completed')
+        else:
+            job_manager.finish(job_id, 'failed', result_data.get('message'))
 
+    except JobCancelled:
+        job_manager.finish(job_id, 'cancelled')
+        log_error_and_return("İşlem kullanıcı tarafından iptal edildi", files, prompt_type)
+        return jsonify({
+            'success': False,
+            'message': "İşlem iptal edildi. Tamamlanan parçalar saklandı, istek tekrarlandığında kaldığı yerden devam eder.",
+            'job_id': job_id,
+            'resume_key': resume_key,
+            'cancelled': True,
+            'resumable': True
+        }), 409
     except Exception as e:
         # Hata durumu loglaması
+        job_manager.finish(job_id, 'failed', str(e))
         log_error_and_return(e, files, prompt_type)
         return jsonify({
             'success': False,
-            'message': f"İşlem sırasında hata oluştu: {str(e)}"
+            'message': f"İşlem sırasında hata oluştu: {str(e)}",
+            'job_id': job_id,
+            'resume_key': resume_key,
+            'resumable': True
         }), 500
+    finally:
+        trace.finish()
 
-    return jsonify(result_data)
+    return jsonify(result_data), 200 if result_data['success'] else 500
 
 @app.route('/download/<filename>')
 def download_file(filename):
     """Download a result file"""
+    file_path = os.path.join(app.config['RESULTS_FOLDER'], secure_filename(filename))
+    
+    # Dosya içeriğinden türetilen ETag ile tekrar indirmeler 304, kısmi istekler 206 ile yanıtlanır
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        stat = None
+    if stat is not None:
+        response = send_from_directory(app.config['RESULTS_FOLDER'], filename, as_attachment=True,
+                                       etag=file_digests.etag(file_path, stat), max_age=0)
+        response.cache_control.no_cache = True
+        return response
+    
+    # Veritabanında saklanan TXT/JSON sonuçların dosyası tutulmaz, içerik veritabanından sunulur
+    result_id = get_result_id_by_file(filename)
+    if result_id is not None and not filename.lower().endswith(DB_RESULT_EXTENSIONS):
+        # DOCX/PDF gibi ikili dosyalar veritabanındaki düz metinden yeniden üretilemez
+        return jsonify({'success': False, 'message': 'Sonuç dosyası artık mevcut değil'}), 410
+    if result_id is not None:
+        cached = response_cache.get(('download', filename), result_id)
+        if cached is None:
+            content = read_result_file(filename)
+            if content is not None:
+                cached = response_cache.put(('download', filename), result_id, content.encode('utf-8'))
+        if cached is not None:
+            mimetype = mimetypes.guess_type(filename)[0] or 'text/plain'
+            response = Response(cached.body, mimetype=f"{mimetype}; charset=utf-8",
+                                headers={'Content-Disposition': f'attachment; filename="{secure_filename(filename)}"'})
+            response.set_etag(cached.etag)
+            response.cache_control.no_cache = True
+            return response.make_conditional(request, accept_ranges=True, complete_length=len(cached.body))
+    
     return send_from_directory(app.config['RESULTS_FOLDER'], filename, as_attachment=True)
 
+@app.route('/thumbnail/<filename>')
+def thumbnail(filename):
+    """Serve a cached thumbnail of an image in the results folder"""
+    allowed_sizes = app.config.get('THUMBNAIL_SIZES', [128, 256, 512])
+    size = request.args.get('size', default=allowed_sizes[min(1, len(allowed_sizes) - 1)], type=int)
+    if size not in allowed_sizes:
+        return jsonify({'success': False, 'message': f'Desteklenmeyen küçük resim boyutu: {size}'}), 400
+    
+    filename = secure_filename(filename)
+    source_path = os.path.join(app.config['RESULTS_FOLDER'], filename)
+    if not os.path.isfile(source_path) or os.path.splitext(filename)[1].lower().lstrip('.') not in IMAGE_EXTENSIONS:
+        return jsonify({'success': False, 'message': 'Görsel bulunamadı'}), 404
+    
+    thumbnail_folder = app.config.get('THUMBNAIL_FOLDER', os.path.join(app.config['RESULTS_FOLDER'], 'thumbnails'))
+    # Uzantı ada eklenir; aynı adlı .png ve .jpg görseller aynı küçük resmi paylaşmaz
+    stem, extension = os.path.splitext(filename)
+    thumbnail_name = f"{stem}_{extension.lstrip('.')}_{size}.jpg"
+    thumbnail_path = os.path.join(thumbnail_folder, thumbnail_name)
+    
+    # Kaynak görsel değiştiyse önbellekteki küçük resmi yenile
+    if not os.path.exists(thumbnail_path) or os.path.getmtime(thumbnail_path) < os.path.getmtime(source_path):
+        try:
+            init_services()
+            imagen_api.create_thumbnail(source_path, thumbnail_path, size)
+        except Exception as e:
+            app.logger.error(f"Küçük resim oluşturma hatası: {str(e)}")
+            return jsonify({'success': False, 'message': f'Küçük resim oluşturulamadı: {str(e)}'}), 500
+    
+    response = send_from_directory(thumbnail_folder, thumbnail_name, conditional=True,
+                                   max_age=app.config.get('THUMBNAIL_MAX_AGE', 7 * 24 * 3600))
+    response.cache_control.public = True
+    return response
+
 # Özel İşlem Türleri Endpoint'leri
 @app.route('/api/custom-prompt-types', methods=['GET'])
 def get_custom_prompt_types_api():
@@ -420,15 +843,10 @@ def update_settings():
         api_key = data.get('gemini_api_key')
         try:
             # Test the API key
-            gemini_api.update_api_key(api_key)
+            GeminiAPI(api_key, api_url=app.config.get('GEMINI_API_URL')).update_api_key(api_key)
             
-            # API anahtarını veritabanına ve config'e kaydet
-            db = get_db()
-            db.execute('INSERT OR REPLACE INTO app_settings (key, value) VALUES (?, ?)', 
-                     ('gemini_api_key', api_key))
-            db.commit()
-            
-            app.config['GEMINI_API_KEY'] = api_key
+            # API anahtarını veritabanına kaydet ve tüm süreçlerde yeniden yükle
+            save_setting_and_sync('gemini_api_key', api_key)
             updates.append({
                 'key': 'gemini_api_key', 
                 'success': True, 
@@ -476,23 +894,11 @@ def update_settings():
                     'message': f'Maksimum dosya boyutu {max_size} MB olarak ayarlandı (yüksek değerler performans sorunlarına neden olabilir)'
                 })
                 
-                # Dosya boyutunu veritabanına ve config'e kaydet
-                db = get_db()
-                db.execute('INSERT OR REPLACE INTO app_settings (key, value) VALUES (?, ?)', 
-                         ('max_file_size', str(max_size)))
-                db.commit()
-                
-                # Aktif konfigürasyonu güncelle (bytlara çevirerek)
-                app.config['MAX_CONTENT_LENGTH'] = max_size * 1024 * 1024
+                # Dosya boyutunu veritabanına kaydet, config tüm süreçlerde yeniden yüklenir
+                save_setting_and_sync('max_file_size', str(max_size))
             else:
-                # Dosya boyutunu veritabanına ve config'e kaydet
-                db = get_db()
-                db.execute('INSERT OR REPLACE INTO app_settings (key, value) VALUES (?, ?)', 
-                         ('max_file_size', str(max_size)))
-                db.commit()
-                
-                # Aktif konfigürasyonu güncelle (bytlara çevirerek)
-                app.config['MAX_CONTENT_LENGTH'] = max_size * 1024 * 1024
+                # Dosya boyutunu veritabanına kaydet, config tüm süreçlerde yeniden yüklenir
+                save_setting_and_sync('max_file_size', str(max_size))
                 
                 updates.append({
                     'key': 'max_file_size', 
@@ -521,12 +927,7 @@ def update_settings():
         
         if default_model in supported_models:
             try:
-                db = get_db()
-                db.execute('INSERT OR REPLACE INTO app_settings (key, value) VALUES (?, ?)', 
-                         ('default_model', default_model))
-                db.commit()
-                
-                app.config['DEFAULT_MODEL'] = default_model
+                save_setting_and_sync('default_model', default_model)
                 updates.append({
                     'key': 'default_model', 
                     'success': True, 
@@ -593,8 +994,10 @@ def chat():
         # Bağlam ve kullanıcı mesajını birleştir
         prompt = f"{context}\nKullanıcı: {user_message}\nGemini:"
         
-        # Gemini API'ye istek at
-        api_response = gemini_api.generate_response(prompt, "")
+        # Gemini API'ye istek at (sohbet her zaman etkileşimli öncelikle çalışır)
+        init_services()
+        api_response = job_manager.call(gemini_api.generate_response, prompt, "",
+                                        priority=PRIORITY_INTERACTIVE, user=get_request_user())
         
         if api_response.get('success'):
             ai_response = api_response.get('content')
@@ -633,25 +1036,20 @@ def check_llama_connection():
         app.logger.info(f"AnythingLLM connection test result: {is_available}")
         
         if is_available:
-            # Başarılıysa, ayarları güncelle
-            db = get_db()
-            db.execute('INSERT OR REPLACE INTO app_settings (key, value) VALUES (?, ?)', 
-                      ('llama_api_url', api_url))
-            
-            # API anahtarı boş değilse kaydet
-            if api_key:
-                db.execute('INSERT OR REPLACE INTO app_settings (key, value) VALUES (?, ?)', 
-                          ('llama_api_key', api_key))
-            
-            db.commit()
-            
-            # Uygulama yapılandırmasını güncelle
-            app.config['LLAMA_API_URL'] = api_url
-            app.config['LLAMA_API_KEY'] = api_key
-            
-            # Llama API nesnesini güncelle
-            llama_api.base_url = api_url
-            llama_api.api_key = api_key
+            # Başarılıysa ayarları kaydet; Llama API nesnesi tüm süreçlerde yeniden oluşturulur
+            try:
+                save_setting_and_sync('llama_api_url', api_url)
+                
+                # API anahtarı boş değilse kaydet
+                if api_key:
+                    save_setting_and_sync('llama_api_key', api_key)
+            except Exception as e:
+                app.logger.error(f"AnythingLLM ayarları kaydedilemedi: {str(e)}")
+                return jsonify({
+                    'success': False,
+                    'available': True,
+                    'message': f'Bağlantı başarılı ancak ayarlar kaydedilemedi: {str(e)}'
+                }), 500
         
         return jsonify({
             'success': True,
@@ -716,22 +1114,14 @@ def update_custom_prompt_type_api(prompt_id):
                 'message': 'Düzenlenecek işlem türü bulunamadı.'
             }), 404
         
-        # İsim unique olmalı, bu yüzden diğer kayıtlarla çakışma kontrolü yap
-        name_exists = db.execute('SELECT id FROM custom_prompt_types WHERE name = ? AND id != ?', 
-                              (name, prompt_id)).fetchone()
-        if name_exists:
+        # Güncelleme işlemi (isim çakışması kontrolü ve önbellek geçersizleştirme dahil)
+        success, message = update_custom_prompt_type(prompt_id, name, prompt_text)
+        if not success:
             return jsonify({
                 'success': False,
-                'message': f'"{name}" adında başka bir işlem türü zaten var.'
+                'message': message
             }), 400
         
-        # Güncelleme işlemi
-        db.execute(
-            'UPDATE custom_prompt_types SET name = ?, prompt_text = ? WHERE id = ?',
-            (name, prompt_text, prompt_id)
-        )
-        db.commit()
-        
         # Güncellenmiş veriyi döndür
         updated_prompt = {
             'id': prompt_id,
@@ -781,6 +1171,30 @@ def get_results_api():
         'results': unique_results
     })
 
+@app.route('/api/saved-results/export')
+def export_results_api():
+    """Stream all saved results matching the filters as JSONL, CSV or a ZIP of result files"""
+    export_format = request.args.get('format', 'jsonl').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'success': False, 'message': f'Desteklenmeyen dışa aktarma biçimi: {export_format}'}), 400
+    
+    try:
+        since, until = parse_date_range(request.args.get('since'), request.args.get('until'))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Geçersiz tarih (YYYY-MM-DD bekleniyor)'}), 400
+    tags = [tag.strip() for tag in request.args.get('tags', '').split(',') if tag.strip()]
+    
+    # Kayıtlar parti parti okunup yazıldığından bellek kullanımı sonuç sayısından bağımsızdır;
+    # gövde uzunluğu bilinmediği için yanıt parçalı (chunked) olarak gönderilir
+    results = iter_results(get_db(read_only=True), result_type=request.args.get('type'), since=since,
+                           until=until, tags=tags, batch_size=app.config.get('EXPORT_BATCH_SIZE', 500))
+    chunks = export_results(results, export_format, app.config['RESULTS_FOLDER'])
+    
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    filename = f"sonuclar_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}.{extension}"
+    return Response(stream_with_context(chunks), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
 @app.route('/api/save-result', methods=['POST'])
 def save_result_api():
     """Save a result to the database"""
@@ -808,10 +1222,10 @@ def save_result_api():
                            (processing_log_id,)).fetchone()
             if log and log['result_file']:
                 try:
-                    # Dosyayı oku ve içeriği al
-                    file_path = os.path.join(app.config['RESULTS_FOLDER'], log['result_file'])
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
+                    # Dosyayı (veya veritabanındaki kaydını) oku ve içeriği al
+                    content = read_result_file(log['result_file'])
+                    if content is None:
+                        raise FileNotFoundError(log['result_file'])
                 except Exception as e:
                     app.logger.error(f"Dosya okuma hatası: {str(e)}")
                     content = "İçerik alınamadı"
@@ -825,7 +1239,7 @@ def save_result_api():
         db = get_db()
         existing = db.execute(
             'SELECT id FROM saved_results WHERE title = ? AND content = ?',
-            (title, content)
+            (title, encode_content(content))
         ).fetchone()
         
         # Eğer aynı başlık ve içerikle kayıt varsa, onun ID'sini döndür
@@ -920,7 +1334,7 @@ def history_page():
         
         # Detaylı hata ayıklama için log içeriğini kontrol et
         if len(logs) > 0:
-            app.logger.info(f"First log: {logs[0]}")
+            app.logger.debug("First log: %s", logs[0])
         else:
             app.logger.warning("No logs found in database")
             
@@ -942,15 +1356,6 @@ def history_page():
         return render_template('history.html', logs=[])
 
 # Uygulama başladığında veritabanı varlığını kontrol et
-def check_database():
-    if not os.path.exists(DATABASE):
-        app.logger.warning(f"Veritabanı dosyası bulunamadı: {DATABASE}")
-        # Yoksa yeni veritabanı oluştur
-        with app.app_context():
-            init_db(preserve_settings=False)
-    else:
-        app.logger.info(f"Veritabanı dosyası bulundu: {DATABASE}")
-
 @app.teardown_appcontext
 def close_db_connection(exception):
     """Ensure database connection is properly closed"""
@@ -965,6 +1370,9 @@ def save_db_before_exit():
                 db = g.db
                 db.commit()
                 app.logger.info("Database committed before exit")
+        # Arka plan temizliğini durdur ve havuzdaki kalıcı bağlantıları kapat (WAL dosyası checkpoint edilir)
+        storage_gc_stop.set()
+        close_all_connections()
     except Exception as e:
         app.logger.error(f"Error saving database before exit: {str(e)}")
 
@@ -975,8 +1383,13 @@ atexit.register(save_db_before_exit)
 def get_log_details(log_id):
     """Get detailed information about a log"""
     try:
-        db = get_db()
-        log = db.execute('SELECT * FROM processing_logs WHERE id = ?', (log_id,)).fetchone()
+        db = get_db(read_only=True)
+        # Sıkıştırılmış span ağacı yerine uzunluğu okunur; ağaç iş bitince bir kez yazılır
+        log = db.execute('''
+            SELECT id, timestamp, files, prompt_type, success, result_file, notes, tags, starred,
+                   length(trace) AS trace_length
+            FROM processing_logs WHERE id = ?
+        ''', (log_id,)).fetchone()
         
         if not log:
             return jsonify({
@@ -984,43 +1397,9 @@ def get_log_details(log_id):
                 'message': 'İşlem bulunamadı'
             }), 404
         
-        # Log verilerini sözlüğe dönüştür
-        log_data = dict(log)
-        
-        # Sonuç dosyasını oku (varsa)
-        result_content = None
-        if log['result_file']:
-            try:
-                file_path = os.path.join(app.config['RESULTS_FOLDER'], log['result_file'])
-                if os.path.exists(file_path):
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        result_content = f.read()
-                        
-                    # JSON içeriği ise parse et
-                    if log['result_file'].endswith('.json'):
-                        try:
-                            result_content = json.loads(result_content)
-                        except:
-                            pass
-            except Exception as e:
-                app.logger.error(f"Sonuç dosyası okuma hatası: {str(e)}")
-        
-        # Tüm detayları döndür
-        return jsonify({
-            'success': True,
-            'log': {
-                'id': log['id'],
-                'timestamp': log['timestamp'],
-                'files': log['files'],
-                'prompt_type': log['prompt_type'],
-                'success': bool(log['success']),
-                'result_file': log['result_file'],
-                'notes': log['notes'] or '',
-                'tags': json.loads(log['tags']) if log['tags'] else [],
-                'starred': bool(log['starred'])
-            },
-            'result_content': result_content
-        })
+        fingerprint = (tuple(log), result_file_signature(log['result_file']))
+        return cached_json_response(('log-details', log_id), fingerprint,
+                                    lambda: build_log_details(db, log))
     except Exception as e:
         app.logger.error(f"İşlem detayları alınırken hata: {str(e)}")
         return jsonify({
@@ -1028,6 +1407,50 @@ def get_log_details(log_id):
             'message': f'İşlem detayları alınırken bir hata oluştu: {str(e)}'
         }), 500
 
+def build_log_details(db, log):
+    """İşlem detaylarının API yanıtını oluştur"""
+    # İşin zaman çizelgesi (span ağacı)
+    trace = None
+    if log['trace_length']:
+        row = db.execute('SELECT trace FROM processing_logs WHERE id = ?', (log['id'],)).fetchone()
+        try:
+            trace = json.loads(decode_content(row['trace'])) if row and row['trace'] else None
+        except ValueError:
+            pass
+    
+    # Sonuç dosyasını oku (varsa)
+    result_content = None
+    if log['result_file']:
+        try:
+            result_content = read_result_file(log['result_file'])
+            if result_content is not None:
+                # JSON içeriği ise parse et
+                if log['result_file'].endswith('.json'):
+                    try:
+                        result_content = json.loads(result_content)
+                    except:
+                        pass
+        except Exception as e:
+            app.logger.error(f"Sonuç dosyası okuma hatası: {str(e)}")
+    
+    # Tüm detayları döndür
+    return {
+        'success': True,
+        'log': {
+            'id': log['id'],
+            'timestamp': log['timestamp'],
+            'files': log['files'],
+            'prompt_type': log['prompt_type'],
+            'success': bool(log['success']),
+            'result_file': log['result_file'],
+            'notes': log['notes'] or '',
+            'tags': json.loads(log['tags']) if log['tags'] else [],
+            'starred': bool(log['starred'])
+        },
+        'result_content': result_content,
+        'trace': trace
+    }
+
 @app.route('/api/generate-image', methods=['POST'])
 def generate_image():
     """Generate images using Gemini API"""
@@ -1035,6 +1458,7 @@ def generate_image():
     prompt = data.get('prompt', '')
     num_images = int(data.get('num_images', 1))
     aspect_ratio = data.get('aspect_ratio', '1:1')
+    run_async = data.get('async', False)
     
     if not prompt:
         app.logger.warning("Empty prompt received")
@@ -1049,44 +1473,19 @@ def generate_image():
     # Initialize services
     init_services()
     
-    try:
-        app.logger.info(f"Generating image with prompt: {prompt[:50]}...")
-        
-        # Generate images
-        result = imagen_api.generate_image(prompt, num_images, aspect_ratio)
-        
-        if not result.get('success'):
-            error_msg = result.get('message', 'Unknown error')
-            app.logger.error(f"Image generation failed: {error_msg}")
-            return jsonify({
-                'success': False,
-                'message': f"Görsel oluşturma başarısız: {error_msg}"
-            }), 400
-        
-        if not result.get('images'):
-            app.logger.error("No images generated")
-            return jsonify({
-                'success': False,
-                'message': 'Görsel oluşturulamadı'
-            }), 400
-            
-        # Save images
-        app.logger.info(f"Saving {len(result['images'])} images")
-        saved_paths = imagen_api.save_generated_images(
-            result['images'],
-            app.config['RESULTS_FOLDER'],
-            "imagen"
-        )
-        
-        download_urls = [f"/download/{os.path.basename(path)}" for path in saved_paths]
-        
+    if run_async:
+        job_id = job_manager.submit('generate_image', run_image_generation,
+                                    prompt, num_images, aspect_ratio, app.config['RESULTS_FOLDER'])
         return jsonify({
             'success': True,
-            'message': f"{len(saved_paths)} görsel başarıyla oluşturuldu",
-            'image_count': len(saved_paths),
-            'download_urls': download_urls
-        })
-        
+            'message': 'Görsel oluşturma işi kuyruğa alındı',
+            'job_id': job_id,
+            'status_url': f"/api/jobs/{job_id}"
+        }), 202
+    
+    try:
+        result = run_image_generation(prompt, num_images, aspect_ratio, app.config['RESULTS_FOLDER'])
+        return jsonify(result), 200 if result.get('success') else 400
     except Exception as e:
         app.logger.error(f"Error in generate_image: {str(e)}")
         return jsonify({
@@ -1094,6 +1493,176 @@ def generate_image():
             'message': f"Görsel oluşturma hatası: {str(e)}"
         }), 500
 
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancel a running or queued job"""
+    init_services()
+    if not job_manager.cancel(job_id):
+        return jsonify({
+            'success': False,
+            'message': 'İptal edilecek aktif bir iş bulunamadı'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'message': 'İş iptal ediliyor',
+        'job_id': job_id
+    })
+
+@app.route('/api/jobs/<job_id>')
+def get_job_status(job_id):
+    """Get the status of a background job"""
+    init_services()
+    job = job_manager.get_job(job_id)
+    
+    if not job:
+        return jsonify({
+            'success': False,
+            'message': 'İş bulunamadı'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'job': job
+    })
+
+@app.route('/api/storage/gc', methods=['POST'])
+def storage_gc_api():
+    """Run storage garbage collection now (use dry_run to only report)"""
+    data = request.get_json(silent=True) or {}
+    try:
+        stats = run_storage_gc(dry_run=bool(data.get('dry_run', False)))
+        return jsonify({
+            'success': True,
+            'message': 'Simülasyon tamamlandı' if stats['dry_run'] else 'Depolama temizliği tamamlandı',
+            'stats': stats
+        })
+    except Exception as e:
+        app.logger.error(f"Depolama temizliği hatası: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'Depolama temizliği sırasında hata oluştu: {str(e)}'
+        }), 500
+
+def run_storage_gc(dry_run=False):
+    """Eski/sahipsiz dosyaları sil, eski kayıtları arşivle ve istatistikleri döndür (app context gerekir)"""
+    config = app.config
+    now = datetime.datetime.now()
+    batch_size = config.get('STORAGE_GC_BATCH_SIZE', 500)
+    max_batches = config.get('STORAGE_GC_MAX_BATCHES', 20)
+    upload_max_age = config.get('UPLOAD_RETENTION_HOURS', 24) * 3600
+    stats = {'dry_run': dry_run}
+    
+    # Yüklenen dosyalar yalnızca işlem süresince gerekir; çalışan veya devam ettirilebilecek işlerinkiler korunur
+    upload_entries = select_expired_files(
+        scan_files(config['UPLOAD_FOLDER']),
+        max_age=upload_max_age,
+        max_bytes=config.get('UPLOAD_FOLDER_MAX_BYTES'),
+        referenced=get_job_file_names()
+    )
+    stats['uploads_deleted'], stats['upload_bytes_freed'] = delete_files(upload_entries, dry_run)
+    
+    # Tamamlanmayan parçalı yüklemeler son parçadan itibaren aynı süre saklanır
+    stats['upload_sessions_deleted'], stats['upload_session_bytes_freed'] = chunked_uploads.cleanup(
+        upload_max_age, dry_run) if chunked_uploads is not None else (0, 0)
+    
+    # Sonuç dosyaları: yalnızca veritabanında kaydı olmayanlar bekleme/saklama süresinden veya boyut sınırından sonra silinir
+    result_files = scan_files(config['RESULTS_FOLDER'])
+    retention_days = config.get('RESULT_RETENTION_DAYS')
+    result_entries = select_expired_files(
+        result_files,
+        max_age=retention_days * 86400 if retention_days else None,
+        max_bytes=config.get('RESULTS_FOLDER_MAX_BYTES'),
+        referenced=get_referenced_result_files(entry['name'] for entry in result_files),
+        orphan_grace=config.get('RESULT_ORPHAN_GRACE_HOURS', 24) * 3600
+    )
+    stats['results_deleted'], stats['result_bytes_freed'] = delete_files(result_entries, dry_run)
+    
+    # Kaynağı silinen görsellerin küçük resimleri
+    thumbnail_folder = config.get('THUMBNAIL_FOLDER', os.path.join(config['RESULTS_FOLDER'], 'thumbnails'))
+    stats['thumbnails_deleted'], stats['thumbnail_bytes_freed'] = delete_files(
+        select_orphan_thumbnails(thumbnail_folder, config['RESULTS_FOLDER']), dry_run)
+    
+    # Yüklenen dosyaları silinmiş işler devam ettirilemez; checkpoint'leri de aynı sürede temizle
+    stats['checkpoints_deleted'] = delete_stale_checkpoints(
+        now - datetime.timedelta(seconds=upload_max_age), batch_size, max_batches, dry_run)
+    
+    archive_days = config.get('LOG_ARCHIVE_AFTER_DAYS')
+    stats['logs_archived'] = archive_old_logs(
+        now - datetime.timedelta(days=archive_days), batch_size, max_batches, dry_run) if archive_days else 0
+    
+    archive_retention_days = config.get('ARCHIVE_RETENTION_DAYS')
+    stats['archived_purged'] = purge_archived_records(
+        now - datetime.timedelta(days=archive_retention_days), batch_size, max_batches, dry_run) if archive_retention_days else 0
+    
+    app.logger.info(f"Depolama temizliği{' (simülasyon)' if dry_run else ''}: {stats}")
+    return stats
+
+def start_storage_gc():
+    """Depolama temizliğini arka planda periyodik olarak çalıştır"""
+    interval = app.config.get('STORAGE_GC_INTERVAL', 3600)
+    if not interval:
+        return None
+    
+    def loop():
+        while not storage_gc_stop.wait(interval):
+            try:
+                with app.app_context():
+                    run_storage_gc()
+            except Exception as e:
+                app.logger.error(f"Depolama temizliği hatası: {str(e)}")
+    
+    thread = threading.Thread(target=loop, name='storage-gc', daemon=True)
+    thread.start()
+    return thread
+
+def run_image_generation(prompt, num_images, aspect_ratio, results_folder):
+    """Görselleri oluştur, kaydet ve yanıt verisini döndür"""
+    logger.info(f"Generating image with prompt: {prompt[:50]}...")
+    
+    # Generate images
+    result = imagen_api.generate_image(prompt, num_images, aspect_ratio)
+    
+    if not result.get('success'):
+        error_msg = result.get('message', 'Unknown error')
+        logger.error(f"Image generation failed: {error_msg}")
+        return {
+            'success': False,
+            'message': f"Görsel oluşturma başarısız: {error_msg}"
+        }
+    
+    if not result.get('images'):
+        logger.error("No images generated")
+        return {
+            'success': False,
+            'message': 'Görsel oluşturulamadı'
+        }
+    
+    # Önbellekten gelen görseller daha önce kaydedildiyse (ve silinmediyse) aynı dosyalar döndürülür
+    saved_paths = result.get('saved_paths')
+    if not saved_paths or not all(os.path.dirname(path) == results_folder and os.path.isfile(path)
+                                  for path in saved_paths):
+        # Save images
+        logger.info(f"Saving {len(result['images'])} images (cached: {result.get('cached', False)})")
+        saved_paths = imagen_api.save_generated_images(
+            result['images'],
+            results_folder,
+            "imagen"
+        )
+        imagen_api.remember_saved_paths(result.get('cache_key'), saved_paths)
+    
+    download_urls = [f"/download/{os.path.basename(path)}" for path in saved_paths]
+    thumbnail_urls = [f"/thumbnail/{os.path.basename(path)}" for path in saved_paths]
+    
+    return {
+        'success': True,
+        'message': f"{len(saved_paths)} görsel başarıyla oluşturuldu",
+        'image_count': len(saved_paths),
+        'download_urls': download_urls,
+        'thumbnail_urls': thumbnail_urls,
+        'cached': result.get('cached', False)
+    }
+
 
 def process_vision_file(file_name, file_path, api, prompt, result_data):
     """Görsel dosyasını işle"""
@@ -1102,7 +1671,8 @@ def process_vision_file(file_name, file_path, api, prompt, result_data):
         'text': f"Görüntü işleniyor: {file_name} (Vision API kullanılıyor)"
     })
     
-    api_response = api.generate_vision_response(prompt, file_path)
+    api_response = call_llm(api.generate_vision_response, prompt, file_path,
+                            job_id=result_data.get('job_id'), image=file_name)
     
     if api_response.get('success'):
         result_data['messages'].append({
@@ -1120,9 +1690,181 @@ def process_vision_file(file_name, file_path, api, prompt, result_data):
         })
     return None
 
+@trace_span('vision_batch')
+def process_vision_batch(batch, files_by_path, api, prompt, result_data):
+    """Bir görsel paketini tek vision isteğiyle işle, başarısız olursa tek tek işle"""
+    vision_responses = {}
+    batch_names = [files_by_path[path].get('name') for path in batch]
+    
+    if len(batch) > 1 and hasattr(api, 'generate_batch_vision_response'):
+        result_data['messages'].append({
+            'type': 'info',
+            'text': f"{len(batch)} görsel tek istekte işleniyor: {', '.join(batch_names)}"
+        })
+        
+        api_response = call_llm(api.generate_batch_vision_response, prompt, batch,
+                                job_id=result_data.get('job_id'), images=len(batch))
+        
+        if api_response.get('success'):
+            for path, file_name, content in zip(batch, batch_names, api_response['contents']):
+                vision_responses[path] = {
+                    'file_name': file_name,
+                    'content': content
+                }
+            result_data['messages'].append({
+                'type': 'success',
+                'text': f"Toplu görsel analizi başarıyla tamamlandı: {', '.join(batch_names)}"
+            })
+            return vision_responses
+        
+        result_data['messages'].append({
+            'type': 'warning',
+            'text': f"Toplu görsel analizi başarısız, görseller tek tek işlenecek: {api_response.get('message', 'Bilinmeyen hata')}"
+        })
+    
+    for path, file_name in zip(batch, batch_names):
+        vision_responses[path] = process_vision_file(file_name, path, api, prompt, result_data)
+    
+    return vision_responses
+
+@timed('process_vision_images')
+@trace_span('vision_images')
+def process_vision_images(image_files, api, prompt, result_data, batch_size):
+    """Görselleri paketlere ayırıp vision isteklerini eşzamanlı gönder"""
+    vision_responses = {}
+    files_by_path = {f.get('path'): f for f in image_files}
+    resume_key = result_data.get('resume_key')
+    
+    # Önceki denemede analiz edilmiş görselleri checkpoint'ten al
+    pending_paths = []
+    for path, file in files_by_path.items():
+        content = get_chunk_checkpoint(resume_key, f"vision:{path}") if resume_key else None
+        if content is not None:
+            vision_responses[path] = {
+                'file_name': file.get('name'),
+                'content': content
+            }
+        else:
+            pending_paths.append(path)
+    
+    current_span().set(images=len(files_by_path), checkpoint=len(vision_responses) or None)
+    if not pending_paths:
+        return vision_responses
+    
+    max_bytes = app.config.get('VISION_BATCH_MAX_BYTES', 8 * 1024 * 1024)
+    batches = pack_image_batches(pending_paths, batch_size, max_bytes)
+    current_span().set(batches=len(batches))
+    
+    max_workers = min(app.config.get('VISION_MAX_WORKERS', 4), len(batches)) or 1
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(propagate(process_vision_batch), batch, files_by_path, api, prompt, result_data)
+                   for batch in batches]
+        for future in futures:
+            batch_responses = future.result()
+            for path, vision_response in batch_responses.items():
+                if vision_response is None:
+                    result_data['failed_chunks'] = result_data.get('failed_chunks', 0) + 1
+                elif resume_key:
+                    save_chunk_checkpoint(resume_key, f"vision:{path}", vision_response['content'])
+            vision_responses.update(batch_responses)
+    
+    return vision_responses
+
+def get_request_user():
+    """Adil sıralama için isteği yapan kullanıcıyı belirle"""
+    return request.headers.get('X-User-Id') or request.remote_addr
+
+def get_job_priority(files, requested_priority=None):
+    """İşin önceliğini belirle: küçük işler etkileşimli, büyük işler toplu sayılır"""
+    if requested_priority == 'interactive':
+        return PRIORITY_INTERACTIVE
+    if requested_priority == 'bulk':
+        return PRIORITY_BULK
+    
+    total_size = 0
+    for file in files:
+        try:
+            total_size += os.path.getsize(file.get('path'))
+        except (OSError, TypeError):
+            pass
+    
+    if len(files) <= app.config.get('INTERACTIVE_JOB_MAX_FILES', 2) and \
+            total_size <= app.config.get('INTERACTIVE_JOB_MAX_BYTES', 512 * 1024):
+        return PRIORITY_INTERACTIVE
+    return PRIORITY_BULK
+
+def build_resume_key(files, prompt, model, processing_mode, use_vision):
+    """İstek parametrelerinden tekrarlanabilir bir checkpoint (devam) anahtarı üret"""
+    file_signatures = []
+    for file in files:
+        path = file.get('path')
+        try:
+            stat = os.stat(path)
+            file_signatures.append([path, stat.st_size, stat.st_mtime])
+        except (OSError, TypeError):
+            file_signatures.append([path])
+    
+    raw = json.dumps([file_signatures, prompt, model, processing_mode, bool(use_vision)], ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]
+
+def generate_checkpointed_response(api, prompt, text, result_data, chunk_key):
+    """Parça yanıtını checkpoint'ten al; yoksa API'yi çağırıp sonucu kaydet"""
+    job_id = result_data.get('job_id')
+    resume_key = result_data.get('resume_key')
+    if resume_key:
+        content = get_chunk_checkpoint(resume_key, chunk_key)
+        if content is not None:
+            current_span().set(checkpoint=True)
+            return {
+                'success': True,
+                'content': content,
+                'from_checkpoint': True
+            }
+    
+    api_response = call_llm(api.generate_response, prompt, text, job_id=job_id,
+                            bytes_in=len(text.encode('utf-8')))
+    
+    if api_response.get('success'):
+        if resume_key:
+            save_chunk_checkpoint(resume_key, chunk_key, api_response.get('content'))
+    else:
+        result_data['failed_chunks'] = result_data.get('failed_chunks', 0) + 1
+    
+    return api_response
+
+def call_llm(func, *args, job_id=None, **attributes):
+    """LLM çağrısını zamanlayıcı üzerinden yap ve iş zaman çizelgesine ekle"""
+    with trace_span('llm_call', operation=func.__name__, **attributes) as llm_span:
+        api_response = job_manager.call(func, *args, job_id=job_id)
+        
+        content = api_response.get('content')
+        usage = api_response.get('usage') or {}
+        llm_span.set(success=bool(api_response.get('success')),
+                     bytes_out=len(content.encode('utf-8')) if isinstance(content, str) else None,
+                     prompt_tokens=usage.get('prompt_tokens'),
+                     completion_tokens=usage.get('completion_tokens'))
+        return api_response
+
+def get_file_size(file_path):
+    try:
+        return os.path.getsize(file_path)
+    except (OSError, TypeError):
+        return None
+
+def extract_chunks(data_processor, file_path, file_type):
+    """Dosyadan metin parçalarını çıkar ve zaman çizelgesine ekle"""
+    with trace_span('extract', type=file_type) as extract_span:
+        # Parçalı yüklemede önceden çıkarılmış metin varsa dosya yeniden okunmaz
+        chunks = prepared_extractions.get(file_path) if prepared_extractions is not None else None
+        extract_span.set(prepared=chunks is not None)
+        if chunks is None:
+            chunks = data_processor.process_file(file_path, file_type)
+        extract_span.set(chunks=len(chunks), chars=sum(len(chunk) for chunk in chunks))
+        return chunks
+
 def process_text_file(file_name, file_path, file_type, data_processor, result_data):
     """Metin dosyasını işle"""
-    chunks = data_processor.process_file(file_path, file_type)
+    chunks = extract_chunks(data_processor, file_path, file_type)
     if not chunks:
         result_data['messages'].append({
             'type': 'warning',
@@ -1146,14 +1888,16 @@ def process_combined_content(content, api, prompt, is_qa, is_summary, is_custom,
         'text': "Tüm içerik birleştirildi, işleniyor..."
     })
     
-    api_response = api.generate_response(prompt, content)
+    with trace_span('chunk', key="combined", bytes=len(content.encode('utf-8'))):
+        api_response = generate_checkpointed_response(api, prompt, content, result_data, "combined")
     
     if api_response.get('success'):
         content = api_response.get('content')
         
         if is_qa:
             try:
-                extracted_json = api.extract_json(content)
+                with timed('parse_qa_json'), trace_span('parse'):
+                    extracted_json = api.extract_json(content)
                 if extracted_json and "soru-cevaplar" in extracted_json:
                     all_results["soru-cevaplar"] = extracted_json["soru-cevaplar"]
                     
@@ -1179,8 +1923,10 @@ def process_combined_content(content, api, prompt, is_qa, is_summary, is_custom,
     # Sonucu döndür
     return content if api_response.get('success') else None
 
+@timed('process_single_file')
 def process_single_file(file, file_index, files, use_vision, api, prompt, data_processor, 
-                       is_summary, is_custom, is_qa, result_data, all_results, combined_text, vision_results):
+                       is_summary, is_custom, is_qa, result_data, all_results, combined_text, vision_results,
+                       batched_vision=None):
     """Tek bir dosyayı işle"""
     file_path = file.get('path')
     file_name = file.get('name')
@@ -1191,19 +1937,33 @@ def process_single_file(file, file_index, files, use_vision, api, prompt, data_p
         'text': f"Dosya işleniyor: {file_name}"
     })
     
+    with trace_span('file', file=file_name, type=file_type, bytes=get_file_size(file_path)):
+        process_file_content(file_path, file_name, file_type, file_index, files, use_vision, api, prompt,
+                             data_processor, is_summary, is_custom, is_qa, result_data, all_results,
+                             combined_text, vision_results, batched_vision)
+
+def process_file_content(file_path, file_name, file_type, file_index, files, use_vision, api, prompt,
+                         data_processor, is_summary, is_custom, is_qa, result_data, all_results,
+                         combined_text, vision_results, batched_vision):
+    """Dosyayı vision veya metin çıkarma yoluyla işle"""
     if use_vision and file_type == 'image':
-        vision_response = process_vision_file(file_name, file_path, api, prompt, result_data)
+        if batched_vision is not None:
+            vision_response = batched_vision.get(file_path)
+        else:
+            vision_response = process_vision_file(file_name, file_path, api, prompt, result_data)
         if vision_response:
             vision_results.append(vision_response)
             process_vision_result(vision_response, is_summary, is_custom, is_qa, 
-                                combined_text, all_results, result_data, api)
+                                combined_text, all_results, result_data)
     else:
-        chunks = data_processor.process_file(file_path, file_type)
+        chunks = extract_chunks(data_processor, file_path, file_type)
         if chunks:
             process_text_chunks(chunks, file_index, len(files), prompt, api, 
                               is_summary, is_custom, is_qa, combined_text, 
                               all_results, result_data)
 
+@timed('create_final_result')
+@trace_span('merge')
 def create_final_result(is_summary, is_custom, is_qa, combined_text, all_results, vision_results, 
                        api, prompt, processing_mode, output_format, results_folder, result_data):
     """Son işlemleri yap ve sonucu oluştur"""
@@ -1211,7 +1971,8 @@ def create_final_result(is_summary, is_custom, is_qa, combined_text, all_results
         final_content = result_data.get('combined_text', combined_text)
         if final_content:
             if processing_mode != 'combined':
-                api_response = api.generate_response(prompt, final_content)
+                # Son özet en pahalı çağrıdır; tekrar denemede parçalarla birlikte checkpoint'ten alınır
+                api_response = generate_checkpointed_response(api, prompt, final_content, result_data, "final")
                 if api_response.get('success'):
                     final_content = api_response.get('content')
                 else:
@@ -1245,29 +2006,139 @@ def create_final_result(is_summary, is_custom, is_qa, combined_text, all_results
             'text': "İşlenecek sonuç bulunamadı!"
         })
 
+@timed('log_successful_processing')
 def log_successful_processing(files, prompt_type, result_data):
     """Başarılı işlem loglaması yap"""
     file_names = [file.get('name') for file in files]
     result_file = result_data['results'].get('filename', None)
     
-    # İşlemi loglama
-    log_processing(file_names, prompt_type, True, result_file)
+    # İşlem kaydı, sonuç, etiketler ve checkpoint temizliği tek transaction'da yazılır
+    try:
+        with transaction():
+            log_id = log_processing(file_names, prompt_type, True, result_file, trace=get_trace_json())
+            save_processing_result(result_data, prompt_type, file_names, log_id)
+            
+            # Sonuç yalnızca tüm parçalar tamamlandığında kaydedilir; checkpoint'ler artık gerekli değil
+            if result_data.get('resume_key'):
+                delete_chunk_checkpoints(result_data['resume_key'])
+    except Exception as e:
+        # Kayıt yazılamadıysa iş başarılı sayılmaz; checkpoint'ler geri alındığı için istek tekrarlanabilir
+        app.logger.error(f"Sonuç kaydedilirken hata: {str(e)}")
+        result_data['success'] = False
+        result_data['resumable'] = True
+        result_data['message'] = (f"Sonuç kaydedilemedi: {str(e)}. "
+                                  "İsteği tekrarladığınızda tamamlanan parçalar yeniden işlenmez.")
+        result_data['messages'].append({'type': 'error', 'text': result_data['message']})
+        return
+    
+    app.logger.info(f"Logged successful processing: {prompt_type}, files: {file_names}")
     
-    # Veritabanını yedekle
+    # TXT/JSON sonuç dosyası veritabanındaki içeriğin kopyasıdır; iki kez saklamamak için sil
+    if result_file and app.config.get('RESULT_FILES_IN_DB', True) and result_file.lower().endswith(DB_RESULT_EXTENSIONS):
+        try:
+            os.remove(os.path.join(app.config['RESULTS_FOLDER'], result_file))
+        except OSError as e:
+            app.logger.warning(f"Sonuç dosyası silinemedi: {str(e)}")
+    
+    # Veritabanını yedekle (commit sonrası, transaction dışında)
     backup_database()
     
-    app.logger.info(f"Logged successful processing: {prompt_type}, files: {file_names}")
+    if result_data['results'].get('type') == 'qa_pairs':
+        schedule_dataset_update()
+
+# Soru-cevap işleri bittikçe yeni çiftler arka planda veri setine eklenir (DATASET_DIR ayarlıysa).
+# Aynı anda en fazla bir güncelleme çalışır ve bir tane bekler; bekleyen güncelleme o ana kadarki tüm işleri kapsar.
+dataset_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dataset')
+dataset_lock = threading.Lock()
+dataset_update_queued = False
+
+def schedule_dataset_update():
+    """Veri seti güncellemesini kuyruğa al (zaten bekleyen varsa yeni iş eklenmez)"""
+    global dataset_update_queued
+    if not app.config.get('DATASET_DIR'):
+        return
+    
+    with dataset_lock:
+        if dataset_update_queued:
+            return
+        dataset_update_queued = True
+    dataset_executor.submit(run_dataset_update)
+
+def run_dataset_update():
+    """Son güncellemeden sonra kaydedilen soru-cevap sonuçlarını veri setine ekle"""
+    global dataset_update_queued
+    with dataset_lock:
+        dataset_update_queued = False
     
-    # Sonucu veritabanına kaydet
+    config = app.config
     try:
-        save_processing_result(result_data, prompt_type, file_names)
+        with app.app_context():
+            builder = DatasetBuilder(config['DATASET_DIR'], config.get('DATASET_FORMAT', 'chat'),
+                                     config.get('DATASET_SHARD_SIZE', 10000), config.get('DATASET_VALIDATION_RATIO', 0.05),
+                                     config.get('DATASET_SYSTEM_PROMPT'))
+            stats = builder.update(get_db(read_only=True))
+        app.logger.info(f"Veri seti güncellendi: {stats}")
     except Exception as e:
-        app.logger.error(f"Sonuç kaydedilirken hata: {str(e)}")
+        app.logger.error(f"Veri seti güncelleme hatası: {str(e)}")
+
+def get_trace_json():
+    """Etkin işin zaman çizelgesini kayıt için serileştir"""
+    trace = current_trace()
+    return trace.to_json() if trace else None
+
+def result_file_signature(filename):
+    """Sonuç dosyasının değişip değişmediğini anlamaya yeten özet (dosya ise boyut/mtime, değilse kayıt id'si)"""
+    if not filename:
+        return None
+    try:
+        stat = os.stat(os.path.join(app.config['RESULTS_FOLDER'], secure_filename(filename)))
+        return ('file', stat.st_size, stat.st_mtime_ns)
+    except FileNotFoundError:
+        return ('db', get_result_id_by_file(filename))
+
+def cached_json_response(key, fingerprint, build):
+    """
+    JSON yanıtını önbellekten veya build() ile oluşturup koşullu ve sıkıştırılmış olarak döndür
+
+    Yanıt gövdesinin özetinden güçlü bir ETag üretilir; If-None-Match eşleşirse 304 döner.
+    Gövde aynı fingerprint ile tekrar istendiğinde yeniden okunmaz ve serileştirilmez.
+    """
+    cached = response_cache.get(key, fingerprint)
+    if cached is None:
+        cached = response_cache.put(key, fingerprint, app.json.dumps(build()).encode('utf-8'))
+    
+    encoding = negotiate_encoding(request.accept_encodings, len(cached.body),
+                                  app.config.get('RESPONSE_COMPRESSION_MIN_SIZE', 1024))
+    response = Response(cached.encode(encoding) if encoding else cached.body, mimetype='application/json')
+    # Her gösterimin (sıkıştırılmış/ham) kendi ETag'i olur
+    response.set_etag(f"{cached.etag}-{encoding}" if encoding else cached.etag)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.no_cache = True
+    response.cache_control.private = True
+    return response.make_conditional(request)
+
+def read_result_file(filename):
+    """Sonuç dosyasını diskten, yoksa veritabanındaki kaydından oku"""
+    file_path = os.path.join(app.config['RESULTS_FOLDER'], secure_filename(filename))
+    if os.path.exists(file_path):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    
+    content = get_result_content_by_file(filename)
+    if content is not None and filename.endswith('.json'):
+        # Dosyaya yazılan biçimle aynı olması için JSON'u girintili döndür
+        try:
+            content = json.dumps(json.loads(content), ensure_ascii=False, indent=2)
+        except ValueError:
+            pass
+    return content
 
 def log_error_and_return(error, files, prompt_type):
     """Hata durumunu logla"""
     file_names = [file.get('name') for file in files]
-    log_processing(file_names, prompt_type, False)
+    log_processing(file_names, prompt_type, False, trace=get_trace_json())
     app.logger.error(f"Failed processing: {prompt_type}, files: {file_names}, error: {str(error)}")
 
 def create_summary_result(content, filename, vision_results):
@@ -1367,34 +2238,36 @@ def process_text_chunks(chunks, file_index, total_files, prompt, api, is_summary
                        combined_text, all_results, result_data):
     """Metin parçalarını işle"""
     for chunk_index, chunk in enumerate(chunks):
-        result_data['messages'].append({
-            'type': 'info',
-            'text': f"Bölüm {chunk_index + 1}/{len(chunks)} işleniyor... (Dosya: {file_index + 1}/{total_files})"
-        })
-        
-        if is_summary:
-            # combined_text yerine result_data kullanımı
-            if 'combined_text' not in result_data:
-                result_data['combined_text'] = ""
-            result_data['combined_text'] += chunk + "\n\n"
-        else:
-            api_response = api.generate_response(prompt, chunk)
+        with trace_span('chunk', key=f"{file_index}:{chunk_index}", bytes=len(chunk.encode('utf-8'))):
+            result_data['messages'].append({
+                'type': 'info',
+                'text': f"Bölüm {chunk_index + 1}/{len(chunks)} işleniyor... (Dosya: {file_index + 1}/{total_files})"
+            })
             
-            if api_response.get('success'):
-                content = api_response.get('content')
-                
-                if is_custom:
-                    # combined_text yerine result_data kullanımı
-                    if 'combined_text' not in result_data:
-                        result_data['combined_text'] = ""
-                    result_data['combined_text'] += (result_data['combined_text'] and "\n\n" or "") + content
-                elif is_qa:
-                    process_qa_content(content, all_results, result_data)
+            if is_summary:
+                # combined_text yerine result_data kullanımı
+                if 'combined_text' not in result_data:
+                    result_data['combined_text'] = ""
+                result_data['combined_text'] += chunk + "\n\n"
             else:
-                result_data['messages'].append({
-                    'type': 'error',
-                    'text': f"API hatası: {api_response.get('message')}"
-                })
+                api_response = generate_checkpointed_response(api, prompt, chunk, result_data,
+                                                              f"{file_index}:{chunk_index}")
+            
+                if api_response.get('success'):
+                    content = api_response.get('content')
+                
+                    if is_custom:
+                        # combined_text yerine result_data kullanımı
+                        if 'combined_text' not in result_data:
+                            result_data['combined_text'] = ""
+                        result_data['combined_text'] += (result_data['combined_text'] and "\n\n" or "") + content
+                    elif is_qa:
+                        process_qa_content(content, all_results, result_data)
+                else:
+                    result_data['messages'].append({
+                        'type': 'error',
+                        'text': f"API hatası: {api_response.get('message')}"
+                    })
         
         # Calculate progress
         file_progress = ((file_index + 1) / total_files) * 100
@@ -1406,6 +2279,8 @@ def process_text_chunks(chunks, file_index, total_files, prompt, api, is_summary
         })
 
 
+@timed('parse_qa_json')
+@trace_span('parse')
 def process_qa_content(content, all_results, result_data):
     """Soru-cevap içeriğini işle"""
     try:
@@ -1449,79 +2324,45 @@ def process_qa_content(content, all_results, result_data):
             'text': f"JSON çıkarma hatası: {str(e)}"
         })
 
-def save_processing_result(result_data, prompt_type, file_names):
-    """İşlem sonucunu veritabanına kaydet"""
-    try:
-        result_type = result_data['results'].get('type')
-        content = result_data['results'].get('content')
+def save_processing_result(result_data, prompt_type, file_names, processing_log_id=None):
+    """İşlem sonucunu veritabanına kaydet (hata çağırana iletilir, transaction geri alınır)"""
+    result_type = result_data['results'].get('type')
+    content = result_data['results'].get('content')
+    
+    # dict tipini JSON string'e çevir
+    if isinstance(content, dict):
+        content = json.dumps(content, ensure_ascii=False)
         
-        # dict tipini JSON string'e çevir
-        if isinstance(content, dict):
-            content = json.dumps(content, ensure_ascii=False)
-            
-        save_result(
-            title=f"{prompt_type} - {file_names[0] if file_names else 'İsimsiz'}",
-            description=f"İşlem sonucu: {result_type}",
-            result_type=result_type,
-            content=content,
-            source_file=result_data['results'].get('filename'),
-            processing_log_id=None,
-            tags=[]
-        )
-    except Exception as e:
-        app.logger.error(f"Sonuç kaydedilirken hata: {str(e)}")
+    return save_result(
+        title=f"{prompt_type} - {file_names[0] if file_names else 'İsimsiz'}",
+        description=f"İşlem sonucu: {result_type}",
+        result_type=result_type,
+        content=content,
+        source_file=result_data['results'].get('filename'),
+        processing_log_id=processing_log_id,
+        tags=[]
+    )
 
 @app.route('/api/saved-results/<int:result_id>', methods=['GET'])
 def get_saved_result(result_id):
     """Get details of a saved result"""
     try:
-        db = get_db()
-        result = db.execute('SELECT * FROM saved_results WHERE id = ?', (result_id,)).fetchone()
+        db = get_db(read_only=True)
+        # Kayıtlar oluşturulduktan sonra değişmez; yalnızca bağlı işlemin etiketleri değişebilir
+        row = db.execute('''
+            SELECT s.updated_at, l.tags FROM saved_results s
+            LEFT JOIN processing_logs l ON l.id = s.processing_log_id
+            WHERE s.id = ?
+        ''', (result_id,)).fetchone()
         
-        if not result:
+        if not row:
             return jsonify({
                 'success': False,
                 'message': 'Sonuç bulunamadı'
             }), 404
         
-        # Sonuç verilerini sözlüğe dönüştür
-        result_data = dict(result)
-        
-        # Content JSON ise parse et
-        if isinstance(result_data['content'], str):
-            try:
-                if result_data['content'].startswith('{') or result_data['content'].startswith('['):
-                    result_data['content'] = json.loads(result_data['content'])
-            except json.JSONDecodeError:
-                # JSON olarak parse edilemezse string olarak bırak
-                pass
-        
-        # Etiketleri al
-        tags = []
-        if result_data['processing_log_id']:
-            log = db.execute('SELECT tags FROM processing_logs WHERE id = ?', 
-                           (result_data['processing_log_id'],)).fetchone()
-            if log and log['tags']:
-                try:
-                    tags = json.loads(log['tags'])
-                except:
-                    tags = []
-        
-        return jsonify({
-            'success': True,
-            'result': {
-                'id': result_data['id'],
-                'title': result_data['title'],
-                'description': result_data['description'],
-                'result_type': result_data['result_type'],
-                'content': result_data['content'],
-                'source_file': result_data['source_file'],
-                'created_at': result_data['created_at'],
-                'updated_at': result_data['updated_at'],
-                'processing_log_id': result_data['processing_log_id'],
-                'tags': tags
-            }
-        })
+        return cached_json_response(('saved-result', result_id), tuple(row),
+                                    lambda: build_saved_result(db, result_id))
     except Exception as e:
         app.logger.error(f"Sonuç detayları alınırken hata: {str(e)}")
         return jsonify({
@@ -1529,6 +2370,50 @@ def get_saved_result(result_id):
             'message': f'Sonuç detayları alınırken bir hata oluştu: {str(e)}'
         }), 500
 
+def build_saved_result(db, result_id):
+    """Kayıtlı sonucun API yanıtını oluştur"""
+    result = db.execute('SELECT * FROM saved_results WHERE id = ?', (result_id,)).fetchone()
+    
+    # Sonuç verilerini sözlüğe dönüştür
+    result_data = dict(result)
+    
+    # Content JSON ise parse et
+    result_data['content'] = decode_content(result_data['content'])
+    if isinstance(result_data['content'], str):
+        try:
+            if result_data['content'].startswith('{') or result_data['content'].startswith('['):
+                result_data['content'] = json.loads(result_data['content'])
+        except json.JSONDecodeError:
+            # JSON olarak parse edilemezse string olarak bırak
+            pass
+    
+    # Etiketleri al
+    tags = []
+    if result_data['processing_log_id']:
+        log = db.execute('SELECT tags FROM processing_logs WHERE id = ?', 
+                       (result_data['processing_log_id'],)).fetchone()
+        if log and log['tags']:
+            try:
+                tags = json.loads(log['tags'])
+            except:
+                tags = []
+    
+    return {
+        'success': True,
+        'result': {
+            'id': result_data['id'],
+            'title': result_data['title'],
+            'description': result_data['description'],
+            'result_type': result_data['result_type'],
+            'content': result_data['content'],
+            'source_file': result_data['source_file'],
+            'created_at': result_data['created_at'],
+            'updated_at': result_data['updated_at'],
+            'processing_log_id': result_data['processing_log_id'],
+            'tags': tags
+        }
+    }
+
 @app.route('/api/saved-results/<int:result_id>', methods=['DELETE'])
 def delete_saved_result(result_id):
     """Delete a saved result"""
@@ -1576,9 +2461,14 @@ def get_recent_processings():
             'message': f'Son işlemler alınırken bir hata oluştu: {str(e)}'
         }), 500
 
+# Depolama temizliği (eski yüklemeler, sahipsiz sonuçlar, arşivleme)
+storage_gc_stop = threading.Event()
+storage_gc_thread = None
+
 if __name__ == '__main__':
-    # Uygulama başlamadan önce veritabanını kontrol et
-    check_database()
+    # Yeniden yükleyici açıkken izleme süreci istek karşılamaz; başlangıç yalnızca sunucu sürecinde yapılır
+    if is_running_from_reloader():
+        startup()
     app.run(debug=True)
 
 
@@ -0,0 +1,306 @@
+"""
+DataProcessor mikro benchmark'ı
+
+Çıkarıcılar (process_pdf, process_text, process_word, process_json) ve kaydediciler
+(save_content TXT/DOCX/PDF, save_json) için büyüyen boyutlarda örnek belgeler üretir;
+her durum ayrı bir süreçte çalıştırılır, böylece süre ve tepe bellek (RSS) birbirini
+etkilemez. Sonuçlar kayıtlı temel değerlerle karşılaştırılır ve eşiği aşan gerilemede
+betik 1 koduyla çıkar.
+
+Kullanım:
+    python -m benchmarks.bench_extractors                      # hızlı profil, temel değerle karşılaştır
+    python -m benchmarks.bench_extractors --profile full       # 1000 sayfa / 100 MB dahil
+    python -m benchmarks.bench_extractors --save-baseline      # temel değerleri güncelle
+    python -m benchmarks.bench_extractors --filter process_pdf --rounds 10
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import statistics
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.common import ROOT_DIR, peak_rss_mb, environment_info, write_report
+from benchmarks.fixtures import sample_text, make_pdf, make_docx, make_text, make_json
+
+DEFAULT_BASELINE = os.path.join(ROOT_DIR, 'benchmarks', 'baselines', 'extractors.json')
+
+KB = 1024
+MB = 1024 * 1024
+
+# Profil başına boyutlar: (hızlı, tam)
+SIZES = {
+    'process_pdf': ([1, 10, 100], [1, 10, 100, 1000]),                      # sayfa
+    'process_text': ([KB, MB, 10 * MB], [KB, MB, 10 * MB, 100 * MB]),       # bayt
+    'process_word': ([10, 100, 1000], [10, 100, 1000, 5000]),               # paragraf
+    'process_json': ([10, 1000, 10000], [10, 1000, 10000, 100000]),         # kayıt
+    'save_content': ([KB, 100 * KB], [KB, 100 * KB, MB]),                   # bayt
+    'save_json': ([10, 1000, 10000], [10, 1000, 10000, 100000])             # kayıt
+}
+
+SAVE_FORMATS = ['TXT', 'DOCX', 'PDF']
+
+def size_label(target, size):
+    if target in ('process_text', 'save_content'):
+        return f"{size // MB}MB" if size >= MB else f"{size // KB}KB"
+    unit = {'process_pdf': 'p', 'process_word': 'par'}.get(target, 'item')
+    return f"{size}{unit}"
+
+def build_cases(profile, name_filter=None):
+    """Return the list of benchmark cases for the profile as dicts"""
+    index = 0 if profile == 'quick' else 1
+    cases = []
+    for target, sizes in SIZES.items():
+        formats = SAVE_FORMATS if target == 'save_content' else [None]
+        for output_format in formats:
+            for size in sizes[index]:
+                name = f"{target}[{output_format + '-' if output_format else ''}{size_label(target, size)}]"
+                cases.append({'name': name, 'target': target, 'format': output_format, 'size': size})
+    if name_filter:
+        cases = [case for case in cases if any(part in case['name'] for part in name_filter)]
+    return cases
+
+def prepare_fixture(case, fixtures_dir):
+    """Create (or reuse) the input document of an extractor case and return its path"""
+    target, size = case['target'], case['size']
+    generators = {
+        'process_pdf': ('pdf', lambda path: make_pdf(path, size)),
+        'process_text': ('txt', lambda path: make_text(path, size)),
+        'process_word': ('docx', lambda path: make_docx(path, size)),
+        'process_json': ('json', lambda path: make_json(path, size))
+    }
+    if target not in generators:
+        return None
+
+    extension, generate = generators[target]
+    path = os.path.join(fixtures_dir, f"{target}_{size}.{extension}")
+    if not os.path.exists(path):
+        # Yarım kalmış üretim sonraki çalıştırmada yeniden kullanılmasın
+        partial = f"{path}.partial"
+        generate(partial)
+        os.replace(partial, path)
+    return path
+
+def saver_input(case):
+    """Build the in-memory input of a saver case"""
+    if case['target'] == 'save_json':
+        return {"soru-cevaplar": [
+            {"soru": f"Soru {i}: {sample_text(80, seed=i)}?", "cevap": sample_text(300, seed=i)}
+            for i in range(case['size'])
+        ]}
+
+    paragraphs = []
+    total = 0
+    seed = 0
+    while total < case['size']:
+        paragraph = sample_text(min(800, case['size'] - total), seed=seed)
+        paragraphs.append(paragraph)
+        total += len(paragraph.encode('utf-8')) + 2
+        seed += 1
+    content = '\n\n'.join(paragraphs)
+    if case['format'] == 'PDF':
+        # DejaVu yazı tipi yoksa FPDF çekirdek yazı tipine düşer ve Türkçe karakterleri
+        # kodlayamaz; ölçüm yazı tipinden bağımsız olsun diye ASCII karşılıkları kullanılır
+        content = content.translate(str.maketrans('çğıöşüÇĞİÖŞÜ', 'cgiosuCGIOSU'))
+    return content
+
+def run_case(case, fixture_path, rounds, max_time):
+    """Run one case in the current (fresh) process and return its timings and peak RSS"""
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    from services.data_processor import DataProcessor
+
+    processor = DataProcessor()
+    output_dir = tempfile.mkdtemp(prefix='aitextkit_bench_save_')
+    try:
+        if case['target'] == 'save_content':
+            content = saver_input(case)
+            func = lambda: processor.save_content(content, case['format'], output_dir)
+        elif case['target'] == 'save_json':
+            data = saver_input(case)
+            func = lambda: processor.save_json(data, output_dir)
+        else:
+            method = getattr(processor, case['target'])
+            func = lambda: method(fixture_path)
+
+        # Isınma turu: ilk çağrıdaki import/önbellek maliyeti ölçüme girmesin
+        warmup_started = time.perf_counter()
+        func()
+        warmup = time.perf_counter() - warmup_started
+
+        timings = []
+        budget_started = time.perf_counter()
+        # Uzun süren durumlar için tur sayısı süre bütçesiyle sınırlanır (en az bir tur)
+        while len(timings) < rounds and (not timings or time.perf_counter() - budget_started + warmup < max_time):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    return {
+        'rounds': len(timings),
+        'min_s': round(min(timings), 6),
+        'median_s': round(statistics.median(timings), 6),
+        'mean_s': round(statistics.fmean(timings), 6),
+        'stdev_s': round(statistics.stdev(timings), 6) if len(timings) > 1 else 0.0,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+def run_isolated(case, fixture_path, rounds, max_time):
+    """Run a case in a spawned process so its peak RSS is not shared with other cases"""
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(run_case, case, fixture_path, rounds, max_time).result()
+
+def compare_with_baseline(results, baseline, threshold, min_delta_s, min_delta_mb):
+    """
+    Compare results with the stored baseline
+
+    A case regresses when its fastest round (or peak RSS) grows by more than the
+    threshold ratio and by more than the absolute minimum, so tiny cases do not
+    fail on timer noise. The minimum is compared rather than the median because it
+    is the least affected by other load on the machine.
+    """
+    regressions = {}
+    comparison = {}
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or 'error' in result:
+            continue
+
+        time_ratio = result['min_s'] / base['min_s'] if base.get('min_s') else None
+        entry = {'baseline_min_s': base.get('min_s'), 'time_ratio': round(time_ratio, 3) if time_ratio else None}
+        if time_ratio and time_ratio > 1 + threshold and result['min_s'] - base['min_s'] > min_delta_s:
+            regressions.setdefault(name, []).append(
+                f"süre {base['min_s']:.4f}s -> {result['min_s']:.4f}s (x{time_ratio:.2f})")
+
+        if base.get('peak_rss_mb') and result.get('peak_rss_mb'):
+            rss_ratio = result['peak_rss_mb'] / base['peak_rss_mb']
+            entry.update({'baseline_peak_rss_mb': base['peak_rss_mb'], 'rss_ratio': round(rss_ratio, 3)})
+            if rss_ratio > 1 + threshold and result['peak_rss_mb'] - base['peak_rss_mb'] > min_delta_mb:
+                regressions.setdefault(name, []).append(
+                    f"bellek {base['peak_rss_mb']}MB -> {result['peak_rss_mb']}MB (x{rss_ratio:.2f})")
+        comparison[name] = entry
+    return comparison, regressions
+
+def measure(case, fixtures_dir, rounds, max_time):
+    """Prepare the fixture of a case and measure it in an isolated process"""
+    try:
+        fixture_path = prepare_fixture(case, fixtures_dir)
+        result = run_isolated(case, fixture_path, rounds, max_time)
+        if fixture_path:
+            result['input_bytes'] = os.path.getsize(fixture_path)
+        return result
+    except Exception as e:
+        return {'error': str(e)}
+
+def merge_results(first, second):
+    """Keep the best figures of two measurements of the same case"""
+    if 'error' in second:
+        return first
+    merged = dict(first)
+    merged['rounds'] = first['rounds'] + second['rounds']
+    merged['min_s'] = min(first['min_s'], second['min_s'])
+    merged['median_s'] = min(first['median_s'], second['median_s'])
+    if first.get('peak_rss_mb') and second.get('peak_rss_mb'):
+        merged['peak_rss_mb'] = min(first['peak_rss_mb'], second['peak_rss_mb'])
+    return merged
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_baseline(path, results, profile, merge_with=None):
+    """Store the results as the new baseline (cases not run this time are kept)"""
+    cases = dict((merge_with or {}).get('cases', {}))
+    cases.update({name: {'min_s': result['min_s'], 'median_s': result['median_s'], 'peak_rss_mb': result['peak_rss_mb']}
+                  for name, result in results.items() if 'error' not in result})
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'environment': environment_info(), 'profile': profile, 'cases': cases},
+                  f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write('\n')
+
+def main():
+    parser = argparse.ArgumentParser(description='DataProcessor çıkarıcı/kaydedici mikro benchmark\'ı')
+    parser.add_argument('--profile', choices=['quick', 'full'], default='quick',
+                        help='quick: CI için küçük boyutlar, full: 1000 sayfa / 100 MB dahil')
+    parser.add_argument('--filter', nargs='+', help='Yalnızca adında bu ifadeleri içeren durumlar')
+    parser.add_argument('--rounds', type=int, default=7, help='Durum başına en fazla ölçüm turu')
+    parser.add_argument('--max-time', type=float, default=10.0, help='Durum başına süre bütçesi (sn)')
+    parser.add_argument('--fixtures-dir', help='Örnek belgelerin önbelleklendiği klasör (varsayılan: geçici)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Temel değer dosyası')
+    parser.add_argument('--save-baseline', action='store_true', help='Sonuçları temel değer olarak kaydet')
+    parser.add_argument('--threshold', type=float, default=0.5, help='İzin verilen göreli gerileme (0.5 = %%50)')
+    parser.add_argument('--min-delta-ms', type=float, default=5.0, help='Bunun altındaki süre farkları gerileme sayılmaz')
+    parser.add_argument('--min-delta-mb', type=float, default=10.0, help='Bunun altındaki bellek farkları gerileme sayılmaz')
+    parser.add_argument('--recheck', type=int, default=2, help='Gerileyen durumların yeniden ölçülme sayısı')
+    parser.add_argument('--output', help='JSON raporunun kaydedileceği dosya')
+    args = parser.parse_args()
+
+    cases = build_cases(args.profile, args.filter)
+    fixtures_dir = args.fixtures_dir or tempfile.mkdtemp(prefix='aitextkit_bench_fixtures_')
+    os.makedirs(fixtures_dir, exist_ok=True)
+
+    results = {}
+    for case in cases:
+        print(f"[bench] {case['name']} ...", file=sys.stderr, flush=True)
+        results[case['name']] = measure(case, fixtures_dir, args.rounds, args.max_time)
+
+    baseline = load_baseline(args.baseline)
+    report = {
+        'benchmark': 'extractors',
+        'environment': environment_info(),
+        'parameters': {key: value for key, value in vars(args).items() if key not in ('output', 'save_baseline')},
+        'results': results
+    }
+
+    regressions = {}
+    if baseline:
+        compare = lambda: compare_with_baseline(
+            results, baseline.get('cases', {}), args.threshold, args.min_delta_ms / 1000, args.min_delta_mb
+        )
+        report['comparison'], regressions = compare()
+
+        # Gerileyen durumlar yeniden ölçülür; yalnızca tekrarlanan gerileme hata sayılır
+        for _ in range(args.recheck if not args.save_baseline else 0):
+            if not regressions:
+                break
+            for case in cases:
+                if case['name'] in regressions:
+                    print(f"[bench] {case['name']} yeniden ölçülüyor ...", file=sys.stderr, flush=True)
+                    results[case['name']] = merge_results(
+                        results[case['name']], measure(case, fixtures_dir, args.rounds, args.max_time)
+                    )
+            report['comparison'], regressions = compare()
+
+        report['baseline_revision'] = baseline.get('environment', {}).get('revision')
+        report['regressions'] = regressions
+
+    if not args.fixtures_dir:
+        shutil.rmtree(fixtures_dir, ignore_errors=True)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results, args.profile, merge_with=baseline)
+
+    write_report(report, args.output)
+
+    failed = [name for name, result in results.items() if 'error' in result]
+    if failed:
+        print(f"Hata veren durumlar: {', '.join(failed)}", file=sys.stderr)
+    if regressions and not args.save_baseline:
+        lines = [f"{name}: {', '.join(messages)}" for name, messages in regressions.items()]
+        print("Performans gerilemesi tespit edildi:\n  " + "\n  ".join(lines), file=sys.stderr)
+        sys.exit(1)
+    if failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,367 @@
+"""
+API yük testi
+
+Sanal kullanıcılar /api/upload, /api/process, /api/saved-results ve /api/chat uç
+noktalarına ağırlıklı bir iş karışımıyla istek gönderir; kullanıcı sayısı seçilen
+profile göre (sabit, rampa, basamak, ani yükselme) zamanla değişir. Rapor uç nokta ve
+eşzamanlı kullanıcı sayısı başına gecikme yüzdeliklerini, hata oranlarını ve /metrics
+üzerinden okunan SQLite yazma kilidi çekişmesini içerir.
+
+Varsayılan olarak uygulama geçici veritabanıyla bu süreçte, çok iş parçacıklı bir HTTP
+sunucusunda ve sahte LLM sunucusuna karşı çalıştırılır. --url ile ayrı başlatılmış bir
+örnek de ölçülebilir (o örneğin sahte sunucuya yönlendirilmesi gerekir).
+
+Kullanım:
+    python -m benchmarks.bench_load --profile step --users 32 --duration 120 --output yuk.json
+    python -m benchmarks.bench_load --mix write-heavy --profile ramp --users 16 --compare onceki.json
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import tempfile
+import argparse
+import threading
+from collections import defaultdict
+
+import requests
+
+from benchmarks.common import configure_app, summarize_latencies, peak_rss_mb, environment_info, write_report
+from benchmarks.fixtures import sample_text
+from benchmarks.mock_llm_server import start_mock_server, add_behavior_arguments, behavior_options
+
+# İş karışımları: görev -> ağırlık
+MIXES = {
+    'mixed': {'saved_results': 40, 'chat': 25, 'upload': 15, 'process': 10, 'save_result': 10},
+    'read-heavy': {'saved_results': 80, 'chat': 10, 'save_result': 5, 'process': 5},
+    'write-heavy': {'save_result': 45, 'process': 25, 'upload': 20, 'saved_results': 10},
+    'chat': {'chat': 100}
+}
+
+LOCK_ERROR_PATTERN = re.compile(r'database is locked', re.IGNORECASE)
+METRIC_LINE_PATTERN = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{[^}]*\})?\s+([0-9.eE+-]+|NaN|[+-]Inf)$')
+
+def users_at(profile, elapsed, users, duration, ramp, steps):
+    """Return the number of active virtual users at the given second of the run"""
+    if profile == 'constant':
+        return users
+    if profile == 'ramp':
+        # Rampa süresince doğrusal artış, sonra sabit
+        return max(1, min(users, int(users * elapsed / ramp) + 1)) if ramp else users
+    if profile == 'step':
+        # Süre eşit basamaklara bölünür; her basamakta kullanıcı sayısı artar
+        step_index = min(steps - 1, int(elapsed / (duration / steps)))
+        return max(1, round(users * (step_index + 1) / steps))
+    if profile == 'spike':
+        # Sürenin orta üçte birinde tam yük, öncesi ve sonrası dörtte bir yük
+        return users if duration / 3 <= elapsed < 2 * duration / 3 else max(1, users // 4)
+    raise ValueError(f"Bilinmeyen profil: {profile}")
+
+class LoadRecorder:
+    """Collect request samples from all virtual users"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = []
+
+    def add(self, endpoint, seconds, ok, status, active_users, lock_error=False):
+        with self.lock:
+            self.samples.append((endpoint, seconds, ok, status, active_users, lock_error))
+
+class VirtualUser:
+    def __init__(self, base_url, mix, recorder, rng, think_time, upload_file):
+        self.base_url = base_url
+        self.tasks = list(mix)
+        self.weights = [mix[task] for task in self.tasks]
+        self.recorder = recorder
+        self.rng = rng
+        self.think_time = think_time
+        self.upload_file = upload_file
+        self.session = requests.Session()
+        self.active_users = 0
+        self.counter = 0
+
+    def request(self, endpoint, method, path, **kwargs):
+        """Send one request, record it and return the parsed JSON body (or None)"""
+        started = time.perf_counter()
+        status = None
+        body = None
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=300, **kwargs)
+            status = response.status_code
+            try:
+                body = response.json()
+            except ValueError:
+                body = None
+            ok = status < 400 and (not isinstance(body, dict) or body.get('success', True) is not False)
+        except requests.RequestException:
+            ok = False
+        seconds = time.perf_counter() - started
+
+        message = body.get('message', '') if isinstance(body, dict) else ''
+        self.recorder.add(endpoint, seconds, ok, status, self.active_users,
+                          lock_error=bool(LOCK_ERROR_PATTERN.search(str(message))))
+        return body if ok else None
+
+    def upload(self):
+        self.counter += 1
+        name = f"yuk_{threading.get_ident()}_{self.counter}.txt"
+        with open(self.upload_file, 'rb') as f:
+            body = self.request('upload', 'POST', '/api/upload', files={'files': (name, f, 'text/plain')})
+        return body.get('files') if body else None
+
+    def process(self):
+        files = self.upload()
+        if not files:
+            return
+        self.request('process', 'POST', '/api/process', json={
+            'files': files,
+            'prompt_type': 'Metin Özeti Oluştur',
+            'topic': 'yük testi',
+            'model': 'gemini',
+            'resume_key': f"load-{threading.get_ident()}-{time.time_ns()}"
+        })
+
+    def saved_results(self):
+        params = {'limit': 50}
+        if self.rng.random() < 0.3:
+            params['query'] = self.rng.choice(['analiz', 'model', 'özet', 'veri'])
+        self.request('saved_results', 'GET', '/api/saved-results', params=params)
+
+    def chat(self):
+        history = [{'sender': 'user' if i % 2 == 0 else 'ai', 'message': sample_text(120, seed=i)}
+                   for i in range(self.rng.randint(0, 6))]
+        self.request('chat', 'POST', '/api/chat', json={'message': sample_text(200, seed=self.rng.random()),
+                                                        'history': history})
+
+    def save_result(self):
+        self.counter += 1
+        self.request('save_result', 'POST', '/api/save-result', json={
+            'title': f"Yük testi sonucu {threading.get_ident()}-{self.counter}",
+            'result_type': 'summary',
+            'content': sample_text(2000, seed=self.rng.random()),
+            'tags': ['yük-testi']
+        })
+
+    def run_once(self):
+        task = self.rng.choices(self.tasks, weights=self.weights)[0]
+        getattr(self, task)()
+        if self.think_time:
+            time.sleep(self.rng.expovariate(1 / self.think_time))
+
+def read_metrics(base_url):
+    """Scrape /metrics and return {series: value} (None when the endpoint is unavailable)"""
+    try:
+        response = requests.get(base_url + '/metrics', timeout=10)
+        response.raise_for_status()
+    except requests.RequestException:
+        return None
+    values = {}
+    for line in response.text.splitlines():
+        match = METRIC_LINE_PATTERN.match(line)
+        if match:
+            values[match.group(1) + (match.group(2) or '')] = float(match.group(3))
+    return values
+
+def lock_contention(before, after):
+    """Summarize SQLite write-lock waits between two /metrics snapshots"""
+    if before is None or after is None:
+        return None
+
+    def delta(series):
+        return after.get(series, 0) - before.get(series, 0)
+
+    prefix = 'aitextkit_db_lock_wait_seconds'
+    count = delta(f'{prefix}_count')
+    total = delta(f'{prefix}_sum')
+    # Kova sınırlarına göre kaba yüzdelikler (üst sınır raporlanır)
+    buckets = sorted(
+        (float(key.split('le="')[1].rstrip('"}')), delta(key))
+        for key in after if key.startswith(f'{prefix}_bucket') and '+Inf' not in key
+    )
+
+    def bucket_percentile(percent):
+        if not count:
+            return None
+        for bound, cumulative in buckets:
+            if cumulative >= count * percent / 100:
+                return bound * 1000
+        return float('inf')
+
+    return {
+        'transactions': int(count),
+        'total_wait_s': round(total, 4),
+        'mean_wait_ms': round(total / count * 1000, 3) if count else None,
+        'p95_wait_le_ms': bucket_percentile(95),
+        'p99_wait_le_ms': bucket_percentile(99),
+        'lock_errors': int(delta('aitextkit_db_lock_errors_total'))
+    }
+
+def summarize(samples, elapsed):
+    """Group samples by endpoint and by active user count"""
+    def stats(group):
+        errors = sum(1 for sample in group if not sample[2])
+        return {
+            'requests': len(group),
+            'errors': errors,
+            'error_rate': round(errors / len(group), 4) if group else 0,
+            'lock_errors': sum(1 for sample in group if sample[5]),
+            'throughput_rps': round(len(group) / elapsed, 3) if elapsed else None,
+            'latency': summarize_latencies([sample[1] for sample in group if sample[2]])
+        }
+
+    by_endpoint = defaultdict(list)
+    by_users = defaultdict(list)
+    for sample in samples:
+        by_endpoint[sample[0]].append(sample)
+        by_users[sample[4]].append(sample)
+
+    by_users_report = {}
+    for users, group in sorted(by_users.items()):
+        entry = stats(group)
+        # Bu kullanıcı düzeyinde geçen süre bilinmediğinden verim yerine uç nokta dağılımı verilir
+        entry.pop('throughput_rps')
+        entry['endpoints'] = {endpoint: summarize_latencies([s[1] for s in group if s[0] == endpoint and s[2]])
+                              for endpoint in sorted({s[0] for s in group})}
+        by_users_report[str(users)] = entry
+
+    return {
+        'total': stats(samples),
+        'endpoints': {endpoint: stats(group) for endpoint, group in sorted(by_endpoint.items())},
+        'by_active_users': by_users_report
+    }
+
+def compare_reports(current, previous):
+    """Return p95 latency and error-rate changes per endpoint against an earlier report"""
+    changes = {}
+    for endpoint, entry in current['summary']['endpoints'].items():
+        old = previous.get('summary', {}).get('endpoints', {}).get(endpoint)
+        if not old:
+            continue
+        new_p95 = entry['latency'].get('p95_ms')
+        old_p95 = old['latency'].get('p95_ms')
+        changes[endpoint] = {
+            'p95_ms': [old_p95, new_p95],
+            'p95_ratio': round(new_p95 / old_p95, 3) if new_p95 and old_p95 else None,
+            'error_rate': [old['error_rate'], entry['error_rate']]
+        }
+    return {'previous_revision': previous.get('environment', {}).get('revision'), 'endpoints': changes}
+
+def seed_saved_results(app_module, count):
+    """Fill the saved_results table so list and search queries have realistic work"""
+    with app_module.app.app_context():
+        for index in range(count):
+            app_module.save_result(f"Örnek sonuç {index}", '', 'summary' if index % 2 else 'qa',
+                                   sample_text(3000, seed=index))
+
+def start_app_server(app_module):
+    """Serve the app with the threaded werkzeug server (like app.run) in a background thread"""
+    from werkzeug.serving import make_server
+
+    server = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='load-test-app', daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+def run_load(base_url, args, upload_file):
+    recorder = LoadRecorder()
+    stop = threading.Event()
+    mix = MIXES[args.mix]
+    started = time.perf_counter()
+    state = {'target': 0}
+
+    def user_loop(index):
+        user = VirtualUser(base_url, mix, recorder, random.Random(args.seed * 1000 + index),
+                           args.think_time, upload_file)
+        while not stop.is_set():
+            # Profile göre etkin olmayan kullanıcılar bekler
+            if index >= state['target']:
+                time.sleep(0.05)
+                continue
+            user.active_users = state['target']
+            user.run_once()
+
+    threads = [threading.Thread(target=user_loop, args=(index,), name=f'vu-{index}', daemon=True)
+               for index in range(args.users)]
+    for thread in threads:
+        thread.start()
+
+    timeline = []
+    while True:
+        elapsed = time.perf_counter() - started
+        if elapsed >= args.duration:
+            break
+        target = users_at(args.profile, elapsed, args.users, args.duration, args.ramp, args.steps)
+        if target != state['target']:
+            state['target'] = target
+            timeline.append({'at_s': round(elapsed, 1), 'users': target})
+            print(f"[load] {elapsed:6.1f}s: {target} kullanıcı", file=sys.stderr, flush=True)
+        time.sleep(0.1)
+
+    stop.set()
+    for thread in threads:
+        # Süren istekler tamamlanana kadar beklenir ve rapora dahil edilir
+        thread.join()
+    return recorder.samples, time.perf_counter() - started, timeline
+
+def main():
+    parser = argparse.ArgumentParser(description='Flask API yük testi (sahte LLM sunucusu ile)')
+    parser.add_argument('--url', help='Ölçülecek çalışan örnek (verilmezse uygulama bu süreçte başlatılır)')
+    parser.add_argument('--mix', choices=list(MIXES), default='mixed', help='İş karışımı')
+    parser.add_argument('--profile', choices=['constant', 'ramp', 'step', 'spike'], default='step')
+    parser.add_argument('--users', type=int, default=16, help='En yüksek eşzamanlı kullanıcı sayısı')
+    parser.add_argument('--duration', type=float, default=60, help='Test süresi (sn)')
+    parser.add_argument('--ramp', type=float, default=30, help='ramp profili için artış süresi (sn)')
+    parser.add_argument('--steps', type=int, default=4, help='step profili için basamak sayısı')
+    parser.add_argument('--think-time', type=float, default=0.5, help='İstekler arası ortalama bekleme (sn)')
+    parser.add_argument('--seed-results', type=int, default=500, help='Önceden eklenecek kayıtlı sonuç sayısı')
+    parser.add_argument('--retry-delay', type=float, default=0.5, help='LLM istemcilerinin yeniden deneme beklemesi (sn)')
+    parser.add_argument('--compare', help='Karşılaştırılacak önceki rapor (JSON)')
+    parser.add_argument('--output', help='JSON raporunun kaydedileceği dosya')
+    add_behavior_arguments(parser)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='aitextkit_load_')
+    upload_file = os.path.join(work_dir, 'yuk_testi.txt')
+    with open(upload_file, 'w', encoding='utf-8') as f:
+        f.write(sample_text(8 * 1024))
+
+    mock_server = app_server = None
+    if args.url:
+        base_url = args.url.rstrip('/')
+    else:
+        mock_server, mock_url = start_mock_server(**behavior_options(args))
+        app_module = configure_app(work_dir, mock_url, LLM_RETRY_DELAY=args.retry_delay)
+        seed_saved_results(app_module, args.seed_results)
+        app_server, base_url = start_app_server(app_module)
+
+    metrics_before = read_metrics(base_url)
+    samples, elapsed, timeline = run_load(base_url, args, upload_file)
+    metrics_after = read_metrics(base_url)
+
+    report = {
+        'benchmark': 'load',
+        'environment': environment_info(),
+        'parameters': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'elapsed_s': round(elapsed, 2),
+        'timeline': timeline,
+        'summary': summarize(samples, elapsed),
+        'sqlite_lock_contention': lock_contention(metrics_before, metrics_after),
+        'peak_rss_mb': peak_rss_mb() if not args.url else None
+    }
+    if mock_server is not None:
+        report['mock_server'] = dict(mock_server.RequestHandlerClass.behavior.stats)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            report['comparison'] = compare_reports(report, json.load(f))
+
+    if app_server is not None:
+        app_server.shutdown()
+    if mock_server is not None:
+        mock_server.shutdown()
+    write_report(report, args.output)
+
+if __name__ == '__main__':
+    main()
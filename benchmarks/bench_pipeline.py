@@ -0,0 +1,129 @@
+"""
+Uçtan uca işlem benchmark'ı
+
+Örnek PDF/DOCX/görsel derlemini /api/upload ve /api/process üzerinden, yerel sahte
+LLM sunucusuna karşı tam işlem hattından geçirir; iş başına gecikme (p50/p95/p99),
+verim ve bellek kullanımını raporlar.
+
+Kullanım:
+    python -m benchmarks.bench_pipeline --iterations 10 --concurrency 4 --latency-ms 200 --output rapor.json
+"""
+import os
+import time
+import tempfile
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import configure_app, summarize_latencies, peak_rss_mb, environment_info, write_report
+from benchmarks.fixtures import build_corpus
+from benchmarks.mock_llm_server import start_mock_server, add_behavior_arguments, behavior_options
+
+# Senaryo: (derlem, işlem türü, model, ek istek parametreleri)
+SCENARIOS = {
+    'pdf-qa': ('pdf', 'Soru-Cevap Üretimi', 'gemini', {}),
+    'docx-summary': ('docx', 'Metin Özeti Oluştur', 'gemini', {}),
+    'images-vision': ('images', 'Metin Özeti Oluştur', 'gemini', {'use_vision': True}),
+    'pdf-qa-llama': ('pdf', 'Soru-Cevap Üretimi', 'llama', {})
+}
+
+def run_job(client, corpus_files, prompt_type, model, extra, job_number):
+    """Upload the corpus files and process them; return (seconds, success)"""
+    started = time.perf_counter()
+
+    handles = [open(file['path'], 'rb') for file in corpus_files]
+    try:
+        upload = client.post('/api/upload', data={
+            'files': [(handle, f"{job_number}_{file['name']}") for handle, file in zip(handles, corpus_files)]
+        }, content_type='multipart/form-data')
+    finally:
+        for handle in handles:
+            handle.close()
+
+    if upload.status_code != 200:
+        return time.perf_counter() - started, False
+
+    body = {
+        'files': upload.get_json()['files'],
+        'prompt_type': prompt_type,
+        'topic': 'benchmark',
+        'model': model,
+        # Her iş ayrı devam anahtarı alır, checkpoint'ten devam edilmez
+        'resume_key': f"bench-{job_number}-{time.time_ns()}"
+    }
+    body.update(extra)
+    response = client.post('/api/process', json=body)
+    data = response.get_json() or {}
+    success = response.status_code == 200 and data.get('success') and data.get('results') is not None
+    return time.perf_counter() - started, bool(success)
+
+def run_scenario(app_module, name, corpus, iterations, concurrency):
+    corpus_name, prompt_type, model, extra = SCENARIOS[name]
+    corpus_files = corpus[corpus_name]
+    latencies = []
+    failures = 0
+    counter = iter(range(iterations))
+    lock = threading.Lock()
+
+    def worker():
+        nonlocal failures
+        client = app_module.app.test_client()
+        while True:
+            with lock:
+                job_number = next(counter, None)
+            if job_number is None:
+                return
+            seconds, success = run_job(client, corpus_files, prompt_type, model, extra, job_number)
+            with lock:
+                latencies.append(seconds)
+                if not success:
+                    failures += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'jobs': iterations,
+        'failures': failures,
+        'error_rate': round(failures / iterations, 4) if iterations else 0,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_jobs_per_s': round(iterations / elapsed, 3) if elapsed else None,
+        'latency': summarize_latencies(latencies),
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Uçtan uca işlem hattı benchmark\'ı (sahte LLM sunucusu ile)')
+    parser.add_argument('--scenarios', nargs='+', default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument('--iterations', type=int, default=10, help='Senaryo başına iş sayısı')
+    parser.add_argument('--concurrency', type=int, default=2, help='Aynı anda gönderilen iş sayısı')
+    parser.add_argument('--scale', type=int, default=1, help='Derlem boyutu çarpanı')
+    parser.add_argument('--retry-delay', type=float, default=0.5, help='LLM istemcilerinin yeniden deneme beklemesi (sn)')
+    parser.add_argument('--output', help='JSON raporunun kaydedileceği dosya')
+    add_behavior_arguments(parser)
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(**behavior_options(args))
+    work_dir = tempfile.mkdtemp(prefix='aitextkit_bench_')
+    app_module = configure_app(work_dir, base_url, LLM_RETRY_DELAY=args.retry_delay)
+
+    corpus = build_corpus(os.path.join(work_dir, 'corpus'), scale=args.scale)
+
+    report = {
+        'benchmark': 'pipeline',
+        'environment': environment_info(),
+        'parameters': {key: value for key, value in vars(args).items() if key != 'output'},
+        'scenarios': {}
+    }
+    for name in args.scenarios:
+        report['scenarios'][name] = run_scenario(app_module, name, corpus, args.iterations, args.concurrency)
+    report['mock_server'] = dict(server.RequestHandlerClass.behavior.stats)
+
+    server.shutdown()
+    write_report(report, args.output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Uygulama açılış süresi benchmark'ı
+
+`python -X importtime` ile `import app` süresini ve ardından startup() kancasının
+süresini taze süreçlerde ölçer; en pahalı modülleri listeler, ağır biçim
+kütüphanelerinin (PyMuPDF, python-docx, fpdf2, pytesseract, Pillow) açılışta
+yüklenmediğini doğrular ve süre bütçesi aşılırsa 1 koduyla çıkar.
+
+Kullanım:
+    python -m benchmarks.bench_startup --runs 5 --import-budget-ms 400 --startup-budget-ms 200
+"""
+import os
+import sys
+import json
+import tempfile
+import argparse
+import statistics
+import subprocess
+
+from benchmarks.common import ROOT_DIR, environment_info, write_report
+
+# Açılışta içe aktarılmaması gereken modüller (ilk kullanımda yüklenirler)
+LAZY_MODULES = ['fitz', 'docx', 'fpdf', 'pytesseract', 'PIL']
+
+# Alt süreçte çalışan ölçüm kodu: import süresi importtime çıktısından, startup süresi saatle ölçülür
+PROBE = """
+import sys, time, json
+import app
+started = time.perf_counter()
+app.startup()
+startup_s = time.perf_counter() - started
+print(json.dumps({{'startup_s': startup_s, 'loaded': [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+def parse_importtime(stderr):
+    """Return {module: (self_us, cumulative_us)} from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        # Aynı modül birden çok kez görünmez; iç içe modüller girintiyle ayrılır
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+def run_probe(settings_path):
+    """Start a fresh interpreter, import the app and run its startup hook"""
+    env = dict(os.environ, AITEXTKIT_SETTINGS=settings_path)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE.format(lazy=LAZY_MODULES)],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True, timeout=120
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    modules = parse_importtime(result.stderr)
+    return {
+        'import_s': modules.get('app', (0, 0))[1] / 1e6,
+        'startup_s': probe['startup_s'],
+        'loaded_lazy_modules': probe['loaded'],
+        'modules': modules
+    }
+
+def write_settings(work_dir):
+    """Point the app at a temporary database so startup does the same work as on a fresh host"""
+    settings_path = os.path.join(work_dir, 'startup_settings.py')
+    with open(settings_path, 'w', encoding='utf-8') as f:
+        f.write(f"DATABASE = {os.path.join(work_dir, 'startup.db')!r}\n")
+        f.write(f"UPLOAD_FOLDER = {os.path.join(work_dir, 'uploads')!r}\n")
+        f.write(f"RESULTS_FOLDER = {os.path.join(work_dir, 'results')!r}\n")
+        f.write("STORAGE_GC_INTERVAL = 0\n")
+        f.write("LOG_LEVEL = 'WARNING'\n")
+    return settings_path
+
+def main():
+    parser = argparse.ArgumentParser(description='Uygulama açılış süresi benchmark\'ı')
+    parser.add_argument('--runs', type=int, default=5, help='Ölçüm sayısı (her biri yeni süreç)')
+    parser.add_argument('--import-budget-ms', type=float, default=400, help='import app için medyan süre bütçesi')
+    parser.add_argument('--startup-budget-ms', type=float, default=200, help='startup() için medyan süre bütçesi')
+    parser.add_argument('--top', type=int, default=15, help='Raporlanacak en pahalı modül sayısı')
+    parser.add_argument('--output', help='JSON raporunun kaydedileceği dosya')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='aitextkit_startup_')
+    settings_path = write_settings(work_dir)
+
+    # İlk çalıştırma .pyc dosyalarını ve veritabanını oluşturur; ölçüme katılmaz
+    run_probe(settings_path)
+    runs = [run_probe(settings_path) for _ in range(args.runs)]
+
+    import_ms = [run['import_s'] * 1000 for run in runs]
+    startup_ms = [run['startup_s'] * 1000 for run in runs]
+    loaded_lazy = sorted({module for run in runs for module in run['loaded_lazy_modules']})
+
+    # Kümülatif süresi en yüksek modüller (son ölçümden)
+    slowest = sorted(runs[-1]['modules'].items(), key=lambda item: item[1][1], reverse=True)[:args.top]
+
+    report = {
+        'benchmark': 'startup',
+        'environment': environment_info(),
+        'parameters': {key: value for key, value in vars(args).items() if key != 'output'},
+        'import_ms': {'median': round(statistics.median(import_ms), 1), 'min': round(min(import_ms), 1),
+                      'max': round(max(import_ms), 1)},
+        'startup_ms': {'median': round(statistics.median(startup_ms), 1), 'min': round(min(startup_ms), 1),
+                       'max': round(max(startup_ms), 1)},
+        'eagerly_loaded_lazy_modules': loaded_lazy,
+        'slowest_modules': [{'module': name, 'self_ms': round(self_us / 1000, 1), 'cumulative_ms': round(cumulative_us / 1000, 1)}
+                            for name, (self_us, cumulative_us) in slowest]
+    }
+
+    failures = []
+    if report['import_ms']['median'] > args.import_budget_ms:
+        failures.append(f"import app {report['import_ms']['median']} ms > {args.import_budget_ms} ms")
+    if report['startup_ms']['median'] > args.startup_budget_ms:
+        failures.append(f"startup() {report['startup_ms']['median']} ms > {args.startup_budget_ms} ms")
+    if loaded_lazy:
+        failures.append(f"açılışta yüklenen ağır modüller: {', '.join(loaded_lazy)}")
+    report['budget_failures'] = failures
+
+    write_report(report, args.output)
+    if failures:
+        print("Açılış bütçesi aşıldı:\n  " + "\n  ".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Benchmark betiklerinin ortak yardımcıları"""
+import os
+import sys
+import json
+import math
+import logging
+import platform
+import subprocess
+import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def summarize_latencies(latencies):
+    """Return count, mean and p50/p95/p99/max of latencies given in seconds (as milliseconds)"""
+    if not latencies:
+        return {'count': 0}
+    return {
+        'count': len(latencies),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'max_ms': round(max(latencies) * 1000, 2)
+    }
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB (None when unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB, macOS bayt döndürür
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def git_revision():
+    """Short commit hash of the working tree, so reports can be compared across commits"""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment_info():
+    return {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds')
+    }
+
+def configure_app(work_dir, base_url, **overrides):
+    """
+    Import the Flask app against a temporary database/folders and the mock LLM server
+
+    The settings are written to a file referenced by AITEXTKIT_SETTINGS, which app.py
+    loads on top of config.py, so the real database is never touched.
+    """
+    settings = {
+        'DATABASE': os.path.join(work_dir, 'benchmark.db'),
+        'UPLOAD_FOLDER': os.path.join(work_dir, 'uploads'),
+        'RESULTS_FOLDER': os.path.join(work_dir, 'results'),
+        'THUMBNAIL_FOLDER': os.path.join(work_dir, 'results', 'thumbnails'),
+        'GEMINI_API_URL': f"{base_url}/v1beta/models/gemini-1.5-flash:generateContent",
+        'LLAMA_API_URL': f"{base_url}/api",
+        'DEFAULT_API_KEY': 'benchmark-api-key',
+        'GEMINI_API_KEY': 'benchmark-api-key',
+        'LLAMA_API_KEY': 'benchmark-api-key',
+        'STORAGE_GC_INTERVAL': 0,
+        'BACKUP_MIN_INTERVAL': 3600,
+        'MAX_CONTENT_LENGTH': 512 * 1024 * 1024
+    }
+    settings.update(overrides)
+
+    settings_path = os.path.join(work_dir, 'benchmark_settings.py')
+    with open(settings_path, 'w', encoding='utf-8') as f:
+        for key, value in settings.items():
+            f.write(f"{key} = {value!r}\n")
+    os.environ['AITEXTKIT_SETTINGS'] = settings_path
+
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+
+    # İstek loglarının ölçümü etkilememesi için
+    logging.disable(logging.INFO)
+
+    import app as app_module
+    app_module.startup()
+    return app_module
+
+def write_report(report, output_path=None):
+    """Print the report as JSON and optionally save it to a file"""
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
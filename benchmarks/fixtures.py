@@ -0,0 +1,95 @@
+"""Benchmark'lar için örnek belge üreticileri (PDF, DOCX, TXT, JSON, görsel)"""
+import os
+import json
+import random
+
+import fitz  # PyMuPDF
+import docx
+from PIL import Image, ImageDraw
+
+SAMPLE_WORDS = (
+    "yapay zeka metin analiz belge sayfa model veri işleme özet soru cevap bilgi sistem "
+    "öğrenme dil anlam bağlam paragraf cümle kavram örnek sonuç yöntem süreç kaynak"
+).split()
+
+def sample_text(size_bytes, seed=0):
+    """Return deterministic Turkish-looking text of roughly size_bytes bytes"""
+    rng = random.Random(seed)
+    words = []
+    total = 0
+    while total < size_bytes:
+        word = rng.choice(SAMPLE_WORDS)
+        words.append(word)
+        total += len(word.encode('utf-8')) + 1
+        if len(words) % 12 == 0:
+            words[-1] += '.'
+    return ' '.join(words)[:size_bytes]
+
+def make_pdf(path, pages, words_per_page=250, seed=0):
+    """Create a text PDF with the given number of pages"""
+    doc = fitz.open()
+    for page_index in range(pages):
+        page = doc.new_page()
+        text = sample_text(words_per_page * 8, seed=seed + page_index)
+        page.insert_textbox(fitz.Rect(50, 50, 545, 792), text, fontsize=9)
+    doc.save(path)
+    doc.close()
+    return path
+
+def make_docx(path, paragraphs, seed=0):
+    """Create a DOCX file with the given number of paragraphs"""
+    document = docx.Document()
+    for index in range(paragraphs):
+        document.add_paragraph(sample_text(600, seed=seed + index))
+    document.save(path)
+    return path
+
+def make_text(path, size_bytes, seed=0):
+    """Create a UTF-8 text file of roughly size_bytes bytes (written in 1 MB pieces)"""
+    piece = sample_text(min(size_bytes, 1024 * 1024), seed=seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        written = 0
+        while written < size_bytes:
+            f.write(piece)
+            written += len(piece.encode('utf-8'))
+    return path
+
+def make_json(path, items, seed=0):
+    """Create a JSON file holding a list of question/answer records"""
+    rng = random.Random(seed)
+    data = {"soru-cevaplar": [
+        {"soru": sample_text(80, seed=rng.random()), "cevap": sample_text(300, seed=rng.random())}
+        for _ in range(items)
+    ]}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    return path
+
+def make_image(path, width=1024, height=768, seed=0):
+    """Create a PNG/JPEG (by extension) that looks like a scanned page"""
+    rng = random.Random(seed)
+    image = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(image)
+    # Metin satırlarını andıran kelime blokları (varsayılan yazı tipi Türkçe karakterleri çizemez)
+    for line in range(20, height - 20, 24):
+        x = 30
+        while x < width - 60:
+            word_width = rng.randint(15, 60)
+            draw.rectangle((x, line, x + word_width, line + 10), fill=(20, 20, 20))
+            x += word_width + rng.randint(6, 12)
+    image.save(path)
+    return path
+
+def build_corpus(directory, scale=1):
+    """Create the representative benchmark corpus and return {name: [file dicts]}"""
+    os.makedirs(directory, exist_ok=True)
+
+    def file_entry(path, file_type):
+        return {'name': os.path.basename(path), 'path': path, 'type': file_type}
+
+    return {
+        'pdf': [file_entry(make_pdf(os.path.join(directory, 'rapor.pdf'), 20 * scale), 'pdf')],
+        'docx': [file_entry(make_docx(os.path.join(directory, 'makale.docx'), 40 * scale), 'word')],
+        'images': [file_entry(make_image(os.path.join(directory, f'sayfa_{i}.png'), seed=i), 'image')
+                   for i in range(4 * scale)]
+    }
@@ -0,0 +1,289 @@
+"""
+Yerel sahte LLM sunucusu
+
+Gemini generateContent/streamGenerateContent ve AnythingLLM (workspace chat ve
+OpenAI uyumlu chat/completions) uç noktalarını taklit eder. Gecikme dağılımı,
+hata oranı ve 429 (rate limit) oranı ayarlanabilir; böylece /api/process kota
+harcamadan ve ağ gürültüsü olmadan ölçülebilir.
+
+Kullanım:
+    python -m benchmarks.mock_llm_server --port 8765 --latency-ms 300 --jitter-ms 100 --error-rate 0.01
+"""
+import re
+import json
+import math
+import zlib
+import time
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+BATCH_MARKER_PATTERN = re.compile(r'=== GÖRSEL (\d+) ===')
+
+class MockBehavior:
+    def __init__(self, latency_ms=200, jitter_ms=50, distribution='lognormal', error_rate=0.0,
+                 rate_limit_rate=0.0, tokens_per_second=0, seed=None):
+        """
+        Response timing and failure model of the mock server
+
+        Args:
+            latency_ms (float): Median response latency
+            jitter_ms (float): Spread of the latency (standard deviation for 'normal')
+            distribution (str): 'fixed', 'uniform', 'normal' or 'lognormal'
+            error_rate (float): Share of requests answered with HTTP 500
+            rate_limit_rate (float): Share of requests answered with HTTP 429
+            tokens_per_second (float): Extra generation time per output token (0 = none)
+            seed (int): Random seed for reproducible runs
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.distribution = distribution
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.tokens_per_second = tokens_per_second
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'rate_limited': 0}
+
+    def sample_latency(self):
+        """Return a latency sample in seconds"""
+        with self.lock:
+            if self.distribution == 'fixed' or not self.jitter_ms:
+                value = self.latency_ms
+            elif self.distribution == 'uniform':
+                value = self.random.uniform(self.latency_ms - self.jitter_ms, self.latency_ms + self.jitter_ms)
+            elif self.distribution == 'normal':
+                value = self.random.gauss(self.latency_ms, self.jitter_ms)
+            else:
+                # Log-normal: medyan latency_ms, uzun kuyruk jitter_ms ile belirlenir
+                sigma = min(math.log1p(self.jitter_ms / max(self.latency_ms, 1)), 1.5)
+                value = self.latency_ms * self.random.lognormvariate(0, sigma)
+        # Aşırı uç değerler ölçümü anlamsızlaştırmasın
+        return min(max(0.0, value), self.latency_ms + 20 * self.jitter_ms) / 1000
+
+    def pick_outcome(self):
+        """Return 'ok', 'error' or 'rate_limited' for the next request"""
+        with self.lock:
+            self.stats['requests'] += 1
+            roll = self.random.random()
+            if roll < self.rate_limit_rate:
+                self.stats['rate_limited'] += 1
+                return 'rate_limited'
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.stats['errors'] += 1
+                return 'error'
+        return 'ok'
+
+def estimate_tokens(text):
+    """Rough token estimate (about four characters per token)"""
+    return max(1, len(text) // 4)
+
+def build_answer(prompt, image_count=0):
+    """Build a plausible answer for the prompt so the app's parsers are exercised"""
+    markers = BATCH_MARKER_PATTERN.findall(prompt)
+    if markers:
+        return "\n".join(f"=== GÖRSEL {index} ===\nGörsel {index} için sahte analiz metni." for index in markers)
+
+    if 'soru-cevaplar' in prompt:
+        # Parça başına farklı sorular üret (uygulama tekrarları eler)
+        digest = zlib.crc32(prompt.encode('utf-8')) % 100000
+        pairs = [{"soru": f"Soru {digest}-{i}?", "cevap": f"Cevap {digest}-{i}."} for i in range(5)]
+        return json.dumps({"soru-cevaplar": pairs}, ensure_ascii=False)
+
+    if image_count:
+        return "Görselde bir belge sayfası ve metin blokları görülüyor."
+
+    words = prompt.split()
+    return "Özet: " + " ".join(words[:60])
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    behavior = MockBehavior()
+
+    def log_message(self, format, *args):
+        # Varsayılan erişim loglarını kapat (ölçümü etkilemesin)
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def _simulate(self, answer):
+        """Sleep for the sampled latency and return False if a failure was sent instead"""
+        delay = self.behavior.sample_latency()
+        if self.behavior.tokens_per_second:
+            delay += estimate_tokens(answer) / self.behavior.tokens_per_second
+        time.sleep(delay)
+
+        outcome = self.behavior.pick_outcome()
+        if outcome == 'rate_limited':
+            self._send_json(429, {'error': {'code': 429, 'message': 'Resource has been exhausted (mock)'}},
+                            {'Retry-After': '1'})
+            return False
+        if outcome == 'error':
+            self._send_json(500, {'error': {'code': 500, 'message': 'Internal error (mock)'}})
+            return False
+        return True
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/v1/auth'):
+            self._send_json(200, {'authenticated': True})
+        elif self.path == '/stats':
+            self._send_json(200, self.behavior.stats)
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        data = self._read_json()
+        path = self.path.split('?')[0]
+
+        if path.endswith(':generateContent') or path.endswith(':streamGenerateContent'):
+            self._handle_gemini(data, stream=path.endswith(':streamGenerateContent'))
+        elif path.endswith('/chat/completions'):
+            self._handle_openai(data)
+        elif '/v1/workspace/' in path and path.endswith('/chat'):
+            self._handle_workspace_chat(data)
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def _handle_gemini(self, data, stream=False):
+        parts = [part for content in data.get('contents', []) for part in content.get('parts', [])]
+        prompt = "\n".join(part.get('text', '') for part in parts)
+        image_count = sum(1 for part in parts if 'inline_data' in part or 'inlineData' in part)
+        answer = build_answer(prompt, image_count)
+
+        if not self._simulate(answer):
+            return
+
+        usage = {
+            'promptTokenCount': estimate_tokens(prompt) + 258 * image_count,
+            'candidatesTokenCount': estimate_tokens(answer)
+        }
+        usage['totalTokenCount'] = usage['promptTokenCount'] + usage['candidatesTokenCount']
+
+        if not stream:
+            self._send_json(200, {
+                'candidates': [{'content': {'parts': [{'text': answer}], 'role': 'model'}, 'finishReason': 'STOP'}],
+                'usageMetadata': usage
+            })
+            return
+
+        # Akış modu: yanıtı parçalar halinde SSE olarak gönder
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        pieces = [answer[i:i + 64] for i in range(0, len(answer), 64)] or ['']
+        for index, piece in enumerate(pieces):
+            event = {'candidates': [{'content': {'parts': [{'text': piece}], 'role': 'model'}}]}
+            if index == len(pieces) - 1:
+                event['usageMetadata'] = usage
+            chunk = f"data: {json.dumps(event, ensure_ascii=False)}\r\n\r\n".encode('utf-8')
+            self.wfile.write(f"{len(chunk):X}\r\n".encode('ascii') + chunk + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _handle_openai(self, data):
+        prompt_parts = []
+        image_count = 0
+        for message in data.get('messages', []):
+            content = message.get('content')
+            if isinstance(content, str):
+                prompt_parts.append(content)
+            else:
+                for part in content or []:
+                    if part.get('type') == 'text':
+                        prompt_parts.append(part.get('text', ''))
+                    elif part.get('type') == 'image_url':
+                        image_count += 1
+        prompt = "\n".join(prompt_parts)
+        answer = build_answer(prompt, image_count)
+
+        if not self._simulate(answer):
+            return
+
+        self._send_json(200, {
+            'id': 'chatcmpl-mock',
+            'object': 'chat.completion',
+            'model': data.get('model', 'llama'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': answer}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': estimate_tokens(prompt), 'completion_tokens': estimate_tokens(answer)}
+        })
+
+    def _handle_workspace_chat(self, data):
+        prompt = data.get('message', '')
+        answer = build_answer(prompt)
+
+        if not self._simulate(answer):
+            return
+
+        self._send_json(200, {
+            'id': 'mock',
+            'type': 'textResponse',
+            'textResponse': answer,
+            'sources': [],
+            'close': True,
+            'error': None
+        })
+
+def start_mock_server(host='127.0.0.1', port=0, **behavior_options):
+    """Start the mock server in a background thread and return (server, base_url)"""
+    handler = type('ConfiguredMockLLMHandler', (MockLLMHandler,), {'behavior': MockBehavior(**behavior_options)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='mock-llm-server', daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+def add_behavior_arguments(parser):
+    """Add the latency/error options shared by the benchmark scripts"""
+    parser.add_argument('--latency-ms', type=float, default=200, help='Medyan yanıt gecikmesi (ms)')
+    parser.add_argument('--jitter-ms', type=float, default=50, help='Gecikme yayılımı (ms)')
+    parser.add_argument('--distribution', default='lognormal', choices=['fixed', 'uniform', 'normal', 'lognormal'])
+    parser.add_argument('--error-rate', type=float, default=0.0, help='HTTP 500 döndürülen isteklerin oranı')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='HTTP 429 döndürülen isteklerin oranı')
+    parser.add_argument('--tokens-per-second', type=float, default=0, help='Çıktı token üretim hızı (0 = ek süre yok)')
+    parser.add_argument('--seed', type=int, default=42, help='Tekrarlanabilir ölçüm için rastgelelik tohumu')
+
+def behavior_options(args):
+    return {
+        'latency_ms': args.latency_ms,
+        'jitter_ms': args.jitter_ms,
+        'distribution': args.distribution,
+        'error_rate': args.error_rate,
+        'rate_limit_rate': args.rate_limit_rate,
+        'tokens_per_second': args.tokens_per_second,
+        'seed': args.seed
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Yerel sahte Gemini / AnythingLLM sunucusu')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    add_behavior_arguments(parser)
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(args.host, args.port, **behavior_options(args))
+    print(f"Sahte LLM sunucusu çalışıyor: {base_url}")
+    print(f"  GEMINI_API_URL = '{base_url}/v1beta/models/gemini-1.5-flash:generateContent'")
+    print(f"  LLAMA_API_URL  = '{base_url}/api'")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,80 +1,220 @@
 import os
+import sys
+import time
 import sqlite3
+import argparse
 from flask import Flask
+from database.db import compute_dedup_hash, decode_content, migrate_schema
 
 app = Flask(__name__)
 app.config.from_pyfile('config.py')
 DATABASE = app.config['DATABASE']
 
-def cleanup_database():
+# Tablo başına tekrarı belirleyen alanlar (sıra, kayıt sırasında hesaplanan özetle aynı olmalı)
+DEDUP_TABLES = {
+    'saved_results': ('title', 'description', 'content', 'result_type'),
+    'processing_logs': ('files', 'prompt_type', 'result_file')
+}
+
+# Özet hesaplama biçimi değiştiğinde artırılır (2: NULL alanlar boş metinden ayrı özetlenir)
+DEDUP_HASH_VERSION = 2
+
+def row_dedup_hash(table, row):
+    """Compute the dedup hash of a row the same way it is computed on insert"""
+    values = [decode_content(row[column]) if column == 'content' else row[column]
+              for column in DEDUP_TABLES[table]]
+    return compute_dedup_hash(*values)
+
+def get_state(conn, key, default=None):
+    try:
+        row = conn.execute('SELECT value FROM maintenance_state WHERE key = ?', (key,)).fetchone()
+    except sqlite3.OperationalError:
+        # Tablo henüz yok (simülasyon modunda şema güncellenmez)
+        return default
+    return row[0] if row else default
+
+def has_column(conn, table, column):
+    return column in [row[1] for row in conn.execute(f'PRAGMA table_info({table})').fetchall()]
+
+def reset_outdated_hashes(conn):
+    """
+    Clear dedup hashes stored by an older hashing scheme so they are recomputed
+
+    Only rows with a NULL identifying field hash differently since version 2.
+    Returns True when a full rescan is needed.
+    """
+    if int(get_state(conn, 'dedup_hash_version', 1)) >= DEDUP_HASH_VERSION:
+        return False
+    for table, fields in DEDUP_TABLES.items():
+        null_condition = ' OR '.join(f'{field} IS NULL' for field in fields)
+        conn.execute(f'UPDATE {table} SET dedup_hash = NULL WHERE dedup_hash IS NOT NULL AND ({null_condition})')
+    return True
+
+def dedup_table(conn, table, batch_size=1000, dry_run=False, full=False):
+    """
+    Remove duplicate rows of a table, keeping the oldest one
+
+    Only rows added since the previous run are examined; each batch runs in its own
+    short transaction so writers are never blocked for long. Saved results that
+    point at a removed processing log are re-pointed to the kept one.
+    """
+    state_key = f'dedup_last_id:{table}'
+    last_id = 0 if full else int(get_state(conn, state_key, 0))
+    has_hash = has_column(conn, table, 'dedup_hash')
+    columns = ', '.join(('id', 'dedup_hash' if has_hash else 'NULL AS dedup_hash') + DEDUP_TABLES[table])
+    stats = {'scanned': 0, 'hashed': 0, 'duplicates': 0, 'batches': 0}
+    # Simülasyonda özetler yazılmadığından, bu turda görülen ilk kayıtlar bellekte tutulur
+    seen = {}
+
+    while True:
+        if not dry_run:
+            conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute(
+                f'SELECT {columns} FROM {table} WHERE id > ? ORDER BY id LIMIT ?',
+                (last_id, batch_size)
+            ).fetchall()
+            if not rows:
+                if not dry_run:
+                    conn.rollback()
+                break
+
+            # Silinecek kayıt -> tutulan ilk kayıt
+            duplicate_ids = {}
+            for row in rows:
+                dedup_hash = row['dedup_hash']
+                if dedup_hash is None:
+                    # Özeti olmayan eski kayıtlar için özeti bir kez hesapla
+                    dedup_hash = row_dedup_hash(table, row)
+                    stats['hashed'] += 1
+                    if not dry_run:
+                        conn.execute(f'UPDATE {table} SET dedup_hash = ? WHERE id = ?', (dedup_hash, row['id']))
+
+                first_id = seen.get(dedup_hash)
+                if first_id is None and has_hash:
+                    first_id = conn.execute(
+                        f'SELECT MIN(id) FROM {table} WHERE dedup_hash = ? AND id < ?',
+                        (dedup_hash, row['id'])
+                    ).fetchone()[0]
+                if first_id is None:
+                    seen[dedup_hash] = row['id']
+                else:
+                    seen[dedup_hash] = first_id
+                    duplicate_ids[row['id']] = first_id
+
+            last_id = rows[-1]['id']
+            stats['scanned'] += len(rows)
+            stats['duplicates'] += len(duplicate_ids)
+            stats['batches'] += 1
+
+            if not dry_run:
+                if duplicate_ids:
+                    if table == 'processing_logs':
+                        # Kayıtlı sonuçlar silinen kayda bağlı kalmasın; etiketler tutulan kayıtta yoksa taşınır
+                        for duplicate_id, kept_id in duplicate_ids.items():
+                            conn.execute('UPDATE saved_results SET processing_log_id = ? WHERE processing_log_id = ?',
+                                         (kept_id, duplicate_id))
+                            conn.execute(
+                                'UPDATE processing_logs SET tags = (SELECT tags FROM processing_logs WHERE id = ?) '
+                                'WHERE id = ? AND tags IS NULL',
+                                (duplicate_id, kept_id)
+                            )
+                    placeholders = ', '.join(['?'] * len(duplicate_ids))
+                    conn.execute(f'DELETE FROM {table} WHERE id IN ({placeholders})', list(duplicate_ids))
+                conn.execute('INSERT OR REPLACE INTO maintenance_state (key, value) VALUES (?, ?)',
+                             (state_key, str(last_id)))
+                conn.commit()
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+
+        if len(rows) < batch_size:
+            break
+
+    stats['last_id'] = last_id
+    return stats
+
+def cleanup_database(dry_run=False, full=False, batch_size=1000):
     try:
         print("Veritabanı temizleme işlemi başlatılıyor...")
-        
-        # Veritabanına bağlan
-        conn = sqlite3.connect(DATABASE)
+        if dry_run:
+            print("Simülasyon modu: hiçbir kayıt değiştirilmeyecek")
+
+        # Veritabanına bağlan (WAL: temizlik sırasında okumalar engellenmez)
+        conn = sqlite3.connect(DATABASE, isolation_level=None)
         conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA busy_timeout=5000')
         db = conn.cursor()
-        
+
+        # Eski veritabanlarında özet sütunları ve indeksleri eksik olabilir
+        if not dry_run:
+            migrate_schema(conn)
+            db.execute('CREATE TABLE IF NOT EXISTS maintenance_state (key TEXT PRIMARY KEY, value TEXT)')
+            # Eski biçimle hesaplanmış özetler sıfırlanır ve tablolar baştan taranır
+            if reset_outdated_hashes(conn):
+                full = True
+
         # Mevcut kayıt sayılarını göster
         print("\nTemizlik öncesi kayıt sayıları:")
         db.execute("SELECT COUNT(*) FROM processing_logs")
         print(f"İşlem kayıtları: {db.fetchone()[0]}")
-        
+
         db.execute("SELECT COUNT(*) FROM saved_results")
         print(f"Kayıtlı sonuçlar: {db.fetchone()[0]}")
-        
+
         db.execute("SELECT COUNT(*) FROM custom_prompt_types")
         print(f"Özel prompt türleri: {db.fetchone()[0]}")
-        
+
         # Tekrarlanan kayıtları temizle
         print("\nTekrarlanan kayıtlar temizleniyor...")
-        
-        # saved_results tablosundaki tekrarları temizle
-        db.execute("""
-        DELETE FROM saved_results 
-        WHERE id NOT IN (
-            SELECT MIN(id) 
-            FROM saved_results 
-            GROUP BY title, description, content, result_type
-        )
-        """)
-        print(f"Silinen tekrarlanan sonuç sayısı: {db.rowcount}")
-        
-        # processing_logs tablosundaki tekrarları temizle
-        db.execute("""
-        DELETE FROM processing_logs 
-        WHERE id NOT IN (
-            SELECT MIN(id) 
-            FROM processing_logs 
-            GROUP BY files, prompt_type, result_file
-        )
-        """)
-        print(f"Silinen tekrarlanan log sayısı: {db.rowcount}")
-        
-        # İşlemi kaydet
-        conn.commit()
-        
+
+        report = {}
+        for table in DEDUP_TABLES:
+            start = time.perf_counter()
+            stats = dedup_table(conn, table, batch_size=batch_size, dry_run=dry_run, full=full)
+            stats['seconds'] = round(time.perf_counter() - start, 3)
+            stats['rows_per_second'] = round(stats['scanned'] / stats['seconds']) if stats['seconds'] else stats['scanned']
+            report[table] = stats
+
+            action = "Silinecek" if dry_run else "Silinen"
+            print(f"{table}: {stats['scanned']} kayıt incelendi ({stats['batches']} batch, "
+                  f"{stats['hashed']} özet hesaplandı, {stats['seconds']} sn, {stats['rows_per_second']} kayıt/sn)")
+            print(f"{action} tekrarlanan kayıt sayısı: {stats['duplicates']}")
+
+        if not dry_run:
+            db.execute('INSERT OR REPLACE INTO maintenance_state (key, value) VALUES (?, ?)',
+                       ('dedup_hash_version', str(DEDUP_HASH_VERSION)))
+
         # Temizlik sonrası kayıt sayılarını göster
         print("\nTemizlik sonrası kayıt sayıları:")
         db.execute("SELECT COUNT(*) FROM processing_logs")
         print(f"İşlem kayıtları: {db.fetchone()[0]}")
-        
+
         db.execute("SELECT COUNT(*) FROM saved_results")
         print(f"Kayıtlı sonuçlar: {db.fetchone()[0]}")
-        
+
         db.execute("SELECT COUNT(*) FROM custom_prompt_types")
         print(f"Özel prompt türleri: {db.fetchone()[0]}")
-        
+
         # Bağlantıyı kapat
         conn.close()
-        
+
         print("\nVeritabanı temizleme işlemi başarıyla tamamlandı!")
-        return True
-        
+        return report
+
     except Exception as e:
         print(f"\nHATA: Veritabanı temizleme işlemi sırasında bir hata oluştu: {str(e)}")
-        return False
+        return None
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Tekrarlanan veritabanı kayıtlarını temizle')
+    parser.add_argument('--dry-run', action='store_true', help='Kayıtları silmeden yalnızca rapor üret')
+    parser.add_argument('--full', action='store_true', help='Kaldığı yerden değil, tüm tabloyu baştan tara')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Tek transaction içinde işlenecek kayıt sayısı')
+    args = parser.parse_args()
+
     with app.app_context():
-        cleanup_database() 
\ No newline at end of file
+        report = cleanup_database(dry_run=args.dry_run, full=args.full, batch_size=args.batch_size)
+    sys.exit(0 if report is not None else 1)
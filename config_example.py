@@ -8,25 +8,94 @@ import os
 SECRET_KEY = 'your_secret_key_here'  # Üretimde değiştirin
 DEBUG = True  # Üretimde False yapın
 
+# Logging
+LOG_LEVEL = 'INFO'  # DEBUG, INFO, WARNING, ERROR
+LOG_LEVELS = {'werkzeug': 'WARNING'}  # Logger başına seviye (örn. {'services.llama_api': 'DEBUG'})
+LOG_FORMAT = 'json'  # json: satır başına bir JSON kaydı, text: okunabilir satırlar
+LOG_FILE = None  # Loglar ayrıca bu dosyaya yazılır (döndürmeli, 10 MB x 5)
+LOG_SAMPLE_RATE = 1.0  # DEBUG/INFO kayıtlarının tutulma oranı (uyarı ve hatalar her zaman tutulur)
+LOG_MAX_FIELD_LENGTH = 500  # Loglanan alanların (istek gövdesi, yanıt...) en fazla uzunluğu
+LOG_QUEUE_SIZE = 10000  # Log kuyruğu doluysa yeni kayıtlar atılır, istek beklemez
+
 # File storage paths
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
 RESULTS_FOLDER = os.path.join(BASE_DIR, 'results')
 DATABASE = os.path.join(BASE_DIR, 'database/text_analysis.db')
+DB_SYNCHRONOUS = 'FULL'  # 'FULL' (her commit'te fsync) veya 'NORMAL' (WAL ile daha hızlı, elektrik kesintisinde son işlemler kaybolabilir)
+BACKUP_MIN_INTERVAL = 300  # İki otomatik veritabanı yedeği arasındaki en kısa süre (saniye, 0 = her işlemde)
+RESULT_COMPRESSION_THRESHOLD = 4096  # Bu boyutun (bayt) üzerindeki sonuç içerikleri sıkıştırılarak saklanır
+RESULT_FILES_IN_DB = True  # TXT/JSON sonuç dosyaları diske ayrıca yazılmaz, veritabanından sunulur
+DB_POOL_SIZE = 8  # Havuzda tutulacak en fazla kalıcı veritabanı bağlantısı
+DB_STATEMENT_CACHE_SIZE = 256  # Bağlantı başına hazırlanmış SQL ifadesi önbelleği
+DB_CACHE_SIZE_KB = 16 * 1024  # Bağlantı başına SQLite sayfa önbelleği (KB)
+DB_MMAP_SIZE = 256 * 1024 * 1024  # Bellek eşlemeli okuma boyutu (bayt)
+CACHE_VERSION_CHECK_INTERVAL = 1.0  # Ayar/işlem türü önbelleğinin diğer süreçlerle senkron kontrol aralığı (saniye)
+THUMBNAIL_FOLDER = os.path.join(RESULTS_FOLDER, 'thumbnails')
+
+# Storage retention / garbage collection
+STORAGE_GC_INTERVAL = 3600  # Arka plan temizliğinin çalışma aralığı (saniye, 0 = kapalı)
+STORAGE_GC_BATCH_SIZE = 500  # Tek transaction'da silinen/arşivlenen en fazla kayıt
+STORAGE_GC_MAX_BATCHES = 20  # Bir temizlik turundaki en fazla batch sayısı
+UPLOAD_RETENTION_HOURS = 24  # Yüklenen dosyaların (ve yarım kalan işlerin checkpoint'lerinin) saklanma süresi
+UPLOAD_FOLDER_MAX_BYTES = None  # Yükleme klasörünün en fazla boyutu (bayt, None = sınırsız; kullanımdaki dosyalar silinmez)
+RESULT_RETENTION_DAYS = None  # Kaydı olmayan sonuç dosyalarının saklanma süresi (gün, None = sınırsız)
+RESULT_ORPHAN_GRACE_HOURS = 7 * 24  # Veritabanında kaydı olmayan dosyaların (örn. oluşturulan görseller) saklanma süresi
+RESULTS_FOLDER_MAX_BYTES = None  # Kaydı olmayan sonuç dosyalarının toplam boyut sınırı (bayt, None = sınırsız)
+LOG_ARCHIVE_AFTER_DAYS = None  # Bu süreden (gün) eski, yıldızsız işlem kayıtları ve sonuçları arşivlenir; arayüzde görünmezler (None = kapalı)
+ARCHIVE_RETENTION_DAYS = None  # Arşivlenen kayıtların saklanma süresi (gün, None = sınırsız)
 
 # API configuration
 DEFAULT_API_KEY = "YOUR_API_KEY"  # BURAYA KENDİ API KEY'İNİZİ GİRİN (https://aistudio.google.com/apikey sitesinden ücretsiz alabilirsiniz)
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', DEFAULT_API_KEY)
+LLM_RETRY_DELAY = 5  # Başarısız LLM isteği yeniden denenmeden önce beklenecek süre (saniye)
+GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent"  # Benchmark için sahte sunucuya yönlendirilebilir
 
 # AnythingLLM API configuration
 LLAMA_API_KEY = os.environ.get('LLAMA_API_KEY', 'YOUR_LLAMA_API_KEY')  # BURAYA KENDİ API KEY'İNİZİ GİRİN
 VISION_ENABLED = os.environ.get('VISION_ENABLED', 'true').lower() == 'true'  # Vision özellikleri aktif mi?
+VISION_BATCH_ENABLED = True  # Birden fazla görseli tek vision isteğinde gönder
+VISION_BATCH_SIZE = 4  # Tek istekteki en fazla görsel sayısı
+VISION_BATCH_MAX_BYTES = 8 * 1024 * 1024  # Tek istekteki en fazla görsel verisi (base64)
+VISION_MAX_WORKERS = 4  # Aynı anda gönderilecek en fazla vision isteği
+
+# Image generation
+IMAGEN_MAX_CONCURRENCY = 4  # Aynı anda gönderilecek en fazla görsel oluşturma isteği
+IMAGEN_CACHE_SIZE = 32  # Bellekte tutulacak en fazla görsel oluşturma sonucu
+THUMBNAIL_SIZES = [128, 256, 512]  # İzin verilen küçük resim boyutları (piksel)
+THUMBNAIL_MAX_AGE = 7 * 24 * 3600  # Küçük resimlerin tarayıcı önbellek süresi (saniye)
+
+# Background jobs
+JOB_MAX_WORKERS = 2  # Arka planda aynı anda çalışabilecek iş sayısı
+LLM_MAX_CONCURRENCY = 4  # Aynı anda yapılabilecek en fazla LLM çağrısı
+LLM_RESERVED_INTERACTIVE_SLOTS = 1  # Sohbet ve küçük işler için ayrılan LLM çağrısı sayısı
+INTERACTIVE_JOB_MAX_FILES = 2  # Etkileşimli sayılan işlerdeki en fazla dosya sayısı
+INTERACTIVE_JOB_MAX_BYTES = 512 * 1024  # Etkileşimli sayılan işlerin en fazla toplam boyutu
 
 # Model configuration
 DEFAULT_MODEL = "gemini"  # gemini, openai, claude (gelecekteki destekler için)
 
 # File upload settings
 MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16 MB file size limit
+UPLOAD_MAX_FILE_SIZE = None  # Tek dosya için en fazla boyut (None = MAX_CONTENT_LENGTH)
+UPLOAD_MAX_BATCH_SIZE = None  # Bir istekteki dosyaların toplam boyut sınırı (None = MAX_CONTENT_LENGTH)
+UPLOAD_BLOCK_SIZE = 64 * 1024  # Yüklemeler diske yazılırken kullanılan tampon boyutu
+UPLOAD_PART_SIZE = 8 * 1024 * 1024  # Parçalı yüklemede parça boyutu (MAX_CONTENT_LENGTH'ten küçük olmalı)
+UPLOAD_MAX_CHUNKED_FILE_SIZE = 1024 * 1024 * 1024  # Parçalı yüklemede en fazla dosya boyutu (None = sınırsız)
+UPLOAD_PREPARED_EXTRACTIONS = 8  # Önceden metni çıkarılıp bellekte tutulan en fazla dosya sayısı
+UPLOAD_PREPARED_MAX_FILE_SIZE = 16 * 1024 * 1024  # Metni önceden çıkarılacak en büyük dosya; daha büyükleri işlenirken normal yoldan okunur
+
+# HTTP önbellekleme ve sıkıştırma
+RESPONSE_CACHE_MAX_BYTES = 32 * 1024 * 1024  # Serileştirilmiş sonuç yanıtları için bellek sınırı
+RESPONSE_COMPRESSION_MIN_SIZE = 1024  # Bu boyuttan büyük JSON yanıtları gzip/brotli ile sıkıştırılır
+EXPORT_BATCH_SIZE = 500  # Toplu dışa aktarmada tek sorguda okunan kayıt sayısı
+
+# İnce ayar (fine-tuning) veri seti
+DATASET_DIR = None  # Verilirse soru-cevap işleri bittikçe çiftler bu klasördeki veri setine eklenir
+DATASET_FORMAT = 'chat'  # chat, instruction veya gemini
+DATASET_SHARD_SIZE = 10000  # Parça (JSONL dosyası) başına kayıt sayısı
+DATASET_VALIDATION_RATIO = 0.05  # Doğrulama kümesine ayrılan kayıt oranı
+DATASET_SYSTEM_PROMPT = None  # chat/gemini kayıtlarına eklenecek sistem mesajı
 ALLOWED_EXTENSIONS = {
     'pdf': ['.pdf'],
     'image': ['.jpg', '.jpeg', '.png'],
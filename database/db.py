@@ -1,31 +1,303 @@
 import json
 import os
+import hashlib
+import logging
 import sqlite3
 import datetime
+import threading
+import time
+import shutil
+import zlib
+from contextlib import contextmanager
 from flask import g, current_app
+from services.metrics import timed, DB_LOCK_WAIT, DB_LOCK_ERRORS
 
-def get_db():
-    """Connect to the database with improved durability settings"""
-    if 'db' not in g:
-        g.db = sqlite3.connect(
-            current_app.config['DATABASE'],
+logger = logging.getLogger(__name__)
+
+# Sık okunan ama nadiren değişen tablolar için süreç içi önbellek.
+# Geçerlilik, cache_versions tablosundaki sayaçlarla süreçler arasında denetlenir.
+_cache = {}
+_cache_version_state = {'checked_at': 0.0, 'versions': {}, 'generation': 0}
+_cache_lock = threading.Lock()
+
+# Büyük sonuç içerikleri sıkıştırılarak saklanır; bu önek sıkıştırılmış veriyi düz metinden ayırır
+COMPRESSED_CONTENT_MARKER = b'ZLIB1:'
+
+def encode_content(content):
+    """Compress result content above the configured size threshold"""
+    if not isinstance(content, str):
+        return content
+    
+    threshold = current_app.config.get('RESULT_COMPRESSION_THRESHOLD', 4096)
+    if threshold is None or threshold < 0:
+        return content
+    
+    data = content.encode('utf-8')
+    if len(data) < threshold:
+        return content
+    
+    compressed = COMPRESSED_CONTENT_MARKER + zlib.compress(data, 6)
+    # Sıkıştırma kazanç sağlamıyorsa düz metin olarak sakla
+    return compressed if len(compressed) < len(data) else content
+
+def decode_content(value):
+    """Return stored result content as text, decompressing it if needed"""
+    if isinstance(value, bytes):
+        if value.startswith(COMPRESSED_CONTENT_MARKER):
+            return zlib.decompress(value[len(COMPRESSED_CONTENT_MARKER):]).decode('utf-8')
+        return value.decode('utf-8')
+    return value
+
+def compute_dedup_hash(*fields):
+    """Hash the fields that identify a duplicate row (used by cleanup deduplication)"""
+    hasher = hashlib.sha256()
+    for field in fields:
+        # UTF-8 çıktısında hiç bulunmayan 0xff baytı, NULL alanı boş metinden ayırır
+        hasher.update(b'\xff' if field is None else str(field).encode('utf-8'))
+        hasher.update(b'\x1f')
+    return hasher.hexdigest()
+
+# Eski veritabanlarına sonradan eklenen sütunlar
+ADDED_COLUMNS = {
+    'processing_logs': [('dedup_hash', 'TEXT'), ('trace', 'TEXT')],
+    'saved_results': [('dedup_hash', 'TEXT')]
+}
+
+def migrate_schema(db):
+    """Add columns and indexes that older databases are missing"""
+    for table, added_columns in ADDED_COLUMNS.items():
+        columns = [row[1] for row in db.execute(f'PRAGMA table_info({table})').fetchall()]
+        for column, column_type in added_columns:
+            if column not in columns:
+                db.execute(f'ALTER TABLE {table} ADD COLUMN {column} {column_type}')
+        db.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_dedup_hash ON {table} (dedup_hash, id)')
+
+# İstekler arasında yeniden kullanılan bağlantı havuzları: (veritabanı yolu, salt okunur) -> bağlantılar
+_connection_pools = {}
+_pool_lock = threading.Lock()
+
+def _connect(database, read_only=False):
+    """Open a connection and apply the per-connection pragmas once"""
+    config = current_app.config
+    
+    if read_only:
+        conn = sqlite3.connect(
+            f"file:{database}?mode=ro",
+            uri=True,
             detect_types=sqlite3.PARSE_DECLTYPES,
-            isolation_level=None  # otomatik commit
+            isolation_level=None,
+            cached_statements=config.get('DB_STATEMENT_CACHE_SIZE', 256),
+            check_same_thread=False  # havuzdan alınan bağlantı aynı anda tek thread'de kullanılır
         )
-        g.db.row_factory = sqlite3.Row
-        
-        # Daha sıkı senkronizasyon modu ayarla
-        g.db.execute('PRAGMA synchronous=FULL')
-        g.db.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA query_only=ON')
+    else:
+        conn = sqlite3.connect(
+            database,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            isolation_level=None,  # otomatik commit
+            cached_statements=config.get('DB_STATEMENT_CACHE_SIZE', 256),
+            check_same_thread=False
+        )
+        # Dayanıklılık profili: FULL her commit'te fsync yapar, NORMAL (WAL ile) yalnızca checkpoint'te
+        synchronous = str(config.get('DB_SYNCHRONOUS', 'FULL')).upper()
+        if synchronous not in ('FULL', 'NORMAL'):
+            synchronous = 'FULL'
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f'PRAGMA synchronous={synchronous}')
+    
+    conn.row_factory = sqlite3.Row
+    
+    # Sıkıştırılmış içerikte arama yapılabilmesi için: content_text(content) LIKE ?
+    conn.create_function('content_text', 1, decode_content, deterministic=True)
     
-    return g.db
+    # Sayfa önbelleği (negatif değer KB cinsindendir) ve bellek eşlemeli okuma
+    conn.execute(f"PRAGMA cache_size=-{int(config.get('DB_CACHE_SIZE_KB', 16 * 1024))}")
+    conn.execute(f"PRAGMA mmap_size={int(config.get('DB_MMAP_SIZE', 256 * 1024 * 1024))}")
+    conn.execute('PRAGMA temp_store=MEMORY')
+    
+    return conn
+
+def _acquire_connection(database, read_only):
+    with _pool_lock:
+        pool = _connection_pools.setdefault((database, read_only), [])
+        if pool:
+            return pool.pop()
+    return _connect(database, read_only)
+
+def _release_connection(database, read_only, conn):
+    # Yarım kalmış işlem varsa bağlantıyı havuza temiz bırak
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+    except sqlite3.Error:
+        conn.close()
+        return
+    
+    max_size = current_app.config.get('DB_POOL_SIZE', 8)
+    with _pool_lock:
+        pool = _connection_pools.setdefault((database, read_only), [])
+        if len(pool) < max_size:
+            pool.append(conn)
+            return
+    conn.close()
+
+def get_db(read_only=False):
+    """Get a pooled, long-lived database connection for the current request"""
+    attr = 'db_ro' if read_only else 'db'
+    
+    if attr not in g:
+        database = current_app.config['DATABASE']
+        # Salt okunur bağlantı için veritabanı dosyasının var olması gerekir
+        if read_only and not os.path.exists(database):
+            return get_db()
+        setattr(g, attr, _acquire_connection(database, read_only))
+    
+    return getattr(g, attr)
 
 def close_db(e=None):
-    """Close the database connection"""
-    db = g.pop('db', None)
+    """Return the request's database connections to the pool"""
+    database = current_app.config['DATABASE']
     
-    if db is not None:
-        db.close()
+    for attr, read_only in (('db', False), ('db_ro', True)):
+        db = g.pop(attr, None)
+        if db is not None:
+            _release_connection(database, read_only, db)
+
+def _commit(db):
+    """Commit unless the write is part of an open transaction() block"""
+    if not g.get('db_transaction_depth'):
+        db.commit()
+        _apply_cache_invalidations()
+
+@contextmanager
+def transaction():
+    """
+    Group several writes into a single transaction (one commit, one fsync)
+
+    Nested blocks join the outermost transaction; any exception rolls everything back.
+    """
+    db = get_db()
+    depth = g.get('db_transaction_depth', 0)
+    
+    if depth == 0:
+        # Yazma kilidi için bekleme süresi eşzamanlı yazıcılar arasındaki çekişmeyi gösterir
+        started = time.perf_counter()
+        try:
+            db.execute('BEGIN IMMEDIATE')
+        except sqlite3.OperationalError as e:
+            if 'locked' in str(e):
+                DB_LOCK_ERRORS.inc()
+            raise
+        finally:
+            DB_LOCK_WAIT.observe(time.perf_counter() - started)
+    g.db_transaction_depth = depth + 1
+    
+    try:
+        yield db
+    except Exception:
+        g.db_transaction_depth = depth
+        if depth == 0:
+            db.rollback()
+            g.pop('db_pending_invalidations', None)
+        raise
+    
+    g.db_transaction_depth = depth
+    if depth == 0:
+        db.commit()
+        _apply_cache_invalidations()
+
+def close_all_connections():
+    """Close every pooled connection (used on application shutdown)"""
+    with _pool_lock:
+        pools = list(_connection_pools.values())
+        _connection_pools.clear()
+    
+    for pool in pools:
+        for conn in pool:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+def get_cache_versions():
+    """Get the shared cache version counters, re-reading them at most once per interval"""
+    interval = current_app.config.get('CACHE_VERSION_CHECK_INTERVAL', 1.0)
+    now = time.monotonic()
+    
+    with _cache_lock:
+        if now - _cache_version_state['checked_at'] < interval:
+            return _cache_version_state['versions']
+        generation = _cache_version_state['generation']
+    
+    rows = get_db().execute('SELECT name, version FROM cache_versions').fetchall()
+    versions = {row['name']: row['version'] for row in rows}
+    
+    with _cache_lock:
+        # Okuma sırasında bu süreçte bir değişiklik commit edildiyse okunan sayaçlar eski olabilir
+        if _cache_version_state['generation'] == generation:
+            _cache_version_state['versions'] = versions
+            _cache_version_state['checked_at'] = now
+    
+    return versions
+
+def bump_cache_version(db, name):
+    """Invalidate a cached table in this and all other processes (takes effect when the write is committed)"""
+    db.execute('INSERT OR IGNORE INTO cache_versions (name, version) VALUES (?, 0)', (name,))
+    db.execute('UPDATE cache_versions SET version = version + 1 WHERE name = ?', (name,))
+    
+    # Yerel önbellek commit'ten sonra temizlenir; önce temizlenirse eşzamanlı bir okuyucu
+    # henüz commit edilmemiş değişiklikten önceki sürümü yeniden önbelleğe alabilir
+    g.setdefault('db_pending_invalidations', set()).add(name)
+
+def _apply_cache_invalidations():
+    """Drop the local cache entries of tables whose version was bumped by the committed transaction"""
+    names = g.pop('db_pending_invalidations', None)
+    if not names:
+        return
+    
+    with _cache_lock:
+        for name in names:
+            _cache.pop(name, None)
+        # Sonraki okumada sayaçların yeniden okunmasını sağla
+        _cache_version_state['checked_at'] = 0.0
+        _cache_version_state['generation'] += 1
+
+def _get_cached(name, loader):
+    """Return cached data for a table, reloading it when its version changed"""
+    with _cache_lock:
+        generation = _cache_version_state['generation']
+    version = get_cache_versions().get(name, 0)
+    
+    with _cache_lock:
+        entry = _cache.get(name)
+        if entry and entry[0] == version:
+            return entry[1]
+    
+    data = loader()
+    
+    with _cache_lock:
+        # Yükleme sırasında commit edilen bir değişiklik önbelleği eski veriyle doldurmasın
+        if _cache_version_state['generation'] == generation:
+            _cache[name] = (version, data)
+    
+    return data
+
+def _apply_schema(db):
+    """Create missing tables/indexes (schema.sql is idempotent) and add missing columns"""
+    with current_app.open_resource('database/schema.sql') as f:
+        db.executescript(f.read().decode('utf8'))
+    migrate_schema(db)
+
+def ensure_database():
+    """
+    Prepare the database for serving without touching existing data
+
+    Used by the application startup hook; unlike init_db it never drops or copies
+    tables, so its cost does not grow with the amount of stored data.
+    """
+    db = get_db()
+    _apply_schema(db)
+    _commit(db)
 
 def init_db(preserve_settings=True, preserve_logs=True):
     """Initialize the database schema with option to preserve settings and logs"""
@@ -63,15 +335,15 @@ def init_db(preserve_settings=True, preserve_logs=True):
                     prompts = db.execute('SELECT * FROM custom_prompt_types').fetchall()
                     saved_custom_prompts = [dict(prompt) for prompt in prompts]
         except Exception as e:
-            print(f"Mevcut verileri okuma hatası: {str(e)}")
+            logger.error("Mevcut verileri okuma hatası: %s", e)
             saved_settings = {}
             saved_logs = []
             saved_custom_prompts = []
             saved_results = []
     
-    # Schema'yı uygula (tabloları yeniden oluşturur)
-    with current_app.open_resource('database/schema.sql') as f:
-        db.executescript(f.read().decode('utf8'))
+    # İşlem kayıtları tablosunu yeniden oluştur ve schema'yı uygula
+    db.execute('DROP TABLE IF EXISTS processing_logs')
+    _apply_schema(db)
     
     try:
         # Ayarları geri yükle
@@ -106,32 +378,41 @@ def init_db(preserve_settings=True, preserve_logs=True):
                 values = [result[k] for k in keys]
                 db.execute(f'INSERT OR IGNORE INTO saved_results ({columns}) VALUES ({placeholders})', values)
         
+        # Geri yüklenen ayar ve işlem türleri için önbellekleri geçersiz kıl
+        bump_cache_version(db, 'settings')
+        bump_cache_version(db, 'custom_prompt_types')
+        
         # Tüm değişiklikleri tek seferde commit et
-        db.commit()
+        _commit(db)
         
     except Exception as e:
-        print(f"Veritabanı yükleme hatası: {str(e)}")
+        logger.error("Veritabanı yükleme hatası: %s", e)
         # Hata durumunda rollback yap
         db.rollback()
         raise
 
-def log_processing(file_names, prompt_type, success, result_file=None):
-    """Log a processing job to the database"""
+@timed('db_log_processing')
+def log_processing(file_names, prompt_type, success, result_file=None, trace=None):
+    """Log a processing job (with its optional span tree JSON) to the database and return its id"""
     db = get_db()
     timestamp = datetime.datetime.now()
     
-    db.execute(
-        'INSERT INTO processing_logs (timestamp, files, prompt_type, success, result_file) VALUES (?, ?, ?, ?, ?)',
-        (timestamp, ', '.join(file_names), prompt_type, 1 if success else 0, result_file)
+    files = ', '.join(file_names)
+    
+    cursor = db.execute(
+        'INSERT INTO processing_logs (timestamp, files, prompt_type, success, result_file, dedup_hash, trace) VALUES (?, ?, ?, ?, ?, ?, ?)',
+        (timestamp, files, prompt_type, 1 if success else 0, result_file,
+         compute_dedup_hash(files, prompt_type, result_file), encode_content(trace))
     )
-    db.commit()
+    _commit(db)
+    return cursor.lastrowid
 
 def get_processing_logs(limit=50):
     """Get recent processing logs"""
-    db = get_db()
+    db = get_db(read_only=True)
     try:
         logs = db.execute(
-            'SELECT * FROM processing_logs ORDER BY timestamp DESC LIMIT ?',
+            'SELECT id, timestamp, files, prompt_type, success, result_file, notes, tags, starred FROM processing_logs ORDER BY timestamp DESC LIMIT ?',
             (limit,)
         ).fetchall()
         
@@ -161,7 +442,7 @@ def get_processing_logs(limit=50):
         
         return result
     except Exception as e:
-        print(f"Error in get_processing_logs: {str(e)}")
+        logger.error("Error in get_processing_logs: %s", e)
         return []
 
 def save_custom_prompt_type(name, prompt_text):
@@ -172,7 +453,8 @@ def save_custom_prompt_type(name, prompt_text):
             'INSERT INTO custom_prompt_types (name, prompt_text) VALUES (?, ?)',
             (name, prompt_text)
         )
-        db.commit()
+        bump_cache_version(db, 'custom_prompt_types')
+        _commit(db)
         
         # Yeni eklenen kaydın ID'sini al
         new_id = cursor.lastrowid
@@ -193,7 +475,8 @@ def save_custom_prompt_type(name, prompt_text):
                 'UPDATE custom_prompt_types SET prompt_text = ? WHERE name = ?',
                 (prompt_text, name)
             )
-            db.commit()
+            bump_cache_version(db, 'custom_prompt_types')
+            _commit(db)
             
             # Güncellenen kaydı bul
             updated_prompt = db.execute(
@@ -214,8 +497,7 @@ def save_custom_prompt_type(name, prompt_text):
     except Exception as e:
         return False, f"Özel işlem türü kaydedilirken hata oluştu: {str(e)}", None
 
-def get_custom_prompt_types():
-    """Get all custom prompt types from the database"""
+def _load_custom_prompt_types():
     db = get_db()
     custom_types = db.execute(
         'SELECT id, name, prompt_text, created_at FROM custom_prompt_types ORDER BY name'
@@ -228,12 +510,17 @@ def get_custom_prompt_types():
         'created_at': ct['created_at']
     } for ct in custom_types]
 
+def get_custom_prompt_types():
+    """Get all custom prompt types (served from the in-process cache)"""
+    return [dict(ct) for ct in _get_cached('custom_prompt_types', _load_custom_prompt_types)]
+
 def delete_custom_prompt_type(prompt_id):
     """Delete a custom prompt type from the database"""
     db = get_db()
     try:
         db.execute('DELETE FROM custom_prompt_types WHERE id = ?', (prompt_id,))
-        db.commit()
+        bump_cache_version(db, 'custom_prompt_types')
+        _commit(db)
         return True, "Özel işlem türü başarıyla silindi."
     except Exception as e:
         return False, f"Özel işlem türü silinirken hata oluştu: {str(e)}"
@@ -246,22 +533,25 @@ def update_setting(key, value):
             'INSERT OR REPLACE INTO app_settings (key, value) VALUES (?, ?)',
             (key, value)
         )
-        db.commit()
+        # Diğer worker süreçlerinin değişikliği fark etmesi için sürümü artır
+        bump_cache_version(db, 'settings')
+        _commit(db)
         return True, f"Ayar '{key}' başarıyla güncellendi."
     except Exception as e:
         return False, f"Ayar güncellenirken hata oluştu: {str(e)}"
 
-def get_setting(key, default=None):
-    """Get a setting from the database"""
+def _load_settings():
     db = get_db()
-    setting = db.execute(
-        'SELECT value FROM app_settings WHERE key = ?',
-        (key,)
-    ).fetchone()
-    
-    if setting:
-        return setting['value']
-    return default
+    settings = db.execute('SELECT key, value FROM app_settings').fetchall()
+    return {setting['key']: setting['value'] for setting in settings}
+
+def get_setting(key, default=None):
+    """Get a setting (served from the in-process cache)"""
+    return _get_cached('settings', _load_settings).get(key, default)
+
+def get_settings_version():
+    """Get the settings version counter shared by all worker processes"""
+    return get_cache_versions().get('settings', 0)
 
 def update_custom_prompt_type(prompt_id, name, prompt_text):
     """Update a custom prompt type in the database"""
@@ -280,34 +570,35 @@ def update_custom_prompt_type(prompt_id, name, prompt_text):
             'UPDATE custom_prompt_types SET name = ?, prompt_text = ? WHERE id = ?',
             (name, prompt_text, prompt_id)
         )
-        db.commit()
+        bump_cache_version(db, 'custom_prompt_types')
+        _commit(db)
         return True, "Özel işlem türü başarıyla güncellendi."
     except Exception as e:
         return False, f"Özel işlem türü güncellenirken hata oluştu: {str(e)}"
     
 
+@timed('db_save_result')
 def save_result(title, description, result_type, content, source_file=None, processing_log_id=None, tags=None):
-    """Save a result to the database"""
-    db = get_db()
+    """Save a result (and the tags of its processing log) in a single transaction"""
     created_at = datetime.datetime.now()
     
-    cursor = db.execute(
-        'INSERT INTO saved_results (title, description, result_type, content, source_file, created_at, updated_at, processing_log_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
-        (title, description, result_type, content, source_file, created_at, created_at, processing_log_id)
-    )
-    db.commit()
-    
-    # İşlem kaydı varsa, tags'i güncelle
-    if processing_log_id and tags:
-        tags_json = json.dumps(tags)
-        db.execute('UPDATE processing_logs SET tags = ? WHERE id = ?', (tags_json, processing_log_id))
-        db.commit()
+    with transaction() as db:
+        cursor = db.execute(
+            'INSERT INTO saved_results (title, description, result_type, content, source_file, created_at, updated_at, processing_log_id, dedup_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (title, description, result_type, encode_content(content), source_file, created_at, created_at, processing_log_id,
+             compute_dedup_hash(title, description, content, result_type))
+        )
+        
+        # İşlem kaydı varsa, tags'i güncelle
+        if processing_log_id and tags:
+            tags_json = json.dumps(tags)
+            db.execute('UPDATE processing_logs SET tags = ? WHERE id = ?', (tags_json, processing_log_id))
     
     return cursor.lastrowid
 
 def get_saved_results(limit=50, result_type=None, search_query=None):
     """Get saved results with optional filtering"""
-    db = get_db()
+    db = get_db(read_only=True)
     try:
         query = 'SELECT * FROM saved_results'
         params = []
@@ -319,7 +610,7 @@ def get_saved_results(limit=50, result_type=None, search_query=None):
             params.append(result_type)
         
         if search_query:
-            conditions.append('(title LIKE ? OR description LIKE ? OR content LIKE ?)')
+            conditions.append('(title LIKE ? OR description LIKE ? OR content_text(content) LIKE ?)')
             search_term = f'%{search_query}%'
             params.extend([search_term, search_term, search_term])
         
@@ -332,7 +623,6 @@ def get_saved_results(limit=50, result_type=None, search_query=None):
         query += ' ORDER BY created_at DESC LIMIT ?'
         params.append(limit)
         
-        print(f"SQL Query: {query}, Params: {params}")  # Debug için
         results = db.execute(query, params).fetchall()
         
         result_list = []
@@ -349,13 +639,13 @@ def get_saved_results(limit=50, result_type=None, search_query=None):
                         pass  # Geçersiz JSON formatı
             
             # Eğer content JSON formatında ise, parse et
-            content = res['content']
+            content = decode_content(res['content'])
             if content and isinstance(content, str):
                 try:
                     if (content.startswith('{') or content.startswith('[')):
                         content = json.loads(content)
                 except Exception as e:
-                    print(f"JSON parse error: {e}")
+                    logger.debug("JSON parse error in saved result %s: %s", res['id'], e)
                     # JSON olarak parse edilemiyorsa, string olarak devam et
             
             result_dict = {
@@ -374,14 +664,188 @@ def get_saved_results(limit=50, result_type=None, search_query=None):
         
         return result_list
     except Exception as e:
-        print(f"Error in get_saved_results: {str(e)}")
+        logger.error("Error in get_saved_results: %s", e)
         return []
 
+def get_result_content_by_file(filename):
+    """Get the stored content of the result that was saved as the given file"""
+    db = get_db(read_only=True)
+    result = db.execute(
+        'SELECT content FROM saved_results WHERE source_file = ? ORDER BY id DESC LIMIT 1',
+        (filename,)
+    ).fetchone()
+    
+    if result:
+        return decode_content(result['content'])
+    return None
+
+def get_result_id_by_file(filename):
+    """Get the id of the result whose content is served for the given file (saved results never change)"""
+    db = get_db(read_only=True)
+    result = db.execute(
+        'SELECT id FROM saved_results WHERE source_file = ? ORDER BY id DESC LIMIT 1',
+        (filename,)
+    ).fetchone()
+    return result['id'] if result else None
+
+def save_chunk_checkpoint(job_id, chunk_key, content):
+    """Persist the model response of a single chunk of a job"""
+    db = get_db()
+    db.execute(
+        'INSERT OR REPLACE INTO job_checkpoints (job_id, chunk_key, content, created_at) VALUES (?, ?, ?, ?)',
+        (job_id, chunk_key, content, datetime.datetime.now())
+    )
+    _commit(db)
+
+def get_chunk_checkpoint(job_id, chunk_key):
+    """Get the stored response of a chunk, or None if it has not completed yet"""
+    db = get_db()
+    checkpoint = db.execute(
+        'SELECT content FROM job_checkpoints WHERE job_id = ? AND chunk_key = ?',
+        (job_id, chunk_key)
+    ).fetchone()
+    
+    if checkpoint:
+        return checkpoint['content']
+    return None
+
+def count_chunk_checkpoints(job_id):
+    """Count the completed chunks stored for a job"""
+    db = get_db()
+    return db.execute('SELECT COUNT(*) FROM job_checkpoints WHERE job_id = ?', (job_id,)).fetchone()[0]
+
+def delete_chunk_checkpoints(job_id):
+    """Remove all chunk checkpoints (and the recorded input files) of a finished job"""
+    db = get_db()
+    db.execute('DELETE FROM job_checkpoints WHERE job_id = ?', (job_id,))
+    db.execute('DELETE FROM job_files WHERE job_id = ?', (job_id,))
+    _commit(db)
+
+def save_job_files(job_id, paths):
+    """Record the uploaded files a job reads, so storage cleanup keeps them until the job is done"""
+    db = get_db()
+    now = datetime.datetime.now()
+    db.executemany(
+        'INSERT OR REPLACE INTO job_files (job_id, path, created_at) VALUES (?, ?, ?)',
+        [(job_id, path, now) for path in paths if path]
+    )
+    _commit(db)
+
+def get_job_file_names():
+    """Return the base names of the files used by running jobs or jobs with pending checkpoints"""
+    db = get_db(read_only=True)
+    return {os.path.basename(row['path']) for row in db.execute('SELECT DISTINCT path FROM job_files')}
+
+def get_referenced_result_files(filenames):
+    """Return the subset of result file names still referenced by logs or saved results"""
+    db = get_db(read_only=True)
+    filenames = list(filenames)
+    referenced = set()
+    
+    # SQLite parametre sınırını aşmamak için parça parça sorgula
+    for i in range(0, len(filenames), 500):
+        chunk = filenames[i:i + 500]
+        placeholders = ', '.join(['?'] * len(chunk))
+        rows = db.execute(
+            f'''SELECT result_file AS name FROM processing_logs WHERE result_file IN ({placeholders})
+               UNION SELECT source_file FROM saved_results WHERE source_file IN ({placeholders})''',
+            chunk + chunk
+        ).fetchall()
+        referenced.update(row['name'] for row in rows)
+    
+    return referenced
+
+def _delete_in_batches(table, condition, params, batch_size, max_batches, dry_run=False):
+    """Delete matching rows in short transactions so writers are never blocked for long"""
+    if dry_run:
+        db = get_db(read_only=True)
+        count = db.execute(f'SELECT COUNT(*) FROM {table} WHERE {condition}', params).fetchone()[0]
+        return min(count, batch_size * max_batches)
+    
+    deleted = 0
+    for _ in range(max_batches):
+        with transaction() as db:
+            cursor = db.execute(
+                f'DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} WHERE {condition} LIMIT ?)',
+                tuple(params) + (batch_size,)
+            )
+        deleted += cursor.rowcount
+        if cursor.rowcount < batch_size:
+            break
+    return deleted
+
+def delete_stale_checkpoints(older_than, batch_size=500, max_batches=20, dry_run=False):
+    """Remove chunk checkpoints (and recorded input files) of jobs that were never resumed"""
+    if not dry_run:
+        _delete_in_batches('job_files', 'created_at < ?', (older_than,), batch_size, max_batches)
+    return _delete_in_batches('job_checkpoints', 'created_at < ?', (older_than,),
+                              batch_size, max_batches, dry_run)
+
+def purge_archived_records(older_than, batch_size=500, max_batches=20, dry_run=False):
+    """Permanently delete archived records past the archive retention period"""
+    return _delete_in_batches('archived_records', 'archived_at < ?', (older_than,),
+                              batch_size, max_batches, dry_run)
+
+def archive_old_logs(older_than, batch_size=500, max_batches=20, dry_run=False):
+    """
+    Move old, unstarred processing logs and their saved results into archived_records
+
+    Each batch runs in its own short transaction; rows are stored as zlib-compressed JSON.
+    """
+    condition = 'timestamp < ? AND starred = 0'
+    if dry_run:
+        db = get_db(read_only=True)
+        count = db.execute(f'SELECT COUNT(*) FROM processing_logs WHERE {condition}', (older_than,)).fetchone()[0]
+        return min(count, batch_size * max_batches)
+    
+    archived = 0
+    archived_at = datetime.datetime.now()
+    for _ in range(max_batches):
+        with transaction() as db:
+            logs = db.execute(
+                f'SELECT * FROM processing_logs WHERE {condition} ORDER BY id LIMIT ?',
+                (older_than, batch_size)
+            ).fetchall()
+            if not logs:
+                break
+            
+            log_ids = [log['id'] for log in logs]
+            placeholders = ', '.join(['?'] * len(log_ids))
+            results_by_log = {}
+            for result in db.execute(
+                f'SELECT * FROM saved_results WHERE processing_log_id IN ({placeholders})', log_ids
+            ).fetchall():
+                result = dict(result)
+                result['content'] = decode_content(result['content'])
+                results_by_log.setdefault(result['processing_log_id'], []).append(result)
+            
+            records = []
+            for log in logs:
+                payload = dict(log)
+                if payload.get('trace'):
+                    payload['trace'] = decode_content(payload['trace'])
+                payload['saved_results'] = results_by_log.get(log['id'], [])
+                data = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+                records.append(('processing_logs', log['id'], log['timestamp'], archived_at, zlib.compress(data, 6)))
+            
+            db.executemany(
+                'INSERT INTO archived_records (source_table, source_id, created_at, archived_at, payload) VALUES (?, ?, ?, ?, ?)',
+                records
+            )
+            db.execute(f'DELETE FROM saved_results WHERE processing_log_id IN ({placeholders})', log_ids)
+            db.execute(f'DELETE FROM processing_logs WHERE id IN ({placeholders})', log_ids)
+        
+        archived += len(logs)
+        if len(logs) < batch_size:
+            break
+    
+    return archived
+
 def update_log_notes(log_id, notes):
     """Update notes for a processing log"""
     db = get_db()
     db.execute('UPDATE processing_logs SET notes = ? WHERE id = ?', (notes, log_id))
-    db.commit()
+    _commit(db)
     return True
 
 def toggle_log_star(log_id):
@@ -391,10 +855,11 @@ def toggle_log_star(log_id):
     if current:
         new_status = 1 if current['starred'] == 0 else 0
         db.execute('UPDATE processing_logs SET starred = ? WHERE id = ?', (new_status, log_id))
-        db.commit()
+        _commit(db)
         return new_status
     return None
 
+@timed('backup_database')
 def backup_database():
     """Backup the database to ensure data persistence"""
     try:
@@ -402,16 +867,28 @@ def backup_database():
         backup_dir = os.path.join(os.path.dirname(db_path), 'backups')
         os.makedirs(backup_dir, exist_ok=True)
         
+        # Sık yedeklemeyi önle: son yedek yeterince yeniyse atla
+        min_interval = current_app.config.get('BACKUP_MIN_INTERVAL', 0)
+        backups = sorted([os.path.join(backup_dir, f) for f in os.listdir(backup_dir) 
+                         if f.startswith('text_analysis_backup_')])
+        if min_interval and backups and time.time() - os.path.getmtime(backups[-1]) < min_interval:
+            return True
+        
         timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
         backup_path = os.path.join(backup_dir, f'text_analysis_backup_{timestamp}.db')
         
-        # Veritabanı kopyalama
-        import shutil
-        shutil.copy2(db_path, backup_path)
+        # SQLite çevrimiçi yedekleme API'si WAL içeriğini de tutarlı şekilde kopyalar
+        temp_path = backup_path + '.tmp'
+        backup_conn = sqlite3.connect(temp_path)
+        try:
+            get_db().backup(backup_conn)
+        finally:
+            backup_conn.close()
+        shutil.move(temp_path, backup_path)
         
         # Eski yedekleri temizle (son 5 yedek kalsın)
         backups = sorted([os.path.join(backup_dir, f) for f in os.listdir(backup_dir) 
-                         if f.startswith('text_analysis_backup_')])
+                         if f.startswith('text_analysis_backup_') and f.endswith('.db')])
         
         if len(backups) > 5:
             for old_backup in backups[:-5]:
@@ -420,4 +897,4 @@ def backup_database():
         return True
     except Exception as e:
         current_app.logger.error(f"Veritabanı yedekleme hatası: {str(e)}")
-        return False
\ No newline at end of file
+        return False
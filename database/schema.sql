@@ -1,6 +1,4 @@
-DROP TABLE IF EXISTS processing_logs;
-
-CREATE TABLE processing_logs (
+CREATE TABLE IF NOT EXISTS processing_logs (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     files TEXT NOT NULL,
@@ -9,7 +7,9 @@ CREATE TABLE processing_logs (
     result_file TEXT,
     notes TEXT,  -- Kullanıcı notları için
     tags TEXT,   -- Etiketler (JSON formatında)
-    starred BOOLEAN NOT NULL DEFAULT 0  -- Yıldızlı işaretleme
+    starred BOOLEAN NOT NULL DEFAULT 0,  -- Yıldızlı işaretleme
+    dedup_hash TEXT,  -- files, prompt_type ve result_file özeti (tekrar temizliği için)
+    trace TEXT  -- İşin span ağacı (JSON, büyükse sıkıştırılmış)
 );
 
 -- Özel İşlem Türleri tablosu
@@ -25,6 +25,16 @@ CREATE TABLE IF NOT EXISTS app_settings (
     value TEXT
 );
 
+-- Önbelleğe alınan tabloların (ayarlar, özel işlem türleri) sürüm sayaçları;
+-- değişiklikleri tüm worker süreçlerine duyurmak için kullanılır
+CREATE TABLE IF NOT EXISTS cache_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO cache_versions (name, version) VALUES ('settings', 0);
+INSERT OR IGNORE INTO cache_versions (name, version) VALUES ('custom_prompt_types', 0);
+
 -- Sonuçları saklamak için yeni tablo
 CREATE TABLE IF NOT EXISTS saved_results (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -36,5 +46,47 @@ CREATE TABLE IF NOT EXISTS saved_results (
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     processing_log_id INTEGER,  -- İlgili işlem kaydına referans
+    dedup_hash TEXT,            -- title, description, content ve result_type özeti (tekrar temizliği için)
     FOREIGN KEY (processing_log_id) REFERENCES processing_logs (id)
-);
\ No newline at end of file
+);
+-- Uzun işlerin parça (chunk) sonuçları; yarıda kalan işler kaldığı yerden devam eder
+CREATE TABLE IF NOT EXISTS job_checkpoints (
+    job_id TEXT NOT NULL,
+    chunk_key TEXT NOT NULL,    -- Dosya ve parça indeksi (örn. '2:14') veya 'combined', 'final', 'vision:<dosya>'
+    content TEXT NOT NULL,      -- Parçanın model yanıtı
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (job_id, chunk_key)
+);
+
+-- Çalışan veya checkpoint'i bekleyen işlerin yüklenen dosyaları; depolama temizliği bunları silmez
+CREATE TABLE IF NOT EXISTS job_files (
+    job_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (job_id, path)
+);
+
+-- Saklama süresi dolan kayıtlar; satır ve bağlı sonuçları sıkıştırılmış JSON olarak tutulur
+CREATE TABLE IF NOT EXISTS archived_records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source_table TEXT NOT NULL,     -- Kaydın arşivlendiği tablo (örn. 'processing_logs')
+    source_id INTEGER NOT NULL,     -- Kaynak tablodaki id
+    created_at TIMESTAMP,           -- Kaydın ilk oluşturulma zamanı
+    archived_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    payload BLOB NOT NULL           -- zlib ile sıkıştırılmış JSON
+);
+
+-- Depolama temizliğinde dosya referansı ve yaş sorguları için indeksler
+CREATE INDEX IF NOT EXISTS idx_processing_logs_result_file ON processing_logs (result_file);
+CREATE INDEX IF NOT EXISTS idx_processing_logs_timestamp ON processing_logs (timestamp);
+CREATE INDEX IF NOT EXISTS idx_saved_results_source_file ON saved_results (source_file);
+CREATE INDEX IF NOT EXISTS idx_saved_results_log_id ON saved_results (processing_log_id);
+CREATE INDEX IF NOT EXISTS idx_job_checkpoints_created_at ON job_checkpoints (created_at);
+CREATE INDEX IF NOT EXISTS idx_job_files_created_at ON job_files (created_at);
+CREATE INDEX IF NOT EXISTS idx_archived_records_archived_at ON archived_records (archived_at);
+
+-- Bakım işlerinin kaldığı yer (örn. tekrar temizliğinde son işlenen id)
+CREATE TABLE IF NOT EXISTS maintenance_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
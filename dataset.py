@@ -0,0 +1,61 @@
+import sys
+import time
+import sqlite3
+import argparse
+from flask import Flask
+from services.dataset_builder import RECORD_FORMATS, DatasetBuilder, reset_dataset
+
+app = Flask(__name__)
+app.config.from_pyfile('config.py')
+DATABASE = app.config['DATABASE']
+
+def build_dataset(directory, record_format='chat', shard_size=10000, validation_ratio=0.05, system_prompt=None,
+                  rebuild=False, batch_size=500):
+    """
+    Create or extend a fine-tuning dataset from the Q&A pairs of the saved results
+
+    Returns:
+        dict: Counts of this run, or None on error
+    """
+    try:
+        if rebuild:
+            reset_dataset(directory)
+
+        # Salt okunur bağlantı: veri seti oluşturulurken uygulama yazmaya devam edebilir
+        conn = sqlite3.connect(f'file:{DATABASE}?mode=ro', uri=True, detect_types=sqlite3.PARSE_DECLTYPES)
+        conn.row_factory = sqlite3.Row
+
+        start = time.perf_counter()
+        builder = DatasetBuilder(directory, record_format, shard_size, validation_ratio, system_prompt)
+        stats = builder.update(conn, batch_size=batch_size)
+        conn.close()
+
+        stats['seconds'] = round(time.perf_counter() - start, 3)
+        print(f"{stats['results']} sonuç işlendi: {stats['train']} eğitim, {stats['validation']} doğrulama kaydı eklendi, "
+              f"{stats['duplicates']} tekrar ve {stats['invalid']} geçersiz çift atlandı ({stats['seconds']} sn)")
+        print(f"Manifest: {directory}/manifest.json")
+        return stats
+
+    except Exception as e:
+        print(f"\nHATA: Veri seti oluşturulurken bir hata oluştu: {str(e)}")
+        return None
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Kayıtlı soru-cevap sonuçlarından ince ayar (fine-tuning) veri seti oluştur')
+    parser.add_argument('--output', '-o', default=app.config.get('DATASET_DIR') or 'datasets/soru_cevap',
+                        help='Veri seti klasörü (varsa yalnızca yeni sonuçlar eklenir)')
+    parser.add_argument('--format', choices=RECORD_FORMATS, default=app.config.get('DATASET_FORMAT', 'chat'),
+                        help='chat: messages listesi, instruction: instruction/input/output, gemini: contents listesi')
+    parser.add_argument('--shard-size', type=int, default=app.config.get('DATASET_SHARD_SIZE', 10000),
+                        help='Parça (JSONL dosyası) başına kayıt sayısı')
+    parser.add_argument('--validation-ratio', type=float, default=app.config.get('DATASET_VALIDATION_RATIO', 0.05),
+                        help='Doğrulama kümesine ayrılacak kayıt oranı')
+    parser.add_argument('--system-prompt', default=app.config.get('DATASET_SYSTEM_PROMPT'),
+                        help='chat/gemini kayıtlarına eklenecek sistem mesajı')
+    parser.add_argument('--rebuild', action='store_true', help='Veri setini silip tüm sonuçlardan yeniden oluştur')
+    parser.add_argument('--batch-size', type=int, default=500, help='Tek sorguda okunacak sonuç sayısı')
+    args = parser.parse_args()
+
+    stats = build_dataset(args.output, args.format, args.shard_size, args.validation_ratio, args.system_prompt,
+                          args.rebuild, args.batch_size)
+    sys.exit(0 if stats is not None else 1)
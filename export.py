@@ -0,0 +1,67 @@
+import sys
+import time
+import sqlite3
+import argparse
+from flask import Flask
+from services.result_export import EXPORT_FORMATS, export_results, iter_results, parse_date_range
+
+app = Flask(__name__)
+app.config.from_pyfile('config.py')
+DATABASE = app.config['DATABASE']
+
+def export_database(output, export_format='jsonl', result_type=None, since=None, until=None, tags=None,
+                    batch_size=500):
+    """
+    Write the saved results matching the filters to output (a binary file)
+
+    Returns:
+        dict: Exported result/record counts, or None on error
+    """
+    try:
+        since, until = parse_date_range(since, until)
+
+        # Salt okunur bağlantı: dışa aktarma sırasında uygulama yazmaya devam edebilir
+        conn = sqlite3.connect(f'file:{DATABASE}?mode=ro', uri=True, detect_types=sqlite3.PARSE_DECLTYPES)
+        conn.row_factory = sqlite3.Row
+
+        stats = {}
+        start = time.perf_counter()
+        results = iter_results(conn, result_type=result_type, since=since, until=until, tags=tags,
+                               batch_size=batch_size)
+        for chunk in export_results(results, export_format, app.config['RESULTS_FOLDER'], stats):
+            output.write(chunk)
+        output.flush()
+        conn.close()
+
+        stats['seconds'] = round(time.perf_counter() - start, 3)
+        print(f"{stats['results']} sonuç, {stats['records']} kayıt dışa aktarıldı ({stats['seconds']} sn)",
+              file=sys.stderr)
+        return stats
+
+    except Exception as e:
+        print(f"\nHATA: Dışa aktarma sırasında bir hata oluştu: {str(e)}", file=sys.stderr)
+        return None
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Kayıtlı sonuçları JSONL, CSV veya ZIP olarak dışa aktar')
+    parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='jsonl',
+                        help='jsonl: satır başına bir soru-cevap, csv: tablo, zip: sonuç dosyaları')
+    parser.add_argument('--output', '-o', help='Çıktı dosyası (verilmezse standart çıktı; zip için zorunlu)')
+    parser.add_argument('--type', dest='result_type', help='Yalnızca bu türdeki sonuçlar (örn. qa_pairs)')
+    parser.add_argument('--since', help='Bu tarihten (YYYY-MM-DD) itibaren oluşturulanlar')
+    parser.add_argument('--until', help='Bu tarihe (YYYY-MM-DD) kadar oluşturulanlar (o gün dahil)')
+    parser.add_argument('--tag', action='append', dest='tags', help='Bu etikete sahip olanlar (birden çok verilebilir)')
+    parser.add_argument('--batch-size', type=int, default=500, help='Tek sorguda okunacak kayıt sayısı')
+    args = parser.parse_args()
+
+    if args.format == 'zip' and not args.output:
+        parser.error('zip biçimi için --output gerekli')
+
+    output = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    try:
+        stats = export_database(output, args.format, args.result_type, args.since, args.until, args.tags,
+                                args.batch_size)
+    finally:
+        if args.output:
+            output.close()
+    sys.exit(0 if stats is not None else 1)
@@ -0,0 +1,457 @@
+import os
+import re
+import json
+import time
+import uuid
+import codecs
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from services.upload_stream import HEADER_SIZE, UploadRejected, detect_file_type, matches_declared_type
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+# Parçalar geldikçe metni çıkarılabilen biçimler; PDF ve DOCX içerik dizinlerini dosyanın
+# sonunda tuttuğundan bunların metni dosya tamamlanınca arka planda çıkarılır
+STREAMABLE_TYPES = ('text', 'json')
+BACKGROUND_EXTRACT_TYPES = ('pdf', 'word')
+
+def _write_json(path, data):
+    # Yarım yazılmış kayıt okunmasın diye geçici dosyaya yazılıp yerine taşınır
+    fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(path))
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+def _read_exact(stream, size):
+    data = b''
+    while len(data) < size:
+        block = stream.read(size - len(data))
+        if not block:
+            break
+        data += block
+    return data
+
+class PreparedExtractions:
+    def __init__(self, max_entries=8):
+        """
+        Text chunks extracted before a file is processed
+
+        Entries are keyed by file path and checked against the file's size and
+        modification time, so a replaced file is never served stale text.
+
+        Args:
+            max_entries (int): Number of files kept (least recently used are dropped)
+        """
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.executor = None
+
+    @staticmethod
+    def _signature(path):
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _store(self, path, future):
+        signature = self._signature(path)
+        with self.lock:
+            self.entries[path] = (signature, future)
+            self.entries.move_to_end(path)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def put(self, path, chunks):
+        """Keep already extracted chunks for path"""
+        future = Future()
+        future.set_result(chunks)
+        self._store(path, future)
+
+    def submit(self, path, extract):
+        """Run extract(path) in a background thread and keep its result for path"""
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pre-extract')
+        self._store(path, self.executor.submit(extract, path))
+
+    def get(self, path):
+        """Return the prepared chunks of path (waiting for a running extraction) or None"""
+        with self.lock:
+            entry = self.entries.get(path)
+        if entry is None:
+            return None
+
+        signature, future = entry
+        try:
+            if self._signature(path) == signature:
+                return list(future.result())
+        except Exception as e:
+            # Dosya silinmiş ya da ön çıkarma başarısız; normal çıkarma hatayı kullanıcıya raporlar
+            logger.debug("Ön çıkarma kullanılamadı (%s): %s", path, e)
+
+        with self.lock:
+            if self.entries.get(path) is entry:
+                del self.entries[path]
+        return None
+
+class _TextPrefix:
+    """Incrementally decoded text of the contiguous completed parts of one upload"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Start decoding again from the first part (lock must be held)"""
+        self.next_part = 0
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.pieces = []
+        # Çözülen her parçanın sağlama toplamı; tamamlamada parça kayıtlarıyla karşılaştırılır
+        self.part_hashes = []
+        self.failed = False
+
+class ChunkedUploadStore:
+    def __init__(self, root, part_size=8 * 1024 * 1024, max_file_size=None, block_size=64 * 1024, prepared=None,
+                 prepare_max_size=16 * 1024 * 1024):
+        """
+        Resumable uploads sent as numbered, fixed-size parts
+
+        Every session is a folder under root holding session.json, a data file
+        preallocated to the final size and one small marker per received part. Parts
+        are written at their offset in the data file, so they may arrive in any order
+        or be re-sent, and completing the upload is a rename rather than a copy. Part
+        markers are separate files, so concurrent part requests (also from different
+        worker processes) never rewrite shared state.
+
+        Args:
+            root (str): Folder of the upload sessions
+            part_size (int): Size of every part except the last one
+            max_file_size (int): Largest accepted file (None = unlimited)
+            block_size (int): Read/write block size while streaming parts
+            prepared (PreparedExtractions): Receives the text of streamable files as their parts arrive
+            prepare_max_size (int): Larger files are not decoded in memory; they are extracted normally
+        """
+        self.root = root
+        self.part_size = part_size
+        self.max_file_size = max_file_size
+        self.block_size = block_size
+        self.prepared = prepared
+        self.prepare_max_size = prepare_max_size
+        self._prefixes = {}
+        self._prefixes_lock = threading.Lock()
+
+    def _session_dir(self, upload_id):
+        if not UPLOAD_ID_PATTERN.match(upload_id or ''):
+            raise UploadRejected('Yükleme oturumu bulunamadı', 404)
+        return os.path.join(self.root, upload_id)
+
+    def _open_data(self, upload_id, mode):
+        try:
+            return open(os.path.join(self._session_dir(upload_id), 'data'), mode)
+        except FileNotFoundError:
+            # Oturum bu sırada tamamlandı ya da iptal edildi
+            raise UploadRejected('Yükleme oturumu bulunamadı', 404)
+
+    def create(self, filename, declared_type, total_size, sha256=None):
+        """
+        Start an upload session
+
+        Args:
+            filename (str): Final file name
+            declared_type (str): Type derived from the extension
+            total_size (int): File size in bytes
+            sha256 (str): Optional checksum of the whole file, verified on completion
+
+        Returns:
+            dict: The session (upload_id, part_size, part_count, ...)
+        """
+        if total_size <= 0:
+            raise UploadRejected('Geçersiz dosya boyutu')
+        if self.max_file_size and total_size > self.max_file_size:
+            raise UploadRejected(f'Dosya boyutu sınırı aşıldı: {filename}', 413)
+
+        os.makedirs(self.root, exist_ok=True)
+        if shutil.disk_usage(self.root).free < total_size:
+            raise UploadRejected('Yükleme için yeterli disk alanı yok', 507)
+
+        upload_id = uuid.uuid4().hex
+        session_dir = os.path.join(self.root, upload_id)
+        os.makedirs(os.path.join(session_dir, 'parts'))
+        # Veri dosyası son boyutunda (seyrek) oluşturulur; parçalar kendi konumlarına yazılır
+        with open(os.path.join(session_dir, 'data'), 'wb') as f:
+            f.truncate(total_size)
+
+        session = {
+            'upload_id': upload_id,
+            'filename': filename,
+            'type': declared_type,
+            'size': total_size,
+            'part_size': self.part_size,
+            'part_count': -(-total_size // self.part_size),
+            'sha256': sha256.lower() if sha256 else None,
+            'created_at': time.time()
+        }
+        _write_json(os.path.join(session_dir, 'session.json'), session)
+        return session
+
+    def load(self, upload_id):
+        """Return the session of upload_id or raise UploadRejected (404)"""
+        try:
+            with open(os.path.join(self._session_dir(upload_id), 'session.json'), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise UploadRejected('Yükleme oturumu bulunamadı', 404)
+
+    def received_parts(self, upload_id):
+        """Return {index: {'index', 'size', 'sha256'}} of the parts stored so far"""
+        parts_dir = os.path.join(self._session_dir(upload_id), 'parts')
+        try:
+            names = os.listdir(parts_dir)
+        except FileNotFoundError:
+            raise UploadRejected('Yükleme oturumu bulunamadı', 404)
+
+        parts = {}
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(parts_dir, name), encoding='utf-8') as f:
+                    part = json.load(f)
+            except FileNotFoundError:
+                # Aynı parça şu anda yeniden gönderiliyor
+                continue
+            parts[part['index']] = part
+        return parts
+
+    def status(self, upload_id):
+        """Return the session with its received parts and the indexes still missing"""
+        session = self.load(upload_id)
+        parts = self.received_parts(upload_id)
+        return dict(session,
+                    received_parts=[parts[index] for index in sorted(parts)],
+                    missing_parts=[index for index in range(session['part_count']) if index not in parts])
+
+    def write_part(self, upload_id, index, stream, content_length=None, expected_sha256=None):
+        """
+        Stream one part from a request body into its place in the data file
+
+        Args:
+            upload_id (str): Session id
+            index (int): Zero-based part number
+            stream: File-like request body
+            content_length (int): Declared body size, checked before anything is read
+            expected_sha256 (str): Optional checksum of the part sent by the client
+
+        Returns:
+            dict: The stored part (index, size, sha256)
+        """
+        session = self.load(upload_id)
+        if not 0 <= index < session['part_count']:
+            raise UploadRejected('Geçersiz parça numarası')
+
+        offset = index * session['part_size']
+        expected_size = min(session['part_size'], session['size'] - offset)
+        if content_length is not None and content_length != expected_size:
+            raise UploadRejected(f'Parça boyutu {expected_size} bayt olmalı')
+
+        session_dir = self._session_dir(upload_id)
+        marker = os.path.join(session_dir, 'parts', f'{index:06d}.json')
+        # Yeniden gönderilen parçanın eski kaydı veri yazılmadan önce silinir; yarıda kalan
+        # bir yazım parçayı alınmış göstermez
+        try:
+            os.remove(marker)
+        except FileNotFoundError:
+            pass
+        self._reset_text(upload_id, index)
+
+        digest = hashlib.sha256()
+        received = 0
+        with self._open_data(upload_id, 'r+b') as f:
+            f.seek(offset)
+            if index == 0:
+                # Biçim kontrolü ilk bayt diske yazılmadan yapılır
+                header = _read_exact(stream, min(HEADER_SIZE, expected_size))
+                if len(header) == min(HEADER_SIZE, expected_size) and \
+                        not matches_declared_type(session['type'], detect_file_type(header)):
+                    self.abort(upload_id)
+                    raise UploadRejected(f"Dosya içeriği uzantısıyla uyuşmuyor: {session['filename']}", 415)
+                f.write(header)
+                digest.update(header)
+                received = len(header)
+
+            while received < expected_size:
+                block = stream.read(min(self.block_size, expected_size - received))
+                if not block:
+                    break
+                f.write(block)
+                digest.update(block)
+                received += len(block)
+
+            if received != expected_size:
+                raise UploadRejected(f'Parça eksik gönderildi ({received}/{expected_size} bayt)')
+
+            sha256 = digest.hexdigest()
+            if expected_sha256 and expected_sha256.lower() != sha256:
+                raise UploadRejected(f'Parça {index} sağlama toplamı uyuşmuyor')
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        part = {'index': index, 'size': received, 'sha256': sha256}
+        _write_json(marker, part)
+        self._advance_text(session)
+        return part
+
+    def _prefix(self, upload_id):
+        with self._prefixes_lock:
+            return self._prefixes.setdefault(upload_id, _TextPrefix())
+
+    def _reset_text(self, upload_id, index):
+        # Daha önce çözülmüş bir parça yeniden gönderiliyorsa eski metin atılıp baştan çözülür
+        with self._prefixes_lock:
+            prefix = self._prefixes.get(upload_id)
+        if prefix is None:
+            return
+        with prefix.lock:
+            if index < prefix.next_part:
+                prefix.reset()
+
+    def _advance_text(self, session, wait=False):
+        """Decode the parts that now extend the contiguous received prefix of a streamable file"""
+        if self.prepared is None or session['type'] not in STREAMABLE_TYPES:
+            return None
+        # Büyük dosyaların metni bellekte biriktirilmez
+        if self.prepare_max_size is not None and session['size'] > self.prepare_max_size:
+            return None
+
+        prefix = self._prefix(session['upload_id'])
+        # Başka bir istek zaten ilerletiyorsa beklenmez; eksik kalan kısım tamamlamada yetiştirilir
+        if not prefix.lock.acquire(blocking=wait):
+            return None
+        try:
+            parts = self.received_parts(session['upload_id'])
+            with self._open_data(session['upload_id'], 'rb') as f:
+                while not prefix.failed and prefix.next_part in parts:
+                    f.seek(prefix.next_part * session['part_size'])
+                    remaining = parts[prefix.next_part]['size']
+                    while remaining:
+                        block = f.read(min(self.block_size, remaining))
+                        if not block:
+                            break
+                        prefix.pieces.append(prefix.decoder.decode(block))
+                        remaining -= len(block)
+                    prefix.part_hashes.append(parts[prefix.next_part]['sha256'])
+                    prefix.next_part += 1
+        except UnicodeDecodeError:
+            # UTF-8 olmayan dosyalar işleme sırasında normal yoldan (latin-1 denemesiyle) okunur
+            prefix.failed = True
+            prefix.pieces = []
+        finally:
+            prefix.lock.release()
+        return prefix
+
+    def _prepared_text(self, session):
+        prefix = self._advance_text(session, wait=True)
+        if prefix is None or prefix.failed or prefix.next_part != session['part_count']:
+            return None
+        # Parça başka bir worker sürecinde yeniden gönderildiyse bu süreçteki metin eskidir
+        parts = self.received_parts(session['upload_id'])
+        if prefix.part_hashes != [parts[index]['sha256'] for index in range(session['part_count'])]:
+            return None
+
+        try:
+            text = ''.join(prefix.pieces) + prefix.decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            return None
+        # Metin modunda açılan dosyalardaki gibi satır sonları '\n' olur
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+        if session['type'] == 'json':
+            try:
+                text = json.dumps(json.loads(text), ensure_ascii=False)
+            except ValueError:
+                return None
+        return [text]
+
+    def complete(self, upload_id, path):
+        """
+        Verify that every part arrived, move the file to path and return (size, sha256)
+
+        The whole-file checksum is computed by reading the data file in blocks; it is
+        compared with the checksum given when the session was created, if any.
+        """
+        session = self.load(upload_id)
+        parts = self.received_parts(upload_id)
+        missing = [index for index in range(session['part_count']) if index not in parts]
+        if missing:
+            raise UploadRejected(f"Eksik parçalar: {', '.join(map(str, missing[:20]))}"
+                                 f"{'...' if len(missing) > 20 else ''}", 409)
+
+        digest = hashlib.sha256()
+        with self._open_data(upload_id, 'rb') as f:
+            for block in iter(lambda: f.read(self.block_size * 16), b''):
+                digest.update(block)
+        sha256 = digest.hexdigest()
+        if session['sha256'] and session['sha256'] != sha256:
+            raise UploadRejected('Dosya sağlama toplamı uyuşmuyor; parçaları yeniden gönderin')
+
+        chunks = self._prepared_text(session)
+        try:
+            os.replace(os.path.join(self._session_dir(upload_id), 'data'), path)
+        except FileNotFoundError:
+            # Aynı yükleme başka bir istekte tamamlandı
+            raise UploadRejected('Yükleme oturumu bulunamadı', 404)
+        self.abort(upload_id)
+
+        if chunks is not None:
+            self.prepared.put(path, chunks)
+        return session['size'], sha256
+
+    def abort(self, upload_id):
+        """Delete an upload session and its data"""
+        shutil.rmtree(self._session_dir(upload_id), ignore_errors=True)
+        with self._prefixes_lock:
+            self._prefixes.pop(upload_id, None)
+
+    def cleanup(self, max_age, dry_run=False, now=None):
+        """
+        Delete sessions without activity for max_age seconds
+
+        Returns:
+            tuple: (deleted session count, freed bytes)
+        """
+        now = now or time.time()
+        count = 0
+        freed = 0
+        if not os.path.isdir(self.root):
+            return count, freed
+
+        for upload_id in os.listdir(self.root):
+            if not UPLOAD_ID_PATTERN.match(upload_id):
+                continue
+            session_dir = os.path.join(self.root, upload_id)
+            try:
+                data_stat = os.stat(os.path.join(session_dir, 'data'))
+                # Son etkinlik: son yazılan parça veya son eklenen parça kaydı
+                last_activity = max(data_stat.st_mtime, os.stat(os.path.join(session_dir, 'parts')).st_mtime)
+            except FileNotFoundError:
+                data_stat = None
+                try:
+                    last_activity = os.stat(session_dir).st_mtime
+                except FileNotFoundError:
+                    continue
+            if now - last_activity <= max_age:
+                continue
+
+            if not dry_run:
+                self.abort(upload_id)
+            count += 1
+            freed += data_stat.st_size if data_stat else 0
+
+        return count, freed
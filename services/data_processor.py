@@ -2,11 +2,10 @@ import os
 import json
 import time
 from datetime import datetime
-import fitz  # PyMuPDF
-from PIL import Image
-import pytesseract
-import docx
-from fpdf import FPDF
+from services.metrics import timed
+
+# Ağır biçim kütüphaneleri (PyMuPDF, Pillow, pytesseract, python-docx, fpdf2) uygulama
+# açılışını yavaşlatmaması için ilgili biçim ilk kez işlendiğinde içe aktarılır
 
 class DataProcessor:
     def __init__(self):
@@ -36,6 +35,9 @@ JSON formatında çıktı üret:
 Paragraflar halinde, akıcı ve anlaşılır bir dilde yaz.""",
             "Özel Prompt": ""
         }
+        
+        # Oluşturulmuş prompt'ların önbelleği (şablonlar çalışma sırasında değişmez)
+        self._prompt_cache = {}
     
     def get_file_type(self, extension):
         """Determine file type from extension"""
@@ -45,7 +47,17 @@ Paragraflar halinde, akıcı ve anlaşılır bir dilde yaz.""",
         return None
     
     def get_prompt(self, prompt_type, topic="", custom_prompt=""):
-        """Get the appropriate prompt based on type and parameters"""
+        """Get the appropriate prompt based on type and parameters (memoized)"""
+        key = (prompt_type, topic, custom_prompt)
+        prompt = self._prompt_cache.get(key)
+        if prompt is None:
+            prompt = self._render_prompt(prompt_type, topic, custom_prompt)
+            if len(self._prompt_cache) >= 256:
+                self._prompt_cache.clear()
+            self._prompt_cache[key] = prompt
+        return prompt
+    
+    def _render_prompt(self, prompt_type, topic, custom_prompt):
         if prompt_type == "Özel Prompt":
             # Özel prompt boşsa, basit bir varsayılan değer döndür
             return custom_prompt or "Lütfen metni analiz et ve yanıt ver."
@@ -72,8 +84,10 @@ Paragraflar halinde, akıcı ve anlaşılır bir dilde yaz.""",
             return self.process_json(file_path)
         return []
     
+    @timed('process_pdf')
     def process_pdf(self, file_path, chunk_size=5):
         """Extract text from PDF files in chunks"""
+        import fitz  # PyMuPDF
         try:
             doc = fitz.open(file_path)
             texts = []
@@ -92,8 +106,11 @@ Paragraflar halinde, akıcı ve anlaşılır bir dilde yaz.""",
         except Exception as e:
             raise Exception(f"PDF işleme hatası: Dosya okunamadı veya hasar görmüş olabilir. Detay: {e}")
 
+    @timed('process_image')
     def process_image(self, file_path):
         """Extract text from images using OCR"""
+        import pytesseract
+        from PIL import Image
         try:
             img = Image.open(file_path)
             text = pytesseract.image_to_string(img, lang='tur')  # Using Turkish language for OCR
@@ -101,6 +118,7 @@ Paragraflar halinde, akıcı ve anlaşılır bir dilde yaz.""",
         except Exception as e:
             raise Exception(f"Görüntü işleme hatası: Dosya formatı desteklenmiyor veya hasar görmüş olabilir. Detay: {e}")
 
+    @timed('process_text')
     def process_text(self, file_path):
         """Extract text from TXT files"""
         try:
@@ -116,14 +134,17 @@ Paragraflar halinde, akıcı ve anlaşılır bir dilde yaz.""",
         except Exception as e:
             raise Exception(f"Metin dosyası okuma hatası: Dosya erişim sorunu olabilir. Detay: {e}")
 
+    @timed('process_word')
     def process_word(self, file_path):
         """Extract text from DOCX files"""
+        import docx
         try:
             doc = docx.Document(file_path)
             return ['\n'.join([paragraph.text for paragraph in doc.paragraphs])]
         except Exception as e:
             raise Exception(f"Word dosyası işleme hatası: Dosya formatı uyumsuz veya hasar görmüş olabilir. Detay: {e}")
 
+    @timed('process_json')
     def process_json(self, file_path):
         """Extract content from JSON files"""
         try:
@@ -141,6 +162,7 @@ Paragraflar halinde, akıcı ve anlaşılır bir dilde yaz.""",
         except Exception as e:
             raise Exception(f"JSON dosyası okuma hatası: JSON formatı geçersiz veya encoding hatası olabilir. Detay: {e}")
     
+    @timed('save_content')
     def save_content(self, content, output_format, save_dir):
         """Save content in the specified format"""
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
@@ -156,6 +178,7 @@ Paragraflar halinde, akıcı ve anlaşılır bir dilde yaz.""",
             filename = f"ozet_{timestamp}.docx"
             file_path = os.path.join(save_dir, filename)
             
+            import docx
             doc = docx.Document()
             doc.add_heading('Metin Özeti', 0)
             for paragraph in content.split('\n\n'):
@@ -166,6 +189,7 @@ Paragraflar halinde, akıcı ve anlaşılır bir dilde yaz.""",
             filename = f"ozet_{timestamp}.pdf"
             file_path = os.path.join(save_dir, filename)
             
+            from fpdf import FPDF
             pdf = FPDF()
             pdf.add_page()
             
@@ -179,12 +203,14 @@ Paragraflar halinde, akıcı ve anlaşılır bir dilde yaz.""",
             
             # Handle line breaks and wrap text
             for line in content.split('\n'):
-                pdf.multi_cell(0, 10, txt=line)
+                # fpdf2 imleci varsayılan olarak hücrenin sağında bırakır; her satır sol kenardan başlasın
+                pdf.multi_cell(0, 10, txt=line, new_x="LMARGIN", new_y="NEXT")
             
             pdf.output(file_path)
         
         return filename
     
+    @timed('save_json')
     def save_json(self, data, save_dir):
         """Save JSON data to a file"""
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
@@ -0,0 +1,263 @@
+import os
+import re
+import json
+import sqlite3
+import hashlib
+import datetime
+
+from services.result_export import iter_results, qa_pairs
+
+# Kayıt biçimleri: OpenAI tarzı sohbet, Alpaca tarzı talimat ve Gemini ayar (tuning) biçimi
+RECORD_FORMATS = ('chat', 'instruction', 'gemini')
+SPLITS = ('train', 'validation')
+SHARD_PATTERN = re.compile(r'^(train|validation)-(\d{5})\.jsonl$')
+
+STATE_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS seen (hash TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS shards (
+    file TEXT PRIMARY KEY,
+    split TEXT NOT NULL,
+    shard_index INTEGER NOT NULL,
+    records INTEGER NOT NULL,
+    bytes INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+'''
+
+def normalize_text(text):
+    """Whitespace- and case-insensitive form of a text, used for duplicate detection"""
+    return ' '.join(str(text).split()).casefold()
+
+def pair_hash(question, answer):
+    return hashlib.sha256(f"{normalize_text(question)}\x1f{normalize_text(answer)}".encode('utf-8')).hexdigest()
+
+def format_record(record_format, question, answer, system_prompt=None):
+    """Build one dataset line (as a dict) for a question/answer pair"""
+    if record_format == 'instruction':
+        return {'instruction': question, 'input': '', 'output': answer}
+    if record_format == 'gemini':
+        record = {'contents': [{'role': 'user', 'parts': [{'text': question}]},
+                               {'role': 'model', 'parts': [{'text': answer}]}]}
+        if system_prompt:
+            record['systemInstruction'] = {'role': 'system', 'parts': [{'text': system_prompt}]}
+        return record
+
+    messages = [{'role': 'user', 'content': question}, {'role': 'assistant', 'content': answer}]
+    if system_prompt:
+        messages.insert(0, {'role': 'system', 'content': system_prompt})
+    return {'messages': messages}
+
+class _ShardWriter:
+    def __init__(self, directory, split, shard_size, shards):
+        """
+        Append lines to the shards of one split, starting a new shard every shard_size records
+
+        Args:
+            shards (list): Existing shards of the split, ordered by index
+        """
+        self.directory = directory
+        self.split = split
+        self.shard_size = shard_size
+        self.next_index = shards[-1]['shard_index'] + 1 if shards else 0
+        self.changed = []
+        self.file = None
+        self.current = None
+        if shards and shards[-1]['records'] < shard_size:
+            self._open(dict(shards[-1]))
+
+    def _open(self, shard):
+        path = os.path.join(self.directory, shard['file'])
+        # Yarım kalmış parçanın özeti mevcut içeriği okunarak kaldığı yerden sürdürülür
+        self.hash = hashlib.sha256()
+        if shard['bytes']:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    self.hash.update(block)
+        self.file = open(path, 'ab')
+        self.current = shard
+        self.changed.append(shard)
+
+    def _close_current(self):
+        if self.file is not None:
+            self.current['sha256'] = self.hash.hexdigest()
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+            self.file = None
+
+    def write(self, line):
+        if self.current is None or self.current['records'] >= self.shard_size:
+            self._close_current()
+            self._open({'file': f'{self.split}-{self.next_index:05d}.jsonl', 'split': self.split,
+                        'shard_index': self.next_index, 'records': 0, 'bytes': 0, 'sha256': ''})
+            self.next_index += 1
+        self.file.write(line)
+        self.hash.update(line)
+        self.current['records'] += 1
+        self.current['bytes'] += len(line)
+
+    def close(self):
+        """Flush the open shard to disk and return the shards that changed"""
+        self._close_current()
+        return self.changed
+
+class DatasetBuilder:
+    def __init__(self, directory, record_format='chat', shard_size=10000, validation_ratio=0.05, system_prompt=None):
+        """
+        Fine-tuning dataset of the Q&A pairs in saved_results, kept as sharded JSONL files
+
+        Each update() is one streaming pass over the results added since the previous
+        update: pairs are normalized and deduplicated against every pair written so far,
+        assigned to train/validation by their hash (so a pair always lands in the same
+        split) and appended to the open shard of that split. The progress, the hashes of
+        the written pairs and the shard sizes live in state.sqlite and are committed in the
+        same transaction, after the shards are fsynced; lines of an interrupted update are
+        cut off on the next update. manifest.json is rewritten after every update.
+
+        Args:
+            directory (str): Output folder of the dataset
+            record_format (str): 'chat', 'instruction' or 'gemini'
+            shard_size (int): Records per JSONL shard
+            validation_ratio (float): Share of pairs in the validation split
+            system_prompt (str): Optional system message added to chat/gemini records
+        """
+        if record_format not in RECORD_FORMATS:
+            raise ValueError(f'Desteklenmeyen veri seti biçimi: {record_format}')
+        if not 0 <= validation_ratio < 1:
+            raise ValueError('Doğrulama oranı 0 ile 1 arasında olmalı')
+        self.directory = directory
+        self.settings = {
+            'format': record_format,
+            'shard_size': int(shard_size),
+            'validation_ratio': float(validation_ratio),
+            'system_prompt': system_prompt or ''
+        }
+
+    def _connect(self):
+        os.makedirs(self.directory, exist_ok=True)
+        # Aynı veri setini güncelleyen süreçler yazma kilidinde sıraya girer
+        conn = sqlite3.connect(os.path.join(self.directory, 'state.sqlite'), timeout=60, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.executescript(STATE_SCHEMA)
+        return conn
+
+    def _load_meta(self, conn):
+        meta = {row['key']: json.loads(row['value']) for row in conn.execute('SELECT key, value FROM meta')}
+        if 'format' in meta:
+            # Var olan veri setine farklı ayarlarla ekleme yapılırsa parçalar tutarsız olur
+            changed = [key for key, value in self.settings.items() if meta.get(key) != value]
+            if changed:
+                raise ValueError(f"Veri seti farklı ayarlarla oluşturulmuş: {', '.join(changed)} (--rebuild ile yeniden oluşturun)")
+        else:
+            meta.update(self.settings, created_at=datetime.datetime.now().isoformat(timespec='seconds'),
+                        last_result_id=0, counts={'train': 0, 'validation': 0, 'duplicates': 0,
+                                                  'invalid': 0, 'results': 0})
+        return meta
+
+    def _repair_shards(self, shards):
+        # Yarıda kalan güncellemenin yazdığı ama kaydedilmeyen satırlar/parçalar atılır
+        known = {shard['file']: shard for shard in shards}
+        for name in os.listdir(self.directory):
+            if not SHARD_PATTERN.match(name):
+                continue
+            path = os.path.join(self.directory, name)
+            shard = known.get(name)
+            if shard is None:
+                os.remove(path)
+            elif os.path.getsize(path) > shard['bytes']:
+                with open(path, 'r+b') as f:
+                    f.truncate(shard['bytes'])
+        for shard in shards:
+            if not os.path.exists(os.path.join(self.directory, shard['file'])):
+                raise RuntimeError(f"Veri seti parçası eksik: {shard['file']}")
+
+    def update(self, conn, batch_size=500):
+        """
+        Append the Q&A pairs of results saved since the last update
+
+        Args:
+            conn: Connection to the application database (row_factory = sqlite3.Row)
+            batch_size (int): Results read per query
+
+        Returns:
+            dict: Counts of this update (results, train, validation, duplicates, invalid)
+        """
+        state = self._connect()
+        try:
+            state.execute('BEGIN IMMEDIATE')
+            meta = self._load_meta(state)
+            shards = [dict(row) for row in state.execute('SELECT * FROM shards ORDER BY split, shard_index')]
+            self._repair_shards(shards)
+
+            writers = {split: _ShardWriter(self.directory, split, meta['shard_size'],
+                                           [shard for shard in shards if shard['split'] == split])
+                       for split in SPLITS}
+            stats = {'results': 0, 'train': 0, 'validation': 0, 'duplicates': 0, 'invalid': 0}
+            threshold = meta['validation_ratio'] * 0xFFFFFFFF
+            last_result_id = meta['last_result_id']
+
+            for result in iter_results(conn, batch_size=batch_size, after_id=last_result_id):
+                last_result_id = result['id']
+                pairs = qa_pairs(result['content'])
+                if not pairs:
+                    continue
+                stats['results'] += 1
+
+                for pair in pairs:
+                    question = pair.get('soru') if isinstance(pair, dict) else None
+                    answer = pair.get('cevap') if isinstance(pair, dict) else None
+                    if not isinstance(question, str) or not isinstance(answer, str) \
+                            or not question.strip() or not answer.strip():
+                        stats['invalid'] += 1
+                        continue
+
+                    digest = pair_hash(question, answer)
+                    if state.execute('INSERT OR IGNORE INTO seen (hash) VALUES (?)', (digest,)).rowcount == 0:
+                        stats['duplicates'] += 1
+                        continue
+
+                    split = 'validation' if int(digest[:8], 16) < threshold else 'train'
+                    record = format_record(meta['format'], question.strip(), answer.strip(), meta['system_prompt'])
+                    writers[split].write((json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'))
+                    stats[split] += 1
+
+            # Parçalar diske yazıldıktan sonra durum tek transaction'da kaydedilir
+            for writer in writers.values():
+                for shard in writer.close():
+                    state.execute('INSERT OR REPLACE INTO shards (file, split, shard_index, records, bytes, sha256) '
+                                  'VALUES (:file, :split, :shard_index, :records, :bytes, :sha256)', shard)
+
+            meta['last_result_id'] = last_result_id
+            meta['updated_at'] = datetime.datetime.now().isoformat(timespec='seconds')
+            for key, value in stats.items():
+                meta['counts'][key] += value
+            state.executemany('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                              [(key, json.dumps(value, ensure_ascii=False)) for key, value in meta.items()])
+            state.execute('COMMIT')
+
+            self._write_manifest(state, meta)
+            return stats
+        except Exception:
+            if state.in_transaction:
+                state.execute('ROLLBACK')
+            raise
+        finally:
+            state.close()
+
+    def _write_manifest(self, state, meta):
+        manifest = dict(meta, shards=[dict(row) for row in state.execute(
+            'SELECT file, split, records, bytes, sha256 FROM shards ORDER BY split, shard_index')])
+        path = os.path.join(self.directory, 'manifest.json')
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(f'{path}.tmp', path)
+        return manifest
+
+def reset_dataset(directory):
+    """Delete the shards, state and manifest of a dataset folder (other files are kept)"""
+    if not os.path.isdir(directory):
+        return
+    for name in os.listdir(directory):
+        if SHARD_PATTERN.match(name) or name in ('manifest.json', 'state.sqlite', 'state.sqlite-journal'):
+            os.remove(os.path.join(directory, name))
@@ -2,13 +2,17 @@ import json
 import time
 import re
 import requests
+from services.vision_utils import encode_image, build_batch_vision_prompt, split_batch_vision_response
+from services.metrics import timed, record_llm_call, request_body_bytes, LLM_RETRIES
+
+DEFAULT_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent"
 
 class GeminiAPI:
-    def __init__(self, api_key):
+    def __init__(self, api_key, api_url=None, retry_delay=5):
         self.api_key = api_key
         self.max_retries = 3
-        self.retry_delay = 5
-        self.api_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent"
+        self.retry_delay = retry_delay
+        self.api_url = api_url or DEFAULT_API_URL
     
     def update_api_key(self, api_key):
         """Update the API key and test its validity"""
@@ -42,9 +46,12 @@ class GeminiAPI:
             
         self.api_key = api_key
     
-    def generate_response(self, prompt, text):
-        """Generate a response from the Gemini API"""
+    def _generate_content(self, parts, operation='generate'):
+        """Send the given content parts to the Gemini API with retries"""
+        sent_bytes = request_body_bytes({"contents": [{"parts": parts}]})
         for attempt in range(self.max_retries):
+            if attempt:
+                LLM_RETRIES.inc(provider='gemini')
             try:
                 headers = {
                     "Content-Type": "application/json",
@@ -54,9 +61,7 @@ class GeminiAPI:
                 data = {
                     "contents": [
                         {
-                            "parts": [
-                                {"text": f"{prompt}\n\nMetin: {text}"}
-                            ]
+                            "parts": parts
                         }
                     ]
                 }
@@ -69,6 +74,10 @@ class GeminiAPI:
                 
                 if response.status_code == 200:
                     response_data = response.json()
+                    usage = response_data.get('usageMetadata', {})
+                    record_llm_call('gemini', operation, bool(response_data.get('candidates')),
+                                    sent_bytes, len(response.content),
+                                    usage.get('promptTokenCount'), usage.get('candidatesTokenCount'))
                     
                     if not response_data.get('candidates'):
                         return {
@@ -79,9 +88,14 @@ class GeminiAPI:
                     content = response_data['candidates'][0]['content']['parts'][0]['text']
                     return {
                         'success': True,
-                        'content': content
+                        'content': content,
+                        'usage': {
+                            'prompt_tokens': usage.get('promptTokenCount'),
+                            'completion_tokens': usage.get('candidatesTokenCount')
+                        }
                     }
                 else:
+                    record_llm_call('gemini', operation, False, sent_bytes, len(response.content))
                     if attempt < self.max_retries - 1:
                         time.sleep(self.retry_delay)
                     else:
@@ -90,6 +104,7 @@ class GeminiAPI:
                             'message': f"API hatası: {response.status_code} - {response.text}"
                         }
             except Exception as e:
+                record_llm_call('gemini', operation, False, sent_bytes)
                 if attempt < self.max_retries - 1:
                     time.sleep(self.retry_delay)
                 else:
@@ -103,65 +118,65 @@ class GeminiAPI:
             'message': f"{self.max_retries} deneme sonrası API yanıtı alınamadı"
         }
     
+    @timed('gemini_generate_response')
+    def generate_response(self, prompt, text):
+        """Generate a response from the Gemini API"""
+        return self._generate_content([{"text": f"{prompt}\n\nMetin: {text}"}], 'generate_response')
+    
+    @timed('gemini_generate_chat_response')
     def generate_chat_response(self, prompt):
         """Generate a chat response from the Gemini API (without text parameter)"""
-        for attempt in range(self.max_retries):
-            try:
-                headers = {
-                    "Content-Type": "application/json",
-                    "x-goog-api-key": self.api_key
-                }
-                
-                data = {
-                    "contents": [
-                        {
-                            "parts": [
-                                {"text": prompt}
-                            ]
-                        }
-                    ]
-                }
-                
-                response = requests.post(
-                    self.api_url,
-                    headers=headers,
-                    json=data
-                )
-                
-                if response.status_code == 200:
-                    response_data = response.json()
-                    
-                    if not response_data.get('candidates'):
-                        return {
-                            'success': False,
-                            'message': "API boş yanıt döndürdü"
-                        }
-                    
-                    content = response_data['candidates'][0]['content']['parts'][0]['text']
-                    return {
-                        'success': True,
-                        'content': content
-                    }
-                else:
-                    if attempt < self.max_retries - 1:
-                        time.sleep(self.retry_delay)
-                    else:
-                        return {
-                            'success': False,
-                            'message': f"API hatası: {response.status_code} - {response.text}"
-                        }
-            except Exception as e:
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
-                else:
-                    return {
-                        'success': False,
-                        'message': f"API çağrısı sırasında hata: {str(e)}"
-                    }
+        return self._generate_content([{"text": prompt}], 'generate_chat_response')
+    
+    def _image_part(self, image_path):
+        """Build an inline image part for the Gemini API"""
+        mime_type, encoded_image = encode_image(image_path)
+        return {
+            "inline_data": {
+                "mime_type": mime_type,
+                "data": encoded_image
+            }
+        }
+    
+    @timed('gemini_generate_vision_response')
+    def generate_vision_response(self, prompt, image_path):
+        """Generate a response from the Gemini API based on an image"""
+        try:
+            parts = [{"text": prompt}, self._image_part(image_path)]
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f"Görsel okunamadı: {str(e)}"
+            }
+        
+        return self._generate_content(parts, 'generate_vision_response')
+    
+    @timed('gemini_generate_batch_vision_response')
+    def generate_batch_vision_response(self, prompt, image_paths):
+        """Generate separate analyses for several images with a single Gemini request"""
+        try:
+            parts = [{"text": build_batch_vision_prompt(prompt, len(image_paths))}]
+            parts.extend(self._image_part(image_path) for image_path in image_paths)
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f"Görsel okunamadı: {str(e)}"
+            }
+        
+        api_response = self._generate_content(parts, 'generate_batch_vision_response')
+        if not api_response.get('success'):
+            return api_response
+        
+        contents = split_batch_vision_response(api_response['content'], len(image_paths))
+        if contents is None:
+            return {
+                'success': False,
+                'message': "Toplu yanıt görsellere ayrılamadı"
+            }
         
         return {
-            'success': False,
-            'message': f"{self.max_retries} deneme sonrası API yanıtı alınamadı"
+            'success': True,
+            'contents': contents
         }
     
     def extract_json(self, text):
@@ -0,0 +1,131 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Brotli isteğe bağlıdır; paket kurulu değilse yalnızca gzip ile sıkıştırılır
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+def content_etag(data):
+    """Strong ETag value (without quotes) derived from the SHA-256 of a body"""
+    return hashlib.sha256(data).hexdigest()[:32]
+
+def negotiate_encoding(accept_encodings, size, min_size=1024):
+    """
+    Pick the response encoding for a body of the given size
+
+    Args:
+        accept_encodings: The request's Accept-Encoding header (werkzeug Accept object)
+        size (int): Body size in bytes
+        min_size (int): Smaller bodies are sent uncompressed
+
+    Returns:
+        str: 'br', 'gzip' or None
+    """
+    if size < min_size:
+        return None
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+class CachedBody:
+    """A serialized response body with its ETag and lazily compressed variants"""
+
+    def __init__(self, body):
+        self.body = body
+        self.etag = content_etag(body)
+        self.encoded = {}
+
+    def encode(self, encoding):
+        data = self.encoded.get(encoding)
+        if data is None:
+            if encoding == 'br':
+                data = brotli.compress(self.body, quality=5)
+            else:
+                # mtime=0: aynı içerik her seferinde aynı baytlara sıkıştırılır
+                data = gzip.compress(self.body, compresslevel=6, mtime=0)
+            self.encoded[encoding] = data
+        return data
+
+class ResponseCache:
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        """
+        LRU cache of serialized response bodies
+
+        Every entry is stored with a fingerprint (a cheap summary of the rows and
+        files the body was built from); a lookup with a different fingerprint misses,
+        so entries never have to be invalidated explicitly.
+
+        Args:
+            max_bytes (int): Total size of the cached (uncompressed) bodies
+        """
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, fingerprint):
+        """Return the CachedBody stored for key if it was built from the same fingerprint"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != fingerprint:
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, fingerprint, body):
+        """Store a body and return its CachedBody"""
+        cached = CachedBody(body)
+        if len(body) > self.max_bytes:
+            return cached
+
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= len(previous[1].body)
+            self.entries[key] = (fingerprint, cached)
+            self.total_bytes += len(body)
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.total_bytes -= len(evicted.body)
+        return cached
+
+class FileDigests:
+    def __init__(self, max_entries=1024, block_size=1024 * 1024):
+        """Content ETags of files, recomputed only when a file's size or mtime changes"""
+        self.max_entries = max_entries
+        self.block_size = block_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def etag(self, path, stat):
+        """
+        Return the content ETag of a file
+
+        Args:
+            path (str): File path
+            stat (os.stat_result): Current stat of the file (the cache key)
+        """
+        key = (path, stat.st_size, stat.st_mtime_ns)
+        with self.lock:
+            etag = self.entries.get(key)
+            if etag is not None:
+                self.entries.move_to_end(key)
+                return etag
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(self.block_size), b''):
+                digest.update(block)
+        etag = digest.hexdigest()[:32]
+
+        with self.lock:
+            self.entries[key] = etag
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return etag
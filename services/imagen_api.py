@@ -4,114 +4,239 @@ import json
 import os
 import io
 import datetime
-from PIL import Image
+import hashlib
+import threading
+import uuid
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from services.metrics import timed, record_llm_call
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_ASPECT_RATIOS = {"1:1", "16:9", "9:16", "4:3", "3:4"}
+
+# Dosya başlığına göre görsel formatı tespiti (decode etmeden)
+IMAGE_SIGNATURES = [
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif')
+]
+
+# Kaydedilen görsellerin alabileceği uzantılar (WEBP RIFF başlığından ayrıca tespit edilir)
+IMAGE_EXTENSIONS = {extension for _, extension in IMAGE_SIGNATURES} | {'jpeg', 'webp'}
 
 class ImagenAPI:
-    def __init__(self, api_key):
+    def __init__(self, api_key, max_concurrency=4, cache_size=32):
         self.api_key = api_key
         # Yeni Gemini API endpoint'i
         self.base_url = "https://generativelanguage.googleapis.com/v1"
+        # Aynı anda gönderilecek en fazla istek sayısı
+        self.max_concurrency = max_concurrency
+        # prompt + parametre anahtarlı, en son kullanılan görsellerin önbelleği
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+    
+    def _cache_key(self, prompt, num_images, aspect_ratio):
+        """Build a cache key from the prompt and generation parameters"""
+        raw = json.dumps([prompt, num_images, aspect_ratio], ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    
+    def _get_cached(self, key):
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                return dict(entry)
+            return None
     
+    def _set_cached(self, key, images):
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = {'images': images, 'saved_paths': None}
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
+    def _request_images(self, prompt, aspect_ratio):
+        """Send a single generation request and return the list of image bytes"""
+        # Gemini için yeni endpoint ve parametreleri 
+        headers = {
+            "Content-Type": "application/json",
+            "x-goog-api-key": self.api_key
+        }
+        
+        # Gemini-1.5 Pro model kullanma
+        url = f"{self.base_url}/models/gemini-1.5-pro:generateContent"
+        
+        data = {
+            "contents": [
+                {
+                    "parts": [
+                        {"text": f"{prompt}\n\nGörsel en-boy oranı: {aspect_ratio}"},
+                        {
+                            "inlineData": {
+                                "mimeType": "image/png",
+                                "isGenerating": True
+                            }
+                        }
+                    ]
+                }
+            ],
+            "generationConfig": {
+                "temperature": 0.4,
+                "topP": 1,
+                "topK": 32,
+                "maxOutputTokens": 2048
+            }
+        }
+        
+        try:
+            response = requests.post(url, headers=headers, json=data)
+        except Exception:
+            record_llm_call('imagen', 'generate_image', False, len(prompt))
+            raise
+        record_llm_call('imagen', 'generate_image', response.status_code == 200,
+                        len(prompt), len(response.content))
+        
+        if response.status_code != 200:
+            raise Exception(f"API hatası: {response.status_code} - {response.text}")
+        
+        result = response.json()
+        images = []
+        
+        # API yanıtından görsel verilerini çıkar
+        for candidate in result.get("candidates", []):
+            for part in candidate.get("content", {}).get("parts", []):
+                if part.get("inlineData") and part["inlineData"].get("data"):
+                    images.append(base64.b64decode(part["inlineData"]["data"]))
+        
+        return images
+    
+    @timed('imagen_generate_image')
     def generate_image(self, prompt, num_images=1, aspect_ratio="1:1"):
-        """Generate images using Google's Gemini API"""
+        """Generate images using Google's Gemini API (one concurrent request per image)"""
         if not self.api_key or len(self.api_key) < 10:
             return {
                 'success': False,
                 'message': 'Geçersiz API anahtarı'
             }
         
-        try:
-            # Gemini için yeni endpoint ve parametreleri 
-            headers = {
-                "Content-Type": "application/json",
-                "x-goog-api-key": self.api_key
-            }
-            
-            # Aspect ratio'yu ayarla
-            ar_width, ar_height = 1, 1
-            if aspect_ratio == "16:9":
-                ar_width, ar_height = 16, 9
-            elif aspect_ratio == "9:16":
-                ar_width, ar_height = 9, 16
-            elif aspect_ratio == "4:3":
-                ar_width, ar_height = 4, 3
-            elif aspect_ratio == "3:4":
-                ar_width, ar_height = 3, 4
-            
-            # Gemini-1.5 Pro model kullanma
-            url = f"{self.base_url}/models/gemini-1.5-pro:generateContent"
-            
-            data = {
-                "contents": [
-                    {
-                        "parts": [
-                            {"text": prompt},
-                            {
-                                "inlineData": {
-                                    "mimeType": "image/png",
-                                    "isGenerating": True
-                                }
-                            }
-                        ]
-                    }
-                ],
-                "generationConfig": {
-                    "temperature": 0.4,
-                    "topP": 1,
-                    "topK": 32,
-                    "maxOutputTokens": 2048
-                }
+        if aspect_ratio not in SUPPORTED_ASPECT_RATIOS:
+            aspect_ratio = "1:1"
+        num_images = max(1, int(num_images))
+        
+        cache_key = self._cache_key(prompt, num_images, aspect_ratio)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return {
+                'success': True,
+                'images': list(cached['images']),
+                'count': len(cached['images']),
+                'cached': True,
+                'cache_key': cache_key,
+                'saved_paths': cached['saved_paths']
             }
-            
-            response = requests.post(url, headers=headers, json=data)
-            
-            if response.status_code == 200:
-                result = response.json()
-                images = []
-                
-                # API yanıtından görsel verilerini çıkar
-                if "candidates" in result and len(result["candidates"]) > 0:
-                    # Her bir adaydan görsel bilgilerini al
-                    for candidate in result["candidates"]:
-                        for part in candidate.get("content", {}).get("parts", []):
-                            if part.get("inlineData") and part["inlineData"].get("data"):
-                                image_b64 = part["inlineData"]["data"]
-                                image_bytes = base64.b64decode(image_b64)
-                                images.append(image_bytes)
-                
-                return {
-                    'success': True,
-                    'images': images,
-                    'count': len(images)
-                }
-            else:
-                return {
-                    'success': False,
-                    'message': f"API hatası: {response.status_code} - {response.text}"
-                }
-                
-        except Exception as e:
+        
+        images = []
+        errors = []
+        max_workers = max(1, min(num_images, self.max_concurrency))
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self._request_images, prompt, aspect_ratio) for _ in range(num_images)]
+            for future in futures:
+                try:
+                    images.extend(future.result())
+                except Exception as e:
+                    errors.append(str(e))
+        
+        images = images[:num_images]
+        
+        if not images:
             return {
                 'success': False,
-                'message': f"Görsel oluşturma sırasında hata: {str(e)}"
+                'message': errors[0] if errors else "API görsel döndürmedi"
             }
+        
+        # Yalnızca istenen sayıda görsel üretildiyse önbelleğe al
+        if len(images) == num_images:
+            self._set_cached(cache_key, images)
+        
+        return {
+            'success': True,
+            'images': images,
+            'count': len(images),
+            'cached': False,
+            'cache_key': cache_key
+        }
     
+    def remember_saved_paths(self, cache_key, saved_paths):
+        """Store where the images of a cached result were saved, so a cache hit can reuse the files"""
+        with self._cache_lock:
+            entry = self._cache.get(cache_key)
+            if entry is not None and len(saved_paths) == len(entry['images']):
+                entry['saved_paths'] = list(saved_paths)
+    
+    def detect_image_format(self, img_bytes):
+        """Detect the image format from its header bytes without decoding it"""
+        for signature, extension in IMAGE_SIGNATURES:
+            if img_bytes.startswith(signature):
+                return extension
+        if img_bytes[:4] == b'RIFF' and img_bytes[8:12] == b'WEBP':
+            return 'webp'
+        return None
+    
+    @timed('imagen_save_images')
     def save_generated_images(self, images, output_dir, prefix="generated_image"):
-        """Save generated images to disk"""
+        """Save generated images to disk (bytes are written as-is when the format is known)"""
         saved_paths = []
         
         os.makedirs(output_dir, exist_ok=True)
         
+        timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+        
         for i, img_bytes in enumerate(images):
             try:
-                img = Image.open(io.BytesIO(img_bytes))
-                timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
-                filename = f"{prefix}_{timestamp}_{i+1}.png"
+                # Aynı saniyede oluşturulan görsellerin çakışmaması için benzersiz ek
+                unique_id = uuid.uuid4().hex[:8]
+                extension = self.detect_image_format(img_bytes)
+                
+                if extension is None:
+                    # Bilinmeyen format: yalnızca bu durumda decode edip PNG'ye çevir
+                    from PIL import Image
+                    extension = 'png'
+                    buffer = io.BytesIO()
+                    with Image.open(io.BytesIO(img_bytes)) as img:
+                        img.save(buffer, format='PNG')
+                    img_bytes = buffer.getvalue()
+                
+                filename = f"{prefix}_{timestamp}_{unique_id}_{i+1}.{extension}"
                 file_path = os.path.join(output_dir, filename)
                 
-                img.save(file_path)
+                # 'x' modu mevcut bir dosyanın üzerine yazılmasını engeller
+                with open(file_path, 'xb') as f:
+                    f.write(img_bytes)
                 saved_paths.append(file_path)
             except Exception as e:
-                print(f"Error saving image {i}: {str(e)}")
+                logger.error("Error saving image %d: %s", i, e)
                 
-        return saved_paths
\ No newline at end of file
+        return saved_paths
+    
+    @timed('create_thumbnail')
+    def create_thumbnail(self, source_path, thumbnail_path, size):
+        """Create a JPEG thumbnail of an image, writing it atomically"""
+        os.makedirs(os.path.dirname(thumbnail_path), exist_ok=True)
+        temp_path = f"{thumbnail_path}.{uuid.uuid4().hex[:8]}.tmp"
+        
+        from PIL import Image
+        with Image.open(source_path) as img:
+            # JPEG kaynaklarda tam çözünürlükte decode etmeden küçült
+            img.draft('RGB', (size, size))
+            img.thumbnail((size, size))
+            img.convert('RGB').save(temp_path, format='JPEG', quality=85, optimize=True)
+        
+        os.replace(temp_path, thumbnail_path)
+        return thumbnail_path
@@ -0,0 +1,255 @@
+import uuid
+import time
+import threading
+import datetime
+from collections import defaultdict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from services.metrics import STAGE_DURATION
+
+# İş öncelikleri (küçük değer önce çalışır)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+class JobCancelled(Exception):
+    """Raised inside a job when it has been cancelled by the user"""
+    pass
+
+class PriorityScheduler:
+    def __init__(self, max_concurrency=4, reserved_interactive=1):
+        """
+        Limit concurrent LLM calls, serving interactive work before bulk work
+
+        Args:
+            max_concurrency (int): Number of LLM calls allowed at the same time
+            reserved_interactive (int): Slots that bulk jobs may never occupy
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.reserved_interactive = min(max(0, reserved_interactive), self.max_concurrency - 1)
+        self.condition = threading.Condition()
+        self.active = 0
+        self.active_bulk = 0
+        self.waiting = []
+        self.served = defaultdict(int)
+        self.sequence = 0
+
+    def _sort_key(self, ticket):
+        # Öncelik, ardından kullanıcı başına adil paylaşım, ardından geliş sırası
+        return (ticket['priority'], self.served[ticket['user']], ticket['sequence'])
+
+    def _can_run(self, ticket):
+        if self.active >= self.max_concurrency:
+            return False
+        if ticket['priority'] != PRIORITY_INTERACTIVE:
+            if self.active_bulk >= self.max_concurrency - self.reserved_interactive:
+                return False
+        return min(self.waiting, key=self._sort_key) is ticket
+
+    def acquire(self, priority=PRIORITY_INTERACTIVE, user=None, cancel_check=None):
+        """Wait for a free slot, giving up if cancel_check() becomes true; pair with release()"""
+        with self.condition:
+            self.sequence += 1
+            ticket = {'priority': priority, 'user': user, 'sequence': self.sequence}
+            self.waiting.append(ticket)
+            try:
+                while not self._can_run(ticket):
+                    if cancel_check and cancel_check():
+                        raise JobCancelled()
+                    self.condition.wait(timeout=0.5)
+            finally:
+                self.waiting.remove(ticket)
+                # Sıradaki bekleyenin değerlendirilmesi için diğer thread'leri uyandır
+                self.condition.notify_all()
+
+            self.active += 1
+            if priority != PRIORITY_INTERACTIVE:
+                self.active_bulk += 1
+            self.served[user] += 1
+
+    def release(self, priority=PRIORITY_INTERACTIVE):
+        """Free a slot taken with acquire()"""
+        with self.condition:
+            self.active -= 1
+            if priority != PRIORITY_INTERACTIVE:
+                self.active_bulk -= 1
+            if not self.waiting:
+                # Kuyruk boşaldığında adil paylaşım sayaçlarını sıfırla
+                self.served.clear()
+            self.condition.notify_all()
+
+    @contextmanager
+    def slot(self, priority=PRIORITY_INTERACTIVE, user=None, cancel_check=None):
+        """Hold a slot for the duration of the with block"""
+        self.acquire(priority, user, cancel_check)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+class JobManager:
+    def __init__(self, max_workers=2, max_finished_jobs=200, llm_concurrency=4, reserved_interactive=1):
+        """
+        Run long operations in background threads and keep track of their status
+
+        Args:
+            max_workers (int): Number of jobs that may run at the same time
+            max_finished_jobs (int): Number of finished jobs kept in memory for polling
+            llm_concurrency (int): Number of LLM calls allowed at the same time
+            reserved_interactive (int): LLM slots reserved for interactive work
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        # İptal edilen çağrıların bekletilmeden bırakılabilmesi için ayrı havuz
+        self.call_executor = ThreadPoolExecutor(max_workers=max(4, llm_concurrency * 2))
+        self.scheduler = PriorityScheduler(llm_concurrency, reserved_interactive)
+        self.max_finished_jobs = max_finished_jobs
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def _new_job(self, job_id, job_type, priority, user, resume_key=None):
+        return {
+            'id': job_id,
+            'type': job_type,
+            'resume_key': resume_key,
+            'status': 'pending',
+            'priority': priority,
+            'user': user,
+            'cancel_requested': False,
+            'created_at': datetime.datetime.now().isoformat(),
+            'started_at': None,
+            'finished_at': None,
+            'result': None,
+            'message': None
+        }
+
+    def submit(self, job_type, func, *args, priority=PRIORITY_BULK, user=None, **kwargs):
+        """Queue a function as a background job and return its id"""
+        job_id = uuid.uuid4().hex
+
+        with self.lock:
+            self.jobs[job_id] = self._new_job(job_id, job_type, priority, user)
+            self._prune_finished_jobs()
+
+        self.executor.submit(self._run, job_id, func, args, kwargs)
+        return job_id
+
+    def register(self, job_id, job_type, priority=PRIORITY_BULK, user=None, resume_key=None):
+        """
+        Track a job that runs in the caller's thread (e.g. inside a request)
+
+        Args:
+            resume_key (str): Checkpoint key of the job; only one live job may use it
+
+        Returns:
+            str: Id of the live job with the same id or resume key (nothing is registered),
+            or None if the job was registered
+        """
+        with self.lock:
+            for other in self.jobs.values():
+                if other['status'] in ('pending', 'running') and \
+                        (other['id'] == job_id or (resume_key and other['resume_key'] == resume_key)):
+                    return other['id']
+
+            job = self._new_job(job_id, job_type, priority, user, resume_key)
+            job['status'] = 'running'
+            job['started_at'] = job['created_at']
+            self.jobs[job_id] = job
+            self._prune_finished_jobs()
+            return None
+
+    def finish(self, job_id, status, message=None):
+        """Mark a registered job as completed, failed or cancelled"""
+        self._update(job_id, status=status, message=message,
+                     finished_at=datetime.datetime.now().isoformat())
+
+    def _run(self, job_id, func, args, kwargs):
+        if self.is_cancelled(job_id):
+            self.finish(job_id, 'cancelled')
+            return
+
+        self._update(job_id, status='running', started_at=datetime.datetime.now().isoformat())
+        try:
+            result = func(*args, **kwargs)
+            self._update(job_id, status='completed', result=result,
+                         finished_at=datetime.datetime.now().isoformat())
+        except JobCancelled:
+            self.finish(job_id, 'cancelled')
+        except Exception as e:
+            self.finish(job_id, 'failed', str(e))
+
+    def _update(self, job_id, **fields):
+        with self.lock:
+            if job_id in self.jobs:
+                self.jobs[job_id].update(fields)
+
+    def _prune_finished_jobs(self):
+        """Drop the oldest finished jobs when too many are kept (lock must be held)"""
+        finished = [job_id for job_id, job in self.jobs.items()
+                    if job['status'] in ('completed', 'failed', 'cancelled')]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self.jobs[job_id]
+
+    def get_job(self, job_id):
+        """Return a copy of a job's status, or None if it is unknown"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def cancel(self, job_id):
+        """Request cooperative cancellation of a job; returns False if it is unknown or finished"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if not job or job['status'] in ('completed', 'failed', 'cancelled'):
+                return False
+            job['cancel_requested'] = True
+            return True
+
+    def is_cancelled(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return bool(job and job['cancel_requested'])
+
+    def raise_if_cancelled(self, job_id):
+        if job_id and self.is_cancelled(job_id):
+            raise JobCancelled()
+
+    def call(self, func, *args, job_id=None, priority=None, user=None):
+        """
+        Run an LLM call through the priority scheduler
+
+        The call is abandoned (its result ignored) as soon as the job is cancelled.
+        """
+        job = self.get_job(job_id) if job_id else None
+        if priority is None:
+            priority = job['priority'] if job else PRIORITY_INTERACTIVE
+        if user is None and job:
+            user = job['user']
+
+        cancel_check = (lambda: self.is_cancelled(job_id)) if job_id else None
+        self.raise_if_cancelled(job_id)
+
+        queued_at = time.perf_counter()
+        self.scheduler.acquire(priority, user, cancel_check)
+        # Zamanlayıcıda bekleme süresi (eşzamanlılık ayarı için)
+        STAGE_DURATION.observe(time.perf_counter() - queued_at,
+                               stage='llm_queue_wait_interactive' if priority == PRIORITY_INTERACTIVE else 'llm_queue_wait_bulk')
+        if not job_id:
+            try:
+                return func(*args)
+            finally:
+                self.scheduler.release(priority)
+
+        try:
+            future = self.call_executor.submit(func, *args)
+        except Exception:
+            self.scheduler.release(priority)
+            raise
+        # Slot çağrı gerçekten bittiğinde bırakılır: iptal edilen işin bırakılan (hâlâ süren)
+        # HTTP çağrısı da eşzamanlılık sınırına sayılmaya devam eder
+        future.add_done_callback(lambda _: self.scheduler.release(priority))
+        while True:
+            try:
+                return future.result(timeout=0.5)
+            except FutureTimeoutError:
+                if self.is_cancelled(job_id):
+                    future.cancel()
+                    raise JobCancelled()
@@ -2,17 +2,21 @@ import requests
 import json
 import time
 import base64
-from io import BytesIO
-from PIL import Image
+import logging
+from services.vision_utils import encode_image, build_batch_vision_prompt, split_batch_vision_response
+from services.metrics import timed, record_llm_call, request_body_bytes, LLM_RETRIES
+
+logger = logging.getLogger(__name__)
 
 class LlamaAPI:
-    def __init__(self, base_url="http://localhost:3001", api_key=None):
+    def __init__(self, base_url="http://localhost:3001", api_key=None, retry_delay=5):
         """
         Initialize the AnythingLLM API client for Llama 3.2
         
         Args:
             base_url (str): AnythingLLM API endpoint (default: http://localhost:3001)
             api_key (str): API key if required
+            retry_delay (float): Seconds to wait before retrying a failed request
         """
         # Browser Extension API formatı (http://localhost:3001/api|brx-XXXX) ise parse edelim
         if '|' in base_url:
@@ -31,8 +35,8 @@ class LlamaAPI:
             self.base_url = self.base_url[:-1]
             
         self.max_retries = 3
-        self.retry_delay = 5
-        print(f"LlamaAPI initialized with base_url: {self.base_url}, api_key: {'***' if self.api_key else 'None'}")
+        self.retry_delay = retry_delay
+        logger.debug("LlamaAPI initialized", extra={'base_url': self.base_url, 'has_api_key': bool(self.api_key)})
     
     def _get_headers(self):
         """Get headers for API requests"""
@@ -46,9 +50,12 @@ class LlamaAPI:
                 headers["x-api-key"] = self.api_key
         return headers
         
+    @timed('llama_generate_response')
     def generate_response(self, prompt, text):
         """Generate text response using AnythingLLM's API"""
         for attempt in range(self.max_retries):
+            if attempt:
+                LLM_RETRIES.inc(provider='llama')
             try:
                 # Prompt ve text'i birleştir
                 if text:
@@ -59,8 +66,6 @@ class LlamaAPI:
                 # AnythingLLM'in doğru endpoint'i (dokümantasyona göre)
                 endpoint = f"{self.base_url.split('|')[0]}/v1/workspace/chatting/chat"
                 
-                print(f"[LlamaAPI] Sending request to {endpoint}")
-                
                 # API anahtarı formatını düzelt - dokümantasyona göre x-api-key header'ı kullanılmalı
                 headers = {
                     "Content-Type": "application/json",
@@ -73,8 +78,8 @@ class LlamaAPI:
                     "mode": "chat"  # chat veya query modunu belirtin
                 }
                 
-                print(f"[LlamaAPI] Payload: {json.dumps(payload)[:200]}")
-                print(f"[LlamaAPI] Headers: {headers}")
+                # Başlıklar API anahtarı içerdiği için loglanmaz; gövde kısaltılarak yazılır
+                logger.debug("LlamaAPI request", extra={'endpoint': endpoint, 'payload': payload})
                 
                 response = requests.post(
                     endpoint,
@@ -83,11 +88,12 @@ class LlamaAPI:
                     timeout=60
                 )
                 
-                print(f"[LlamaAPI] Response status: {response.status_code}")
+                record_llm_call('llama', 'generate_response', response.status_code == 200,
+                                request_body_bytes(payload), len(response.content))
                 
                 if response.status_code == 200:
                     response_data = response.json()
-                    print(f"[LlamaAPI] Response data: {json.dumps(response_data)[:200]}")
+                    logger.debug("LlamaAPI response", extra={'status': response.status_code, 'response': response_data})
                     
                     # API'nin döndürdüğü yanıt formatına göre uyum sağla
                     if "textResponse" in response_data:
@@ -96,17 +102,17 @@ class LlamaAPI:
                             'content': response_data["textResponse"]
                         }
                     else:
-                        print(f"[LlamaAPI] Invalid response format: {json.dumps(response_data)}")
+                        logger.warning("LlamaAPI invalid response format", extra={'response': response_data})
                         return {
                             'success': False,
                             'message': "Geçersiz yanıt formatı"
                         }
                 else:
                     error_text = response.text[:500] if hasattr(response, 'text') else "No response text"
-                    print(f"[LlamaAPI] Error response: {error_text}")
+                    logger.warning("LlamaAPI error response", extra={'status': response.status_code, 'response': error_text})
                     
                     if attempt < self.max_retries - 1:
-                        print(f"[LlamaAPI] Retrying after error ({attempt+1}/{self.max_retries})")
+                        logger.info("LlamaAPI retrying after error (%d/%d)", attempt + 1, self.max_retries)
                         time.sleep(self.retry_delay)
                     else:
                         return {
@@ -114,7 +120,8 @@ class LlamaAPI:
                             'message': f"API hatası: {response.status_code} - {error_text}"
                         }
             except Exception as e:
-                print(f"[LlamaAPI] Exception: {str(e)}")
+                logger.error("LlamaAPI request failed: %s", e)
+                record_llm_call('llama', 'generate_response', False, request_body_bytes(payload))
                 if attempt < self.max_retries - 1:
                     time.sleep(self.retry_delay)
                 else:
@@ -128,12 +135,12 @@ class LlamaAPI:
             'message': f"{self.max_retries} deneme sonrası API yanıtı alınamadı"
         }
 
+    @timed('llama_generate_vision_response')
     def generate_vision_response(self, prompt, image_path):
         """Generate text response from vision model based on an image"""
         try:
             # Görüntüyü base64'e çevir
-            with open(image_path, "rb") as image_file:
-                encoded_image = base64.b64encode(image_file.read()).decode('utf-8')
+            mime_type, encoded_image = encode_image(image_path)
             
             # OpenAI uyumlu endpoint
             endpoint = f"{self.base_url}/v1/openai/chat/completions"
@@ -145,15 +152,13 @@ class LlamaAPI:
                     {"role": "system", "content": "Sen görüntüleri analiz edebilen yardımcı bir asistansın."},
                     {"role": "user", "content": [
                         {"type": "text", "text": prompt},
-                        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{encoded_image}"}}
+                        {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{encoded_image}"}}
                     ]}
                 ],
                 "temperature": 0.7,
                 "max_tokens": 1024
             }
             
-            print(f"[LlamaAPI] Sending vision request to {endpoint}")
-            
             response = requests.post(
                 endpoint,
                 headers=self._get_headers(),
@@ -161,10 +166,13 @@ class LlamaAPI:
                 timeout=120
             )
             
-            print(f"[LlamaAPI] Vision response status: {response.status_code}")
+            response_data = response.json() if response.status_code == 200 else {}
+            usage = response_data.get('usage') or {}
+            record_llm_call('llama', 'generate_vision_response', response.status_code == 200,
+                            request_body_bytes(payload), len(response.content),
+                            usage.get('prompt_tokens'), usage.get('completion_tokens'))
             
             if response.status_code == 200:
-                response_data = response.json()
                 
                 if "choices" in response_data and len(response_data["choices"]) > 0:
                     generated_text = response_data["choices"][0]["message"]["content"]
@@ -173,20 +181,92 @@ class LlamaAPI:
                         'content': generated_text
                     }
                 else:
-                    print(f"[LlamaAPI] Invalid vision response format: {json.dumps(response_data)[:200]}")
+                    logger.warning("LlamaAPI invalid vision response format", extra={'response': response_data})
+                    return {
+                        'success': False,
+                        'message': "Geçersiz yanıt formatı"
+                    }
+            else:
+                error_text = response.text[:200] if hasattr(response, 'text') else "No response text"
+                logger.warning("LlamaAPI vision error response", extra={'status': response.status_code, 'response': error_text})
+                return {
+                    'success': False,
+                    'message': f"Vision API hatası: {response.status_code} - {error_text}"
+                }
+        except Exception as e:
+            logger.error("LlamaAPI vision request failed: %s", e)
+            record_llm_call('llama', 'generate_vision_response', False)
+            return {
+                'success': False,
+                'message': f"Vision API çağrısı sırasında hata: {str(e)}"
+            }
+    
+    @timed('llama_generate_batch_vision_response')
+    def generate_batch_vision_response(self, prompt, image_paths):
+        """Generate separate analyses for several images with a single vision request"""
+        try:
+            # Görselleri sırayla, ayraçlı prompt ile aynı mesaja ekle
+            content = [{"type": "text", "text": build_batch_vision_prompt(prompt, len(image_paths))}]
+            for image_path in image_paths:
+                mime_type, encoded_image = encode_image(image_path)
+                content.append({"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{encoded_image}"}})
+            
+            endpoint = f"{self.base_url}/v1/openai/chat/completions"
+            
+            payload = {
+                "model": "llama",
+                "messages": [
+                    {"role": "system", "content": "Sen görüntüleri analiz edebilen yardımcı bir asistansın."},
+                    {"role": "user", "content": content}
+                ],
+                "temperature": 0.7,
+                "max_tokens": 1024 * len(image_paths)
+            }
+            
+            response = requests.post(
+                endpoint,
+                headers=self._get_headers(),
+                json=payload,
+                timeout=120 * len(image_paths)
+            )
+            
+            response_data = response.json() if response.status_code == 200 else {}
+            usage = response_data.get('usage') or {}
+            record_llm_call('llama', 'generate_batch_vision_response', response.status_code == 200,
+                            request_body_bytes(payload), len(response.content),
+                            usage.get('prompt_tokens'), usage.get('completion_tokens'))
+            
+            if response.status_code == 200:
+                
+                if "choices" in response_data and len(response_data["choices"]) > 0:
+                    generated_text = response_data["choices"][0]["message"]["content"]
+                    contents = split_batch_vision_response(generated_text, len(image_paths))
+                    if contents is None:
+                        return {
+                            'success': False,
+                            'message': "Toplu yanıt görsellere ayrılamadı"
+                        }
+                    return {
+                        'success': True,
+                        'contents': contents
+                    }
+                else:
+                    logger.warning("LlamaAPI invalid batch vision response format", extra={'response': response_data})
                     return {
                         'success': False,
                         'message': "Geçersiz yanıt formatı"
                     }
             else:
                 error_text = response.text[:200] if hasattr(response, 'text') else "No response text"
-                print(f"[LlamaAPI] Vision API error: {response.status_code} - {error_text}")
+                logger.warning("LlamaAPI batch vision error response",
+                               extra={'status': response.status_code, 'response': error_text, 'images': len(image_paths)})
                 return {
                     'success': False,
                     'message': f"Vision API hatası: {response.status_code} - {error_text}"
                 }
         except Exception as e:
-            print(f"[LlamaAPI] Vision exception: {str(e)}")
+            logger.error("LlamaAPI batch vision request failed: %s", e)
+            record_llm_call('llama', 'generate_batch_vision_response', False)
             return {
                 'success': False,
                 'message': f"Vision API çağrısı sırasında hata: {str(e)}"
@@ -212,7 +292,7 @@ class LlamaAPI:
             
             return None
         except Exception as e:
-            print(f"[LlamaAPI] JSON extraction error: {str(e)}")
+            logger.warning("LlamaAPI JSON extraction error: %s", e)
             raise Exception(f"JSON çıkarma hatası: {str(e)}")
     
     def test_connection(self):
@@ -227,23 +307,21 @@ class LlamaAPI:
             # Doğrudan auth endpoint'ini kullan
             endpoint = f"{self.base_url.split('|')[0]}/v1/auth"
             
-            print(f"[LlamaAPI] Testing connection to {endpoint}")
-            print(f"[LlamaAPI] Headers: {headers}")
-            
             response = requests.get(
                 endpoint,
                 headers=headers,
                 timeout=5
             )
             
-            print(f"[LlamaAPI] Auth response: {response.status_code} - {response.text}")
+            logger.info("LlamaAPI connection test", extra={'endpoint': endpoint, 'status': response.status_code})
+            logger.debug("LlamaAPI connection test response", extra={'response': response.text})
             
             # 403 hatası "No valid api key found" ise, API anahtarı formatı yanlış
             if response.status_code == 403 and "No valid api key found" in response.text:
-                print("[LlamaAPI] API key format is incorrect")
+                logger.warning("LlamaAPI API key format is incorrect")
                 return False
                 
             return response.status_code == 200
         except Exception as e:
-            print(f"[LlamaAPI] Connection test exception: {str(e)}")
+            logger.error("LlamaAPI connection test failed: %s", e)
             return False
\ No newline at end of file
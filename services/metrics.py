@@ -0,0 +1,170 @@
+import json
+import time
+import bisect
+import threading
+from functools import wraps
+
+# Gecikme histogramlarının varsayılan üst sınırları (saniye)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self.lock:
+            items = sorted(self.values.items())
+        for key, value in items:
+            lines.append(f'{self.name}{_format_labels(self.labelnames, key)} {value}')
+        return lines
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.values.get(key)
+            if series is None:
+                # Kova sayıları (son eleman +Inf), toplam süre, gözlem sayısı
+                series = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self.lock:
+            items = sorted((key, ([*counts], total, count)) for key, (counts, total, count) in self.values.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, key, ("le", bound))} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, key)} {total}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, key)} {count}')
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(name, documentation, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+# Süreç başına tek kayıt defteri (her worker süreci kendi değerlerini sunar)
+registry = MetricsRegistry()
+
+STAGE_DURATION = registry.histogram(
+    'aitextkit_stage_duration_seconds', 'Duration of pipeline stages', ('stage',))
+STAGE_ERRORS = registry.counter(
+    'aitextkit_stage_errors_total', 'Pipeline stages that raised an exception', ('stage',))
+HTTP_REQUEST_DURATION = registry.histogram(
+    'aitextkit_http_request_duration_seconds', 'Duration of HTTP requests', ('method', 'endpoint'))
+HTTP_REQUESTS = registry.counter(
+    'aitextkit_http_requests_total', 'HTTP requests by status code', ('method', 'endpoint', 'status'))
+LLM_REQUESTS = registry.counter(
+    'aitextkit_llm_requests_total', 'LLM API requests by outcome', ('provider', 'operation', 'status'))
+LLM_RETRIES = registry.counter(
+    'aitextkit_llm_retries_total', 'LLM API requests that were retried', ('provider',))
+LLM_BYTES = registry.counter(
+    'aitextkit_llm_bytes_total', 'Bytes sent to and received from LLM APIs', ('provider', 'direction'))
+LLM_TOKENS = registry.counter(
+    'aitextkit_llm_tokens_total', 'Tokens reported by LLM APIs', ('provider', 'kind'))
+LOG_RECORDS_DROPPED = registry.counter(
+    'aitextkit_log_records_dropped_total', 'Log records dropped because the logging queue was full')
+DB_LOCK_WAIT = registry.histogram(
+    'aitextkit_db_lock_wait_seconds', 'Time spent waiting for the SQLite write lock',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5))
+DB_LOCK_ERRORS = registry.counter(
+    'aitextkit_db_lock_errors_total', 'SQLite write transactions that failed because the database was locked')
+
+class timed:
+    """Record the duration of a stage; usable as a decorator or a context manager"""
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        STAGE_DURATION.observe(time.perf_counter() - self.start, stage=self.stage)
+        if exc_type is not None:
+            STAGE_ERRORS.inc(stage=self.stage)
+        return False
+
+    def __call__(self, func):
+        stage = self.stage
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                STAGE_ERRORS.inc(stage=stage)
+                raise
+            finally:
+                STAGE_DURATION.observe(time.perf_counter() - start, stage=stage)
+        return wrapper
+
+def request_body_bytes(payload):
+    """Size in bytes of a JSON request body as requests serializes it"""
+    return len(json.dumps(payload).encode('utf-8'))
+
+def record_llm_call(provider, operation, success, sent_bytes=0, received_bytes=0,
+                    prompt_tokens=None, completion_tokens=None):
+    """Count an LLM API request with its payload sizes and reported token usage"""
+    LLM_REQUESTS.inc(provider=provider, operation=operation, status='success' if success else 'error')
+    if sent_bytes:
+        LLM_BYTES.inc(sent_bytes, provider=provider, direction='sent')
+    if received_bytes:
+        LLM_BYTES.inc(received_bytes, provider=provider, direction='received')
+    if prompt_tokens:
+        LLM_TOKENS.inc(prompt_tokens, provider=provider, kind='prompt')
+    if completion_tokens:
+        LLM_TOKENS.inc(completion_tokens, provider=provider, kind='completion')
@@ -0,0 +1,233 @@
+import io
+import os
+import csv
+import json
+import zipfile
+import datetime
+
+from werkzeug.utils import secure_filename
+
+from database.db import decode_content
+
+EXPORT_FORMATS = {
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'csv': ('text/csv', 'csv'),
+    'zip': ('application/zip', 'zip')
+}
+
+CSV_COLUMNS = ['result_id', 'title', 'result_type', 'created_at', 'tags', 'soru', 'cevap', 'content']
+
+# Yanıta/dosyaya tek seferde yazılan en küçük parça (satır satır yazmanın maliyetini önler)
+OUTPUT_CHUNK_SIZE = 64 * 1024
+
+def parse_date_range(since=None, until=None):
+    """
+    Turn 'YYYY-MM-DD' (or full ISO) bounds into created_at comparison values
+
+    A bare date as the upper bound includes that whole day. Raises ValueError for invalid dates.
+    """
+    start = datetime.datetime.fromisoformat(since) if since else None
+    end = datetime.datetime.fromisoformat(until) if until else None
+    if end is not None and len(until) == 10:
+        end += datetime.timedelta(days=1)
+    return start, end
+
+def iter_results(conn, result_type=None, since=None, until=None, tags=None, batch_size=500, after_id=0):
+    """
+    Yield saved results as dicts in id order
+
+    Rows are read in batches with keyset pagination (id > last id), each batch as a
+    separate short query, so only one batch is in memory and no read transaction stays
+    open for the whole export (long readers would keep SQLite from checkpointing the WAL).
+
+    Args:
+        conn: sqlite3 connection with row_factory = sqlite3.Row
+        result_type (str): Only results of this type
+        since (datetime): Only results created at or after this time
+        until (datetime): Only results created before this time
+        tags (list): Only results whose processing log has all of these tags
+        batch_size (int): Rows per query
+        after_id (int): Only results with a larger id (for incremental processing)
+    """
+    conditions = ['s.id > ?']
+    params = []
+    if result_type:
+        conditions.append('s.result_type = ?')
+        params.append(result_type)
+    if since:
+        conditions.append('s.created_at >= ?')
+        params.append(since)
+    if until:
+        conditions.append('s.created_at < ?')
+        params.append(until)
+
+    query = f'''
+        SELECT s.id, s.title, s.description, s.result_type, s.content, s.source_file,
+               s.created_at, s.processing_log_id, l.tags
+        FROM saved_results s
+        LEFT JOIN processing_logs l ON l.id = s.processing_log_id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY s.id LIMIT ?
+    '''
+    wanted_tags = set(tags or [])
+    last_id = after_id
+
+    while True:
+        rows = conn.execute(query, [last_id] + params + [batch_size]).fetchall()
+        for row in rows:
+            try:
+                result_tags = json.loads(row['tags']) if row['tags'] else []
+            except ValueError:
+                result_tags = []
+            if wanted_tags and not wanted_tags.issubset(result_tags):
+                continue
+
+            result = dict(row)
+            result['tags'] = result_tags
+            result['content'] = decode_content(row['content'])
+            yield result
+
+        if len(rows) < batch_size:
+            break
+        last_id = rows[-1]['id']
+
+def qa_pairs(content):
+    """Return the question/answer pairs of a Q&A result, or None for other contents"""
+    if not isinstance(content, str) or not content.lstrip().startswith('{'):
+        return None
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return None
+    pairs = data.get('soru-cevaplar') if isinstance(data, dict) else None
+    return pairs if isinstance(pairs, list) else None
+
+def _chunked(pieces, size=OUTPUT_CHUNK_SIZE):
+    # Küçük parçaları birleştirip en az size baytlık bloklar halinde ver
+    buffer = []
+    buffered = 0
+    for piece in pieces:
+        buffer.append(piece)
+        buffered += len(piece)
+        if buffered >= size:
+            yield b''.join(buffer)
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield b''.join(buffer)
+
+def _jsonl_lines(results, stats):
+    for result in results:
+        stats['results'] += 1
+        pairs = qa_pairs(result['content'])
+        if pairs is None:
+            # Soru-cevap olmayan sonuçlar tek satır olarak yazılır
+            records = [{'result_id': result['id'], 'title': result['title'],
+                        'result_type': result['result_type'], 'content': result['content']}]
+        else:
+            records = [{'result_id': result['id'], 'soru': pair.get('soru'), 'cevap': pair.get('cevap')}
+                       for pair in pairs if isinstance(pair, dict)]
+        for record in records:
+            stats['records'] += 1
+            yield (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+
+def _csv_lines(results, stats):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # Excel'in Türkçe karakterleri doğru açması için UTF-8 BOM
+    yield '\ufeff'.encode('utf-8')
+    writer.writerow(CSV_COLUMNS)
+
+    for result in results:
+        stats['results'] += 1
+        common = [result['id'], result['title'], result['result_type'], result['created_at'],
+                  ','.join(map(str, result['tags']))]
+        pairs = qa_pairs(result['content'])
+        if pairs is None:
+            writer.writerow(common + ['', '', result['content']])
+            stats['records'] += 1
+        else:
+            for pair in pairs:
+                if isinstance(pair, dict):
+                    writer.writerow(common + [pair.get('soru'), pair.get('cevap'), ''])
+                    stats['records'] += 1
+
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+
+class _ZipOutput(io.RawIOBase):
+    """Write-only, non-seekable sink for ZipFile; written bytes are drained by the export generator"""
+
+    def __init__(self):
+        super().__init__()
+        self.pieces = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.pieces.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        # ZipFile yerel başlık konumlarını tell() ile kaydeder
+        return self.position
+
+    def drain(self):
+        pieces, self.pieces = self.pieces, []
+        return pieces
+
+def _zip_entries(results, results_folder, stats):
+    output = _ZipOutput()
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for result in results:
+            stats['results'] += 1
+            source_file = secure_filename(result['source_file'] or '')
+            source_path = os.path.join(results_folder, source_file) if source_file else None
+
+            if source_path and os.path.isfile(source_path):
+                # Dosya blok blok okunup arşive yazılır; her bloktan sonra çıktı boşaltılır
+                size = os.path.getsize(source_path)
+                with open(source_path, 'rb') as source, \
+                        archive.open(f"{result['id']}_{source_file}", 'w', force_zip64=size > zipfile.ZIP64_LIMIT) as target:
+                    for block in iter(lambda: source.read(OUTPUT_CHUNK_SIZE), b''):
+                        target.write(block)
+                        yield from output.drain()
+            else:
+                # Dosyası silinmiş/hiç yazılmamış sonuçlar veritabanındaki içerikten yazılır
+                name = source_file or f"{secure_filename(result['title'] or '') or 'sonuc'}.txt"
+                archive.writestr(f"{result['id']}_{name}", result['content'] or '')
+            stats['records'] += 1
+            yield from output.drain()
+    # Merkezi dizin arşiv kapatılırken yazılır
+    yield from output.drain()
+
+def export_results(results, export_format, results_folder=None, stats=None):
+    """
+    Stream results in the given format as byte chunks
+
+    Args:
+        results: Iterable of result dicts (see iter_results)
+        export_format (str): 'jsonl' (one Q&A pair per line), 'csv' or 'zip' (result files)
+        results_folder (str): Folder of the result files (zip only)
+        stats (dict): Filled with the number of exported results and records
+
+    Returns:
+        generator: Chunks of at least OUTPUT_CHUNK_SIZE bytes (except the last one)
+    """
+    if stats is None:
+        stats = {}
+    stats.update(results=0, records=0)
+
+    if export_format == 'jsonl':
+        pieces = _jsonl_lines(results, stats)
+    elif export_format == 'csv':
+        pieces = _csv_lines(results, stats)
+    elif export_format == 'zip':
+        pieces = _zip_entries(results, results_folder, stats)
+    else:
+        raise ValueError(f'Desteklenmeyen dışa aktarma biçimi: {export_format}')
+    return _chunked(pieces)
@@ -0,0 +1,110 @@
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+def scan_files(folder):
+    """List the regular files directly inside a folder as dicts (sub folders are skipped)"""
+    entries = []
+    if not os.path.isdir(folder):
+        return entries
+
+    with os.scandir(folder) as it:
+        for entry in it:
+            try:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                # Tarama sırasında silinen dosya
+                continue
+            entries.append({
+                'name': entry.name,
+                'path': entry.path,
+                'size': stat.st_size,
+                'mtime': stat.st_mtime
+            })
+
+    return entries
+
+def select_expired_files(entries, max_age=None, max_bytes=None, referenced=None, orphan_grace=None, now=None):
+    """
+    Pick the files to delete according to the retention policy
+
+    Files named in referenced are never deleted; the age and size limits only apply
+    to the remaining (unreferenced) files.
+
+    Args:
+        entries (list): Files returned by scan_files
+        max_age (float): Seconds after which an unreferenced file expires (None = no age limit)
+        max_bytes (int): Size budget of the unreferenced files; oldest are removed beyond it (None = no limit)
+        referenced (set): Names still in use (None = references are not checked)
+        orphan_grace (float): Seconds an unreferenced file is kept before it is removed (needs referenced)
+        now (float): Current time, for testing
+
+    Returns:
+        list: Entries to delete, each with a 'reason' key
+    """
+    now = now or time.time()
+    expired = []
+    kept = []
+
+    for entry in sorted(entries, key=lambda e: e['mtime']):
+        if referenced is not None and entry['name'] in referenced:
+            # Veritabanında kaydı olan/kullanımdaki dosyalar hiçbir sınır nedeniyle silinmez
+            continue
+        age = now - entry['mtime']
+        if max_age is not None and age > max_age:
+            expired.append(dict(entry, reason='age'))
+        elif referenced is not None and orphan_grace is not None and age > orphan_grace:
+            expired.append(dict(entry, reason='orphan'))
+        else:
+            kept.append(entry)
+
+    # Boyut sınırı aşılıyorsa en eski dosyalardan başlayarak sil
+    if max_bytes is not None:
+        total = sum(entry['size'] for entry in kept)
+        for entry in kept:
+            if total <= max_bytes:
+                break
+            expired.append(dict(entry, reason='size'))
+            total -= entry['size']
+
+    return expired
+
+def delete_files(entries, dry_run=False):
+    """Delete the given files and return (count, freed bytes)"""
+    count = 0
+    freed = 0
+
+    for entry in entries:
+        if not dry_run:
+            try:
+                os.remove(entry['path'])
+            except FileNotFoundError:
+                # Başka bir süreç tarafından zaten silinmiş
+                continue
+            except OSError as e:
+                logger.warning("Dosya silinemedi (%s): %s", entry['path'], e)
+                continue
+        count += 1
+        freed += entry['size']
+
+    return count, freed
+
+def select_orphan_thumbnails(thumbnail_folder, source_folder):
+    """Pick cached thumbnails whose source image no longer exists"""
+    source_keys = set()
+    for entry in scan_files(source_folder):
+        stem, extension = os.path.splitext(entry['name'])
+        source_keys.add(f"{stem}_{extension.lstrip('.')}")
+    orphans = []
+
+    for entry in scan_files(thumbnail_folder):
+        # Küçük resim adı: <kaynak adı>_<kaynak uzantısı>_<boyut>.jpg
+        key = os.path.splitext(entry['name'])[0].rsplit('_', 1)[0]
+        if key not in source_keys:
+            orphans.append(dict(entry, reason='orphan'))
+
+    return orphans
@@ -0,0 +1,164 @@
+import re
+import sys
+import json
+import queue
+import random
+import atexit
+import logging
+import datetime
+import logging.handlers
+
+from services.metrics import LOG_RECORDS_DROPPED
+
+# LogRecord'un standart alanları; bunların dışındakiler extra= ile verilmiş yapılandırılmış alanlardır
+_RESERVED_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+# Değeri maskelenecek alan adları ve metin içindeki anahtar kalıpları
+SECRET_KEY_PATTERN = re.compile(r'(api[_-]?key|authorization|token|secret|password)', re.IGNORECASE)
+SECRET_VALUE_PATTERNS = (
+    re.compile(r'(Bearer\s+)[A-Za-z0-9._\-]+'),
+    re.compile(r'([?&]key=)[^&\s\'"]+'),
+    re.compile(r'(["\']?(?:api[_-]?key|authorization|x-goog-api-key)["\']?\s*[:=]\s*["\']?)(?:Bearer\s+)?[^"\'\s,}]+',
+               re.IGNORECASE)
+)
+MASK = '***'
+
+def mask_secrets(text):
+    """Mask API keys and bearer tokens inside a string"""
+    for pattern in SECRET_VALUE_PATTERNS:
+        text = pattern.sub(lambda match: match.group(1) + MASK, text)
+    return text
+
+def sanitize(value, max_length, depth=0):
+    """Return a JSON-safe copy of value with secrets masked and long strings/lists truncated"""
+    if isinstance(value, dict):
+        if depth > 4:
+            return '{...}'
+        return {str(key): MASK if SECRET_KEY_PATTERN.search(str(key)) and value[key] else
+                sanitize(value[key], max_length, depth + 1) for key in list(value)[:50]}
+    if isinstance(value, (list, tuple)):
+        if depth > 4:
+            return '[...]'
+        items = [sanitize(item, max_length, depth + 1) for item in value[:20]]
+        if len(value) > 20:
+            items.append(f'... (+{len(value) - 20})')
+        return items
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    text = mask_secrets(value if isinstance(value, str) else str(value))
+    if len(text) > max_length:
+        return f"{text[:max_length]}... ({len(text)} karakter)"
+    return text
+
+class JsonFormatter(logging.Formatter):
+    def __init__(self, max_field_length=500):
+        """Render records as one JSON object per line, including extra= fields"""
+        super().__init__()
+        self.max_field_length = max_field_length
+
+    def format(self, record):
+        data = {
+            'ts': datetime.datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': sanitize(record.getMessage(), self.max_field_length * 4)
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRIBUTES and not key.startswith('_'):
+                data[key] = sanitize(value, self.max_field_length)
+        if record.exc_text:
+            data['exception'] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+class TextFormatter(logging.Formatter):
+    def __init__(self, max_field_length=500):
+        """Human readable lines for development, with extra= fields appended as key=value"""
+        super().__init__('%(asctime)s %(levelname)s %(name)s: %(message)s')
+        self.max_field_length = max_field_length
+
+    def format(self, record):
+        line = mask_secrets(super().format(record))
+        extras = [f"{key}={json.dumps(sanitize(value, self.max_field_length), ensure_ascii=False, default=str)}"
+                  for key, value in record.__dict__.items()
+                  if key not in _RESERVED_ATTRIBUTES and not key.startswith('_')]
+        return f"{line} {' '.join(extras)}" if extras else line
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rate):
+        """Keep only a share of DEBUG/INFO records; warnings and errors always pass"""
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or self.rate >= 1 or random.random() < self.rate
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Queue records without ever blocking the caller; records are dropped when the queue is full"""
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+    def prepare(self, record):
+        # Mesaj çağıran thread'de birleştirilir (argümanlar sonradan değişebilir);
+        # JSON'a çevirme, maskeleme ve yazma işi dinleyici thread'inde yapılır
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+_listener = None
+
+def setup_logging(config):
+    """
+    Route all logging through a bounded queue drained by a background thread
+
+    Log calls only format the message and enqueue the record; JSON rendering,
+    masking and stream/file I/O happen in the listener thread.
+
+    Args:
+        config (dict): Application config (LOG_LEVEL, LOG_LEVELS, LOG_FORMAT, LOG_FILE,
+            LOG_SAMPLE_RATE, LOG_MAX_FIELD_LENGTH, LOG_QUEUE_SIZE)
+    """
+    global _listener
+    shutdown_logging()
+
+    max_field_length = int(config.get('LOG_MAX_FIELD_LENGTH', 500))
+    formatter_class = TextFormatter if str(config.get('LOG_FORMAT', 'json')).lower() == 'text' else JsonFormatter
+
+    handlers = [logging.StreamHandler(sys.stderr)]
+    if config.get('LOG_FILE'):
+        handlers.append(logging.handlers.RotatingFileHandler(
+            config['LOG_FILE'], maxBytes=10 * 1024 * 1024, backupCount=5, encoding='utf-8'))
+    for handler in handlers:
+        handler.setFormatter(formatter_class(max_field_length))
+
+    log_queue = queue.Queue(maxsize=int(config.get('LOG_QUEUE_SIZE', 10000)))
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(float(config.get('LOG_SAMPLE_RATE', 1.0))))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(str(config.get('LOG_LEVEL', 'INFO')).upper())
+    for name, level in (config.get('LOG_LEVELS') or {}).items():
+        logging.getLogger(name).setLevel(str(level).upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,141 @@
+import json
+import time
+import datetime
+import threading
+from functools import wraps
+
+# Etkin iz ve açık span yığını thread başına tutulur
+_local = threading.local()
+
+class Span:
+    __slots__ = ('name', 'start', 'end', 'attributes', 'children', 'trace')
+
+    def __init__(self, trace, name, attributes):
+        self.trace = trace
+        self.name = name
+        self.start = time.perf_counter()
+        self.end = None
+        self.attributes = {key: value for key, value in attributes.items() if value is not None}
+        self.children = []
+
+    def set(self, **attributes):
+        """Add attributes (bytes, tokens, counts...) to the span"""
+        self.attributes.update({key: value for key, value in attributes.items() if value is not None})
+
+    def to_dict(self, now=None):
+        end = self.end if self.end is not None else (now or time.perf_counter())
+        data = {
+            'name': self.name,
+            'start_ms': round((self.start - self.trace.root.start) * 1000, 1),
+            'duration_ms': round((end - self.start) * 1000, 1)
+        }
+        if self.end is None:
+            data['open'] = True
+        if self.attributes:
+            data['attrs'] = self.attributes
+        if self.children:
+            data['children'] = [child.to_dict(now) for child in self.children]
+        return data
+
+class _NoopSpan:
+    """Returned when no trace is active so instrumented code needs no checks"""
+    def set(self, **attributes):
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+class Trace:
+    def __init__(self, name, **attributes):
+        """
+        Record a tree of timed spans for a single job
+
+        Args:
+            name (str): Name of the root span
+            **attributes: Attributes of the root span (job id, model...)
+        """
+        self.started_at = datetime.datetime.now().isoformat()
+        self.lock = threading.Lock()
+        self.root = Span(self, name, attributes)
+
+    def start(self, parent=None):
+        """Make this trace the active one in the current thread"""
+        _local.trace = self
+        _local.stack = [parent or self.root]
+
+    def finish(self):
+        """Close the root span and deactivate the trace in the current thread"""
+        if self.root.end is None:
+            self.root.end = time.perf_counter()
+        _local.trace = None
+        _local.stack = []
+
+    def to_dict(self):
+        return {'started_at': self.started_at, 'root': self.root.to_dict()}
+
+    def to_json(self):
+        """Serialize the span tree compactly for storage"""
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(',', ':'), default=str)
+
+def current_trace():
+    return getattr(_local, 'trace', None)
+
+def current_span():
+    stack = getattr(_local, 'stack', None)
+    return stack[-1] if stack else NOOP_SPAN
+
+class span:
+    """Record a child span of the active span; usable as a context manager or decorator"""
+
+    def __init__(self, name, **attributes):
+        self.name = name
+        self.attributes = attributes
+        self.span = None
+
+    def __enter__(self):
+        trace = current_trace()
+        if trace is None:
+            self.span = None
+            return NOOP_SPAN
+
+        parent = _local.stack[-1]
+        self.span = Span(trace, self.name, self.attributes)
+        with trace.lock:
+            parent.children.append(self.span)
+        _local.stack.append(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.span is not None:
+            self.span.end = time.perf_counter()
+            if exc_type is not None:
+                self.span.set(error=exc_type.__name__)
+            _local.stack.pop()
+        return False
+
+    def __call__(self, func):
+        name = self.name
+        attributes = self.attributes
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+
+def propagate(func):
+    """Wrap a function so it records its spans under the caller's active span in another thread"""
+    trace = current_trace()
+    if trace is None:
+        return func
+    parent = current_span()
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        _local.trace = trace
+        _local.stack = [parent]
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.trace = None
+            _local.stack = []
+    return wrapper
@@ -0,0 +1,177 @@
+import os
+import hashlib
+import tempfile
+
+# Biçim tespiti için biriktirilen ilk bayt sayısı (metin kontrolü için de yeterli)
+HEADER_SIZE = 4096
+
+class UploadRejected(Exception):
+    """Raised while a multipart body is being parsed to abort the whole upload"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+def declared_type_for(filename, allowed_extensions):
+    """Return the file type of a file name from the ALLOWED_EXTENSIONS mapping, or raise UploadRejected"""
+    file_ext = os.path.splitext(filename)[1].lower()
+    for file_type, extensions in allowed_extensions.items():
+        if file_ext in extensions:
+            return file_type
+    raise UploadRejected(f'Desteklenmeyen dosya formatı: {file_ext}')
+
+def detect_file_type(header):
+    """
+    Detect the format family of a file from its first bytes
+
+    Returns 'pdf', 'image', 'word' (zip container), 'json', 'text' or None.
+    """
+    if header.startswith(b'%PDF-'):
+        return 'pdf'
+    if header.startswith(b'\x89PNG\r\n\x1a\n') or header.startswith(b'\xff\xd8\xff'):
+        return 'image'
+    if header.startswith(b'PK\x03\x04'):
+        return 'word'
+    if b'\x00' in header:
+        return None
+
+    stripped = header.lstrip(b'\xef\xbb\xbf').lstrip()
+    if stripped[:1] in (b'{', b'['):
+        return 'json'
+    return 'text'
+
+def matches_declared_type(declared_type, detected_type):
+    """Check the content of a file against the type derived from its extension"""
+    if declared_type in ('text', 'json'):
+        # JSON içerikli .txt ve düz metin görünümlü .json dosyaları ayrıştırıcıya bırakılır
+        return detected_type in ('text', 'json')
+    return declared_type == detected_type
+
+class UploadBatch:
+    def __init__(self, max_bytes):
+        """Track the total size of all files of one request and their temporary files"""
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.uploads = []
+
+    def discard(self):
+        """Remove the temporary files of every upload that was not finalized"""
+        for upload in self.uploads:
+            upload.discard()
+
+class StreamingUpload:
+    def __init__(self, directory, filename, declared_type, max_bytes=None, batch=None, block_size=64 * 1024):
+        """
+        File-like target for one multipart file part
+
+        Data is hashed and size-checked as it arrives and written to a temporary file
+        next to its final location; the first HEADER_SIZE bytes are held back until the
+        content has been checked against the declared type, so rejected files never
+        reach the disk.
+
+        Args:
+            directory (str): Folder of the final file (the temporary file is created there)
+            filename (str): Original file name (for error messages)
+            declared_type (str): Type derived from the extension ('pdf', 'image', ...)
+            max_bytes (int): Per-file size limit (None = unlimited)
+            batch (UploadBatch): Request-wide size accounting
+            block_size (int): Buffer size of the temporary file
+        """
+        self.directory = directory
+        self.filename = filename
+        self.declared_type = declared_type
+        self.max_bytes = max_bytes
+        self.batch = batch
+        self.size = 0
+        self.hash = hashlib.sha256()
+        self.header = b''
+        self.validated = False
+        self.file = None
+        self.temp_path = None
+        self.final_path = None
+        self.block_size = block_size
+        if batch is not None:
+            batch.uploads.append(self)
+
+    def _open(self):
+        fd, self.temp_path = tempfile.mkstemp(prefix='.upload-', suffix='.part', dir=self.directory)
+        self.file = os.fdopen(fd, 'w+b', buffering=self.block_size)
+
+    def _validate(self):
+        detected_type = detect_file_type(self.header)
+        if not matches_declared_type(self.declared_type, detected_type):
+            raise UploadRejected(f"Dosya içeriği uzantısıyla uyuşmuyor: {self.filename}", 415)
+        self.validated = True
+        self._open()
+        self.file.write(self.header)
+        self.header = b''
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_bytes and self.size > self.max_bytes:
+            raise UploadRejected(f"Dosya boyutu sınırı aşıldı: {self.filename}", 413)
+        if self.batch is not None:
+            self.batch.total_bytes += len(data)
+            if self.batch.max_bytes and self.batch.total_bytes > self.batch.max_bytes:
+                raise UploadRejected("Toplam yükleme boyutu sınırı aşıldı", 413)
+
+        self.hash.update(data)
+        if self.validated:
+            self.file.write(data)
+            return len(data)
+
+        self.header += data
+        if len(self.header) >= HEADER_SIZE:
+            self._validate()
+        return len(data)
+
+    def _ensure_validated(self):
+        if not self.validated:
+            self._validate()
+
+    def seek(self, offset, whence=0):
+        # Ayrıştırıcı parça bittiğinde başa sarar; bu noktada küçük dosyalar da doğrulanır
+        self._ensure_validated()
+        return self.file.seek(offset, whence)
+
+    def tell(self):
+        return self.file.tell() if self.file else len(self.header)
+
+    def read(self, size=-1):
+        self._ensure_validated()
+        return self.file.read(size)
+
+    def flush(self):
+        if self.file:
+            self.file.flush()
+
+    @property
+    def sha256(self):
+        return self.hash.hexdigest()
+
+    def finalize(self, path):
+        """Move the completed file to its final path atomically and return (size, sha256)"""
+        self._ensure_validated()
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        os.replace(self.temp_path, path)
+        self.final_path = path
+        self.temp_path = None
+        return self.size, self.sha256
+
+    def discard(self):
+        """Delete the temporary file of an upload that was not finalized"""
+        if self.file is not None and not self.file.closed:
+            self.file.close()
+        if self.temp_path:
+            try:
+                os.remove(self.temp_path)
+            except FileNotFoundError:
+                pass
+            self.temp_path = None
+
+    def close(self):
+        # FileStorage kapatıldığında kesinleşmemiş geçici dosya silinir
+        if self.final_path is None:
+            self.discard()
@@ -0,0 +1,102 @@
+import os
+import re
+import io
+import base64
+
+# Toplu vision isteklerinde her görselin yanıtını ayırmak için kullanılan işaret
+BATCH_IMAGE_MARKER = "=== GÖRSEL {index} ==="
+BATCH_IMAGE_PATTERN = re.compile(r'^[ \t]*=+[ \t]*GÖRSEL[ \t]+(\d+)[ \t]*=+[ \t]*$', re.MULTILINE)
+
+# Vision modellerine gönderilen görsellerin en uzun kenarı (piksel)
+DEFAULT_MAX_DIMENSION = 2048
+
+IMAGE_MIME_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png'
+}
+
+def get_image_mime_type(image_path):
+    """Return the MIME type of an image based on its extension"""
+    ext = os.path.splitext(image_path)[1].lower()
+    return IMAGE_MIME_TYPES.get(ext, 'image/jpeg')
+
+def load_image_bytes(image_path, max_dimension=DEFAULT_MAX_DIMENSION):
+    """Read an image, downscaling it only when it exceeds max_dimension"""
+    mime_type = get_image_mime_type(image_path)
+
+    with open(image_path, "rb") as image_file:
+        image_bytes = image_file.read()
+
+    if not max_dimension:
+        return mime_type, image_bytes
+
+    from PIL import Image  # yalnızca yeniden boyutlandırma gerektiğinde yüklenir
+
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        if max(img.size) <= max_dimension:
+            return mime_type, image_bytes
+
+        img.thumbnail((max_dimension, max_dimension))
+        buffer = io.BytesIO()
+        if mime_type == 'image/png':
+            img.save(buffer, format='PNG', optimize=True)
+        else:
+            img.convert('RGB').save(buffer, format='JPEG', quality=90)
+
+    return mime_type, buffer.getvalue()
+
+def encode_image(image_path, max_dimension=DEFAULT_MAX_DIMENSION):
+    """Read (and resize if needed) an image file and return (mime_type, base64 string)"""
+    mime_type, image_bytes = load_image_bytes(image_path, max_dimension)
+    return mime_type, base64.b64encode(image_bytes).decode('utf-8')
+
+def estimate_encoded_size(image_path):
+    """Estimate the base64 payload size of an image in bytes"""
+    return (os.path.getsize(image_path) + 2) // 3 * 4
+
+def pack_image_batches(image_paths, max_images, max_bytes):
+    """Group image paths into batches limited by image count and encoded payload size"""
+    batches = []
+    current_batch = []
+    current_size = 0
+
+    for image_path in image_paths:
+        size = estimate_encoded_size(image_path)
+        if current_batch and (len(current_batch) >= max_images or current_size + size > max_bytes):
+            batches.append(current_batch)
+            current_batch = []
+            current_size = 0
+        current_batch.append(image_path)
+        current_size += size
+
+    if current_batch:
+        batches.append(current_batch)
+
+    return batches
+
+def build_batch_vision_prompt(prompt, image_count):
+    """Build a prompt asking the model to answer each image in its own delimited section"""
+    markers = "\n".join(BATCH_IMAGE_MARKER.format(index=i + 1) for i in range(image_count))
+    return f"""{prompt}
+
+Bu istekte {image_count} görsel sırayla gönderildi. Her görseli ayrı ayrı analiz et.
+Her görselin yanıtına, görselin sırasını belirten aşağıdaki satırla başla ve başka görsellerin içeriğini karıştırma:
+{markers}"""
+
+def split_batch_vision_response(text, image_count):
+    """Split a batched vision response into per-image contents, or return None if incomplete"""
+    matches = list(BATCH_IMAGE_PATTERN.finditer(text or ""))
+    sections = {}
+
+    for i, match in enumerate(matches):
+        index = int(match.group(1))
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        content = text[match.end():end].strip()
+        if 1 <= index <= image_count and content and index not in sections:
+            sections[index] = content
+
+    if len(sections) != image_count:
+        return None
+
+    return [sections[i + 1] for i in range(image_count)]
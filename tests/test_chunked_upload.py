@@ -0,0 +1,83 @@
+import io
+import hashlib
+
+import pytest
+
+from services.chunked_upload import ChunkedUploadStore, PreparedExtractions
+from services.upload_stream import UploadRejected
+
+PART_SIZE = 1024
+
+@pytest.fixture
+def store(tmp_path):
+    return ChunkedUploadStore(str(tmp_path / '.sessions'), part_size=PART_SIZE, block_size=256,
+                              prepared=PreparedExtractions())
+
+def send(store, upload_id, index, data):
+    return store.write_part(upload_id, index, io.BytesIO(data), content_length=len(data))
+
+def test_parts_in_any_order_assemble_file(store, tmp_path):
+    data = ('ğüşiöç satır\n' * 300).encode('utf-8')
+    session = store.create('notlar.txt', 'text', len(data))
+    parts = [data[i:i + PART_SIZE] for i in range(0, len(data), PART_SIZE)]
+    for index in reversed(range(len(parts))):
+        send(store, session['upload_id'], index, parts[index])
+
+    path = str(tmp_path / 'notlar.txt')
+    size, sha256 = store.complete(session['upload_id'], path)
+
+    assert size == len(data)
+    assert sha256 == hashlib.sha256(data).hexdigest()
+    assert open(path, 'rb').read() == data
+    assert store.prepared.get(path) == [data.decode('utf-8')]
+
+def test_resent_part_replaces_prepared_text(store, tmp_path):
+    first = b'A' * PART_SIZE + b'B' * 100
+    session = store.create('metin.txt', 'text', len(first))
+    upload_id = session['upload_id']
+    send(store, upload_id, 0, first[:PART_SIZE])
+    send(store, upload_id, 1, first[PART_SIZE:])
+
+    # Çözülmüş ilk parça farklı içerikle yeniden gönderilir
+    send(store, upload_id, 0, b'C' * PART_SIZE)
+
+    path = str(tmp_path / 'metin.txt')
+    store.complete(upload_id, path)
+    text = open(path, encoding='utf-8').read()
+    assert text.startswith('C')
+    assert store.prepared.get(path) == [text]
+
+def test_part_resent_in_another_process_is_not_served_stale(store, tmp_path):
+    data = b'A' * PART_SIZE + b'B' * 10
+    session = store.create('metin.txt', 'text', len(data))
+    upload_id = session['upload_id']
+    send(store, upload_id, 0, data[:PART_SIZE])
+    send(store, upload_id, 1, data[PART_SIZE:])
+
+    # Aynı oturuma başka bir süreç (kendi metin önbelleğiyle) yazar
+    other = ChunkedUploadStore(store.root, part_size=PART_SIZE, prepared=None)
+    send(other, upload_id, 0, b'C' * PART_SIZE)
+
+    path = str(tmp_path / 'metin.txt')
+    store.complete(upload_id, path)
+    assert store.prepared.get(path) is None
+
+def test_complete_with_missing_parts_is_rejected(store):
+    session = store.create('eksik.txt', 'text', PART_SIZE + 1)
+    send(store, session['upload_id'], 0, b'x' * PART_SIZE)
+    with pytest.raises(UploadRejected) as excinfo:
+        store.complete(session['upload_id'], '/nonexistent')
+    assert excinfo.value.status_code == 409
+
+def test_large_file_text_is_not_prepared(tmp_path):
+    store = ChunkedUploadStore(str(tmp_path / '.sessions'), part_size=PART_SIZE, prepared=PreparedExtractions(),
+                               prepare_max_size=PART_SIZE)
+    data = b'x' * (PART_SIZE + 1)
+    session = store.create('buyuk.txt', 'text', len(data))
+    send(store, session['upload_id'], 0, data[:PART_SIZE])
+    send(store, session['upload_id'], 1, data[PART_SIZE:])
+
+    path = str(tmp_path / 'buyuk.txt')
+    store.complete(session['upload_id'], path)
+    assert store.prepared.get(path) is None
+    assert not store._prefixes
@@ -0,0 +1,65 @@
+import os
+import sqlite3
+
+import pytest
+
+from conftest import ROOT_DIR
+from database.db import compute_dedup_hash
+
+@pytest.fixture
+def cleanup(app_module):
+    import cleanup as module
+    return module
+
+@pytest.fixture
+def conn(tmp_path):
+    connection = sqlite3.connect(str(tmp_path / 'cleanup.db'), isolation_level=None)
+    connection.row_factory = sqlite3.Row
+    with open(os.path.join(ROOT_DIR, 'database', 'schema.sql'), encoding='utf-8') as f:
+        connection.executescript(f.read())
+    connection.execute('CREATE TABLE IF NOT EXISTS maintenance_state (key TEXT PRIMARY KEY, value TEXT)')
+    yield connection
+    connection.close()
+
+def add_log(conn, files, prompt_type, result_file, tags=None):
+    return conn.execute(
+        'INSERT INTO processing_logs (files, prompt_type, result_file, tags, dedup_hash) VALUES (?, ?, ?, ?, ?)',
+        (files, prompt_type, result_file, tags, compute_dedup_hash(files, prompt_type, result_file))
+    ).lastrowid
+
+def test_none_and_empty_hash_differently():
+    assert compute_dedup_hash('a', None) != compute_dedup_hash('a', '')
+    assert compute_dedup_hash('a', 'b') == compute_dedup_hash('a', 'b')
+
+def test_duplicate_log_links_move_to_kept_log(cleanup, conn):
+    kept_id = add_log(conn, '["a.txt"]', 'qa_pairs', 'sonuc.json')
+    duplicate_id = add_log(conn, '["a.txt"]', 'qa_pairs', 'sonuc.json', tags='["egitim"]')
+    conn.execute('INSERT INTO saved_results (title, description, result_type, content, processing_log_id) '
+                 "VALUES ('t', 'd', 'qa_pairs', 'c', ?)", (duplicate_id,))
+
+    stats = cleanup.dedup_table(conn, 'processing_logs')
+
+    assert stats['duplicates'] == 1
+    assert [row[0] for row in conn.execute('SELECT id FROM processing_logs')] == [kept_id]
+    assert conn.execute('SELECT processing_log_id FROM saved_results').fetchone()[0] == kept_id
+    assert conn.execute('SELECT tags FROM processing_logs WHERE id = ?', (kept_id,)).fetchone()[0] == '["egitim"]'
+
+def test_null_field_is_not_duplicate_of_empty_field(cleanup, conn):
+    add_log(conn, '["a.txt"]', 'qa_pairs', None)
+    add_log(conn, '["a.txt"]', 'qa_pairs', '')
+
+    assert cleanup.dedup_table(conn, 'processing_logs')['duplicates'] == 0
+    assert conn.execute('SELECT COUNT(*) FROM processing_logs').fetchone()[0] == 2
+
+def test_outdated_hashes_are_reset(cleanup, conn):
+    # Eski biçimde NULL ve boş metin aynı özeti alıyordu
+    old_hash = compute_dedup_hash('["a.txt"]', 'qa_pairs', '')
+    conn.execute("INSERT INTO processing_logs (files, prompt_type, result_file, dedup_hash) "
+                 "VALUES ('[\"a.txt\"]', 'qa_pairs', NULL, ?)", (old_hash,))
+    add_log(conn, '["a.txt"]', 'qa_pairs', '')
+
+    assert cleanup.reset_outdated_hashes(conn)
+    stats = cleanup.dedup_table(conn, 'processing_logs', full=True)
+
+    assert stats['duplicates'] == 0
+    assert stats['hashed'] == 1
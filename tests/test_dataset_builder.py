@@ -0,0 +1,129 @@
+import os
+import json
+import sqlite3
+import hashlib
+
+import pytest
+
+import services.dataset_builder as dataset_builder
+from services.dataset_builder import DatasetBuilder, pair_hash, reset_dataset
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database', 'schema.sql')
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'app.db'))
+    conn.row_factory = sqlite3.Row
+    with open(SCHEMA_PATH, encoding='utf-8') as f:
+        conn.executescript(f.read())
+    yield conn
+    conn.close()
+
+def add_result(conn, pairs):
+    content = json.dumps({'soru-cevaplar': [{'soru': q, 'cevap': a} for q, a in pairs]}, ensure_ascii=False)
+    conn.execute("INSERT INTO saved_results (title, result_type, content) VALUES ('Sonuç', 'qa_pairs', ?)", (content,))
+    conn.commit()
+
+def read_split(directory, split):
+    records = []
+    for name in sorted(os.listdir(directory)):
+        if name.startswith(f'{split}-'):
+            with open(os.path.join(directory, name), encoding='utf-8') as f:
+                records.extend(json.loads(line) for line in f)
+    return records
+
+def questions(records):
+    return sorted(record['messages'][0]['content'] for record in records)
+
+def test_duplicates_are_skipped_across_updates(conn, tmp_path):
+    directory = str(tmp_path / 'veri')
+    builder = DatasetBuilder(directory, validation_ratio=0)
+    add_result(conn, [('Başkent neresi?', 'Ankara'), ('  BAŞKENT   neresi? ', 'ankara'), ('Boş', '  ')])
+    assert builder.update(conn) == {'results': 1, 'train': 1, 'validation': 0, 'duplicates': 1, 'invalid': 1}
+
+    add_result(conn, [('Başkent neresi?', 'Ankara'), ('En uzun nehir?', 'Kızılırmak')])
+    assert builder.update(conn)['train'] == 1
+    # Yeni sonuç yoksa güncelleme hiçbir şey yazmaz
+    assert builder.update(conn)['results'] == 0
+    assert questions(read_split(directory, 'train')) == ['Başkent neresi?', 'En uzun nehir?']
+
+def test_pair_always_lands_in_the_same_split(conn, tmp_path):
+    pairs = [(f'Soru {i}?', f'Cevap {i}') for i in range(200)]
+    add_result(conn, pairs)
+
+    first = str(tmp_path / 'bir')
+    DatasetBuilder(first, validation_ratio=0.3).update(conn)
+    # Aynı çiftler farklı sırada ve parçalar halinde eklense de aynı kümeye düşer
+    second = str(tmp_path / 'iki')
+    builder = DatasetBuilder(second, validation_ratio=0.3, shard_size=7)
+    conn.execute('DELETE FROM saved_results')
+    for i in range(0, 200, 50):
+        add_result(conn, list(reversed(pairs))[i:i + 50])
+        builder.update(conn, batch_size=3)
+
+    validation = questions(read_split(first, 'validation'))
+    assert 0 < len(validation) < 200
+    assert validation == questions(read_split(second, 'validation'))
+    assert questions(read_split(first, 'train')) == questions(read_split(second, 'train'))
+    threshold = 0.3 * 0xFFFFFFFF
+    assert all(int(pair_hash(q, f'Cevap {q[5:-1]}')[:8], 16) < threshold for q in validation)
+
+def test_interrupted_update_is_cut_off(conn, tmp_path, monkeypatch):
+    directory = str(tmp_path / 'veri')
+    builder = DatasetBuilder(directory, validation_ratio=0, shard_size=3)
+    add_result(conn, [('İlk?', 'Bir'), ('İkinci?', 'İki')])
+    builder.update(conn)
+    committed = open(os.path.join(directory, 'train-00000.jsonl'), 'rb').read()
+
+    # Satırlar parçalara yazıldıktan sonra, durum kaydedilmeden önce güncelleme yarıda kalır
+    add_result(conn, [(f'Yeni {i}?', 'Cevap') for i in range(5)])
+    original = dataset_builder.format_record
+    calls = []
+    def failing_format_record(*args):
+        calls.append(args)
+        if len(calls) == 5:
+            raise RuntimeError('kesinti')
+        return original(*args)
+    monkeypatch.setattr(dataset_builder, 'format_record', failing_format_record)
+    with pytest.raises(RuntimeError):
+        builder.update(conn)
+    assert os.path.getsize(os.path.join(directory, 'train-00000.jsonl')) > len(committed)
+    assert os.path.exists(os.path.join(directory, 'train-00001.jsonl'))
+
+    monkeypatch.setattr(dataset_builder, 'format_record', original)
+    stats = builder.update(conn)
+    assert stats['train'] == 5
+    assert open(os.path.join(directory, 'train-00000.jsonl'), 'rb').read().startswith(committed)
+    assert len(read_split(directory, 'train')) == 7
+
+def test_manifest_matches_shards(conn, tmp_path):
+    directory = str(tmp_path / 'veri')
+    builder = DatasetBuilder(directory, record_format='gemini', shard_size=4, validation_ratio=0.2,
+                             system_prompt='Yardımcı ol')
+    add_result(conn, [(f'Soru {i}?', f'Cevap {i}') for i in range(30)])
+    builder.update(conn)
+    add_result(conn, [(f'Ek soru {i}?', 'Ek cevap') for i in range(6)])
+    builder.update(conn)
+
+    with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    assert manifest['counts']['train'] + manifest['counts']['validation'] == 36
+    assert sum(shard['records'] for shard in manifest['shards']) == 36
+    for shard in manifest['shards']:
+        data = open(os.path.join(directory, shard['file']), 'rb').read()
+        assert hashlib.sha256(data).hexdigest() == shard['sha256']
+        assert len(data) == shard['bytes']
+        assert data.count(b'\n') == shard['records'] <= 4
+        assert all('systemInstruction' in json.loads(line) for line in data.splitlines())
+
+def test_settings_mismatch_raises_until_rebuilt(conn, tmp_path):
+    directory = str(tmp_path / 'veri')
+    add_result(conn, [('Soru?', 'Cevap')])
+    DatasetBuilder(directory, record_format='chat').update(conn)
+
+    with pytest.raises(ValueError, match='format'):
+        DatasetBuilder(directory, record_format='instruction').update(conn)
+
+    reset_dataset(directory)
+    stats = DatasetBuilder(directory, record_format='instruction').update(conn)
+    assert stats['train'] + stats['validation'] == 1
@@ -0,0 +1,52 @@
+import threading
+
+import pytest
+
+from database import db as database
+
+@pytest.fixture
+def long_check_interval(app_module):
+    config = app_module.app.config
+    saved = config.get('CACHE_VERSION_CHECK_INTERVAL')
+    config['CACHE_VERSION_CHECK_INTERVAL'] = 3600
+    yield
+    config['CACHE_VERSION_CHECK_INTERVAL'] = saved
+
+def read_setting_in_other_thread(app, key):
+    values = []
+    def read():
+        with app.app_context():
+            values.append(database.get_setting(key))
+    thread = threading.Thread(target=read)
+    thread.start()
+    thread.join(5)
+    return values[0]
+
+def test_reader_during_uncommitted_write_does_not_keep_stale_value(app_module, long_check_interval):
+    app = app_module.app
+    with app.app_context():
+        assert database.update_setting('test_anahtar', 'eski')[0]
+        assert database.get_setting('test_anahtar') == 'eski'
+
+        with database.transaction() as db:
+            db.execute("UPDATE app_settings SET value = 'yeni' WHERE key = 'test_anahtar'")
+            database.bump_cache_version(db, 'settings')
+            # Commit'ten önce okuyan başka bir istek eski değeri görür ve önbelleğe alır
+            assert read_setting_in_other_thread(app, 'test_anahtar') == 'eski'
+
+        assert database.get_setting('test_anahtar') == 'yeni'
+    assert read_setting_in_other_thread(app, 'test_anahtar') == 'yeni'
+
+def test_rolled_back_write_keeps_cache(app_module, long_check_interval):
+    with app_module.app.app_context():
+        assert database.update_setting('test_geri_al', 'ilk')[0]
+        assert database.get_setting('test_geri_al') == 'ilk'
+
+        with pytest.raises(RuntimeError):
+            with database.transaction() as db:
+                db.execute("UPDATE app_settings SET value = 'iptal' WHERE key = 'test_geri_al'")
+                database.bump_cache_version(db, 'settings')
+                raise RuntimeError('geri al')
+
+        assert database.get_setting('test_geri_al') == 'ilk'
+        assert database._cache.get('settings') is not None
@@ -0,0 +1,127 @@
+import time
+import threading
+
+import pytest
+
+from services.job_manager import JobManager, JobCancelled, PriorityScheduler, PRIORITY_INTERACTIVE, PRIORITY_BULK
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('Koşul zamanında sağlanmadı')
+        time.sleep(0.01)
+
+def start_waiters(scheduler, tickets, order):
+    """Queue (name, priority, user) tickets one by one; each takes its slot, records itself and releases it"""
+    threads = []
+    for name, priority, user in tickets:
+        def run(name=name, priority=priority, user=user):
+            with scheduler.slot(priority, user):
+                order.append(name)
+        thread = threading.Thread(target=run)
+        thread.start()
+        threads.append(thread)
+        wait_until(lambda: len(scheduler.waiting) == len(threads))
+    return threads
+
+def test_interactive_work_runs_before_bulk():
+    scheduler = PriorityScheduler(max_concurrency=1, reserved_interactive=0)
+    order = []
+    scheduler.acquire(PRIORITY_INTERACTIVE, 'tutan')
+    threads = start_waiters(scheduler, [('toplu', PRIORITY_BULK, 'a'), ('etkilesimli', PRIORITY_INTERACTIVE, 'b')], order)
+
+    scheduler.release(PRIORITY_INTERACTIVE)
+    for thread in threads:
+        thread.join(5)
+    assert order == ['etkilesimli', 'toplu']
+
+def test_bulk_work_never_occupies_reserved_slots():
+    scheduler = PriorityScheduler(max_concurrency=2, reserved_interactive=1)
+    scheduler.acquire(PRIORITY_BULK, 'a')
+
+    acquired = threading.Event()
+    def bulk():
+        with scheduler.slot(PRIORITY_BULK, 'b'):
+            acquired.set()
+    thread = threading.Thread(target=bulk)
+    thread.start()
+    wait_until(lambda: len(scheduler.waiting) == 1)
+
+    # Boş slot ayrılmış olduğundan ikinci toplu iş bekler, etkileşimli iş hemen çalışır
+    assert not acquired.wait(0.3)
+    with scheduler.slot(PRIORITY_INTERACTIVE, 'c'):
+        assert scheduler.active == 2
+
+    scheduler.release(PRIORITY_BULK)
+    assert acquired.wait(5)
+    thread.join(5)
+
+def test_users_take_turns_within_a_priority():
+    scheduler = PriorityScheduler(max_concurrency=1, reserved_interactive=0)
+    order = []
+    scheduler.acquire(PRIORITY_BULK, 'tutan')
+    threads = start_waiters(scheduler, [('a1', PRIORITY_BULK, 'a'), ('a2', PRIORITY_BULK, 'a'),
+                                        ('a3', PRIORITY_BULK, 'a'), ('b1', PRIORITY_BULK, 'b')], order)
+
+    scheduler.release(PRIORITY_BULK)
+    for thread in threads:
+        thread.join(5)
+    assert order == ['a1', 'b1', 'a2', 'a3']
+
+def test_cancelled_waiter_raises_job_cancelled():
+    scheduler = PriorityScheduler(max_concurrency=1, reserved_interactive=0)
+    scheduler.acquire(PRIORITY_INTERACTIVE, 'tutan')
+    cancelled = threading.Event()
+    errors = []
+
+    def waiter():
+        try:
+            scheduler.acquire(PRIORITY_BULK, 'a', cancel_check=cancelled.is_set)
+        except JobCancelled as e:
+            errors.append(e)
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    wait_until(lambda: len(scheduler.waiting) == 1)
+
+    cancelled.set()
+    thread.join(5)
+    assert len(errors) == 1
+    assert scheduler.waiting == []
+    assert scheduler.active == 1
+
+def test_register_rejects_live_duplicate_id_or_resume_key():
+    manager = JobManager()
+    assert manager.register('is-1', 'process', resume_key='anahtar') is None
+    assert manager.register('is-1', 'process') == 'is-1'
+    assert manager.register('is-2', 'process', resume_key='anahtar') == 'is-1'
+    assert manager.get_job('is-2') is None
+
+    # Biten işin kimliği ve anahtarı yeniden kullanılabilir
+    manager.finish('is-1', 'completed')
+    assert manager.register('is-2', 'process', resume_key='anahtar') is None
+
+def test_abandoned_call_keeps_its_slot_until_it_returns():
+    manager = JobManager(llm_concurrency=1, reserved_interactive=0)
+    manager.register('is', 'process')
+    finish_call = threading.Event()
+    errors = []
+
+    def run():
+        try:
+            manager.call(finish_call.wait, job_id='is')
+        except JobCancelled as e:
+            errors.append(e)
+    thread = threading.Thread(target=run)
+    thread.start()
+    wait_until(lambda: manager.scheduler.active == 1)
+
+    assert manager.cancel('is')
+    thread.join(5)
+    assert len(errors) == 1
+    # İptal edilen işin HTTP çağrısı hâlâ sürüyor; slot bırakılmaz
+    assert manager.scheduler.active == 1
+
+    finish_call.set()
+    wait_until(lambda: manager.scheduler.active == 0)
+    assert manager.call(lambda: 'tamam') == 'tamam'
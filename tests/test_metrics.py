@@ -0,0 +1,8 @@
+import requests
+
+from services.metrics import request_body_bytes
+
+def test_request_body_bytes_matches_sent_body():
+    payload = {"contents": [{"parts": [{"text": "Türkçe metin: ığüşöç"}]}]}
+    request = requests.Request('POST', 'http://localhost/', json=payload).prepare()
+    assert request_body_bytes(payload) == len(request.body)
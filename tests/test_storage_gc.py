@@ -0,0 +1,75 @@
+import os
+import time
+
+from services.storage_gc import scan_files, select_expired_files, select_orphan_thumbnails
+
+NOW = 1_000_000
+HOUR = 3600
+
+def entry(name, age, size=100):
+    return {'name': name, 'path': f'/tmp/{name}', 'size': size, 'mtime': NOW - age}
+
+def names(entries):
+    return sorted(e['name'] for e in entries)
+
+def test_referenced_files_are_never_deleted():
+    entries = [entry('eski.docx', 365 * 24 * HOUR, size=10_000), entry('sahipsiz.png', 365 * 24 * HOUR)]
+    expired = select_expired_files(entries, max_age=HOUR, max_bytes=0, referenced={'eski.docx'},
+                                   orphan_grace=HOUR, now=NOW)
+    assert names(expired) == ['sahipsiz.png']
+
+def test_orphan_grace_applies_only_to_unreferenced_files():
+    entries = [entry('kayitli.txt', 10 * HOUR), entry('yeni.png', HOUR), entry('eski.png', 10 * HOUR)]
+    expired = select_expired_files(entries, referenced={'kayitli.txt'}, orphan_grace=5 * HOUR, now=NOW)
+    assert [(e['name'], e['reason']) for e in expired] == [('eski.png', 'orphan')]
+
+def test_without_reference_check_only_age_limit_applies():
+    entries = [entry('a.txt', 10 * HOUR), entry('b.txt', HOUR)]
+    assert names(select_expired_files(entries, orphan_grace=0, now=NOW)) == []
+    assert names(select_expired_files(entries, max_age=5 * HOUR, now=NOW)) == ['a.txt']
+
+def test_size_budget_deletes_oldest_first():
+    entries = [entry('orta.txt', 2 * HOUR), entry('yeni.txt', HOUR), entry('en-eski.txt', 3 * HOUR)]
+    expired = select_expired_files(entries, max_bytes=150, now=NOW)
+    assert [(e['name'], e['reason']) for e in expired] == [('en-eski.txt', 'size'), ('orta.txt', 'size')]
+
+def test_size_budget_ignores_referenced_files():
+    entries = [entry('kayitli.txt', 3 * HOUR, size=1000), entry('eski.txt', 2 * HOUR), entry('yeni.txt', HOUR)]
+    expired = select_expired_files(entries, max_bytes=100, referenced={'kayitli.txt'}, now=NOW)
+    assert names(expired) == ['eski.txt']
+
+def test_orphan_thumbnails(tmp_path):
+    source = tmp_path / 'results'
+    thumbnails = source / 'thumbnails'
+    thumbnails.mkdir(parents=True)
+    (source / 'gorsel_1.png').write_bytes(b'png')
+    for name in ('gorsel_1_png_128.jpg', 'gorsel_1_png_256.jpg', 'gorsel_1_jpg_128.jpg', 'silinmis_2_png_128.jpg'):
+        (thumbnails / name).write_bytes(b'jpg')
+
+    orphans = names(select_orphan_thumbnails(str(thumbnails), str(source)))
+    assert orphans == ['gorsel_1_jpg_128.jpg', 'silinmis_2_png_128.jpg']
+
+def test_storage_gc_keeps_uploads_of_active_jobs(app_module):
+    config = app_module.app.config
+    upload_folder = config['UPLOAD_FOLDER']
+    old = time.time() - 10 * 24 * HOUR
+    for name in ('kullanimda.txt', 'terk.txt'):
+        path = os.path.join(upload_folder, name)
+        with open(path, 'w') as f:
+            f.write('x' * 100)
+        os.utime(path, (old, old))
+
+    saved_budget = config.get('UPLOAD_FOLDER_MAX_BYTES')
+    config['UPLOAD_FOLDER_MAX_BYTES'] = 0
+    try:
+        with app_module.app.app_context():
+            app_module.save_job_files('devam-anahtari', [os.path.join(upload_folder, 'kullanimda.txt')])
+            app_module.run_storage_gc()
+            remaining = names(scan_files(upload_folder))
+            app_module.delete_chunk_checkpoints('devam-anahtari')
+            assert app_module.get_job_file_names() == set()
+    finally:
+        config['UPLOAD_FOLDER_MAX_BYTES'] = saved_budget
+
+    assert 'kullanimda.txt' in remaining
+    assert 'terk.txt' not in remaining
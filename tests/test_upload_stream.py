@@ -0,0 +1,63 @@
+import io
+import os
+import hashlib
+
+import pytest
+
+PDF_BYTES = b'%PDF-1.4\n' + b'0' * 2000
+
+@pytest.fixture
+def upload_folder(app_module):
+    folder = app_module.app.config['UPLOAD_FOLDER']
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        if os.path.isfile(path):
+            os.remove(path)
+    return folder
+
+@pytest.fixture
+def limits(app_module):
+    config = app_module.app.config
+    saved = {key: config.get(key) for key in ('UPLOAD_MAX_FILE_SIZE', 'UPLOAD_MAX_BATCH_SIZE')}
+    yield config
+    config.update(saved)
+
+def files_in(folder):
+    return sorted(name for name in os.listdir(folder) if os.path.isfile(os.path.join(folder, name)))
+
+def upload(client, *files):
+    return client.post('/api/upload', data={'files': [(io.BytesIO(data), name) for name, data in files]},
+                       content_type='multipart/form-data')
+
+def test_upload_returns_size_and_sha256(client, upload_folder):
+    text = 'Türkçe içerik satırı\n'.encode('utf-8') * 500
+    response = upload(client, ('notlar.txt', text), ('belge.pdf', PDF_BYTES))
+
+    assert response.status_code == 200
+    uploaded = {item['name']: item for item in response.get_json()['files']}
+    assert uploaded['notlar.txt']['size'] == len(text)
+    assert uploaded['notlar.txt']['sha256'] == hashlib.sha256(text).hexdigest()
+    assert uploaded['belge.pdf']['sha256'] == hashlib.sha256(PDF_BYTES).hexdigest()
+    assert open(uploaded['belge.pdf']['path'], 'rb').read() == PDF_BYTES
+    assert files_in(upload_folder) == ['belge.pdf', 'notlar.txt']
+
+def test_magic_byte_mismatch_is_rejected(client, upload_folder):
+    response = upload(client, ('sahte.pdf', b'bu bir PDF degil' * 100))
+
+    assert response.status_code == 415
+    assert response.get_json()['success'] is False
+    assert files_in(upload_folder) == []
+
+def test_file_over_limit_is_rejected_without_temp_files(client, upload_folder, limits):
+    limits['UPLOAD_MAX_FILE_SIZE'] = 1000
+    response = upload(client, ('kucuk.txt', b'a' * 100), ('buyuk.txt', b'b' * 5000))
+
+    assert response.status_code == 413
+    assert files_in(upload_folder) == []
+
+def test_batch_over_limit_is_rejected_without_temp_files(client, upload_folder, limits):
+    limits['UPLOAD_MAX_BATCH_SIZE'] = 6000
+    response = upload(client, ('bir.txt', b'a' * 4000), ('iki.txt', b'b' * 4000))
+
+    assert response.status_code == 413
+    assert files_in(upload_folder) == []